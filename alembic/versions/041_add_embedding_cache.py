@@ -0,0 +1,40 @@
+"""Add embedding_cache table
+
+Revision ID: 041
+Revises: 040
+Create Date: 2026-01-12 10:00:00.000000
+
+Changes:
+- Add embedding_cache table keyed by (content_hash, model, dimensions, input_type)
+  so identical texts are embedded once and reused across compilations and queries
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = '041'
+down_revision = '040'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'embedding_cache',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('dimensions', sa.Integer(), nullable=False),
+        sa.Column('input_type', sa.String(length=50), nullable=False),
+        sa.Column('embedding', Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash', 'model', 'dimensions', 'input_type')
+    )
+
+    # Supports age-based pruning of stale entries
+    op.create_index('idx_embedding_cache_created_at', 'embedding_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_embedding_cache_created_at', table_name='embedding_cache')
+    op.drop_table('embedding_cache')
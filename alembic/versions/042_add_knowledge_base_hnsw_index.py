@@ -0,0 +1,30 @@
+"""Add HNSW index on knowledge_base.embedding
+
+Revision ID: 042
+Revises: 041
+Create Date: 2026-01-14 10:00:00.000000
+
+Changes:
+- Add HNSW (cosine) index so RAG retrieval runs as an in-database ANN query
+  (ORDER BY embedding <=> :query LIMIT k) instead of scanning rows in Python
+- The original ivfflat index was dropped together with the column in 014
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '042'
+down_revision = '041'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # HNSW requires pgvector >= 0.5.0; supports up to 2000 dimensions (we use 1536)
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_knowledge_base_embedding_hnsw ON knowledge_base '
+        'USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_knowledge_base_embedding_hnsw')
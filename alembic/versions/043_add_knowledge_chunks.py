@@ -0,0 +1,82 @@
+"""Add knowledge_chunks table for chunk-level RAG retrieval
+
+Revision ID: 043
+Revises: 042
+Create Date: 2026-01-16 10:00:00.000000
+
+Changes:
+- Add knowledge_chunks table (document id, ordinal, text, vector, token count)
+  with an HNSW cosine index for chunk-level ANN retrieval
+- Add content_hash and chunk_count to knowledge_base for document-level dedupe
+- Backfill one chunk per existing knowledge_base row (existing rows are
+  research sources embedded whole, so their vector is reused as-is)
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision = '043'
+down_revision = '042'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Step 1: Document-level dedupe columns on knowledge_base
+    op.add_column('knowledge_base', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('knowledge_base', sa.Column('chunk_count', sa.Integer(), server_default='0', nullable=False))
+    # Hash stripped content like RAGService does (str.strip() for ASCII whitespace)
+    op.execute(
+        "UPDATE knowledge_base SET content_hash = "
+        "encode(sha256(convert_to(btrim(content, E' \\t\\n\\r\\f\\x0b'), 'UTF8')), 'hex')"
+    )
+    op.create_index(
+        'idx_knowledge_base_product_content_hash',
+        'knowledge_base',
+        ['product_intelligence_id', 'content_hash'],
+        unique=False
+    )
+
+    # Step 2: Chunk table
+    op.create_table(
+        'knowledge_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('knowledge_base_id', sa.Integer(), nullable=False),
+        sa.Column('ordinal', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('embedding', Vector(1536), nullable=True),
+        sa.Column('token_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['knowledge_base_id'], ['knowledge_base.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('knowledge_base_id', 'ordinal', name='uq_knowledge_chunks_document_ordinal')
+    )
+    op.create_index(op.f('ix_knowledge_chunks_id'), 'knowledge_chunks', ['id'], unique=False)
+    op.create_index(op.f('ix_knowledge_chunks_knowledge_base_id'), 'knowledge_chunks', ['knowledge_base_id'], unique=False)
+
+    # Step 3: Backfill one chunk per existing document
+    op.execute("""
+        INSERT INTO knowledge_chunks (knowledge_base_id, ordinal, content, embedding, token_count)
+        SELECT id, 0, content, embedding, GREATEST(1, length(content) / 4)
+        FROM knowledge_base
+        WHERE embedding IS NOT NULL
+    """)
+    op.execute("UPDATE knowledge_base SET chunk_count = 1 WHERE embedding IS NOT NULL")
+
+    # Step 4: ANN index (after backfill - building on a populated table gives a better graph)
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_knowledge_chunks_embedding_hnsw ON knowledge_chunks '
+        'USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_knowledge_chunks_embedding_hnsw')
+    op.drop_index(op.f('ix_knowledge_chunks_knowledge_base_id'), table_name='knowledge_chunks')
+    op.drop_index(op.f('ix_knowledge_chunks_id'), table_name='knowledge_chunks')
+    op.drop_table('knowledge_chunks')
+
+    op.drop_index('idx_knowledge_base_product_content_hash', table_name='knowledge_base')
+    op.drop_column('knowledge_base', 'chunk_count')
+    op.drop_column('knowledge_base', 'content_hash')
@@ -0,0 +1,43 @@
+"""Add full-text search column to knowledge_chunks for hybrid retrieval
+
+Revision ID: 044
+Revises: 043
+Create Date: 2026-01-17 10:00:00.000000
+
+Changes:
+- Add content_tsv (generated tsvector over content, 'english' config)
+- Add GIN index for lexical ranking alongside the HNSW vector index
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '044'
+down_revision = '043'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'knowledge_chunks',
+        sa.Column(
+            'content_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', content)", persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'ix_knowledge_chunks_content_tsv',
+        'knowledge_chunks',
+        ['content_tsv'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_knowledge_chunks_content_tsv', table_name='knowledge_chunks')
+    op.drop_column('knowledge_chunks', 'content_tsv')
@@ -0,0 +1,119 @@
+"""Optionally store knowledge and product embeddings as halfvec; add binary-quantized index
+
+Revision ID: 045
+Revises: 044
+Create Date: 2026-01-18 10:00:00.000000
+
+Changes:
+- With EMBEDDING_STORAGE=halfvec: knowledge_chunks.embedding,
+  knowledge_base.embedding and product_intelligence.intelligence_embedding
+  go from vector(1536) to halfvec(1536) (float16; ~3 KB per row instead of
+  ~6 KB, HNSW index halves too) and their HNSW indexes are rebuilt with
+  halfvec_cosine_ops. This rewrites the three tables under ACCESS EXCLUSIVE
+  locks, so it is opt-in; the default (vector) leaves the columns alone.
+- Add an HNSW index for product embeddings (either storage)
+- Add HNSW index over binary_quantize(embedding)::bit(1536) on knowledge_chunks
+  for RAG_VECTOR_SEARCH=binary (hamming shortlist, cosine re-rank)
+
+halfvec and binary_quantize need pgvector >= 0.7.0. On older versions both
+steps are skipped with a warning (keep EMBEDDING_STORAGE=vector so the models
+match the columns) and later revisions still apply.
+Downgrade converts halfvec columns back to vector(1536); values keep float16 precision.
+"""
+import os
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '045'
+down_revision = '044'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+HNSW_PARAMS = 'WITH (m = 16, ef_construction = 64)'
+
+# (table, column, hnsw index name)
+EMBEDDING_COLUMNS = [
+    ('knowledge_chunks', 'embedding', 'ix_knowledge_chunks_embedding_hnsw'),
+    ('knowledge_base', 'embedding', 'ix_knowledge_base_embedding_hnsw'),
+    ('product_intelligence', 'intelligence_embedding', 'ix_product_intelligence_embedding_hnsw'),
+]
+
+
+def _pgvector_version() -> tuple:
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    return tuple(int(p) for p in (version or '0').split('.')[:2] if p.isdigit())
+
+
+def _column_type(table: str, column: str) -> str:
+    """Declared type of a column, e.g. 'vector(1536)' or 'halfvec(1536)'"""
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = CAST(:table AS regclass) AND attname = :column"
+        ),
+        {"table": table, "column": column}
+    ).scalar() or ''
+
+
+def upgrade() -> None:
+    storage = os.getenv('EMBEDDING_STORAGE', 'vector').lower()
+    supports_halfvec = _pgvector_version() >= (0, 7)
+
+    if storage == 'halfvec' and not supports_halfvec:
+        logger.warning(
+            "EMBEDDING_STORAGE=halfvec needs pgvector >= 0.7.0 - keeping vector(1536) columns. "
+            "Set EMBEDDING_STORAGE=vector until the extension is updated (ALTER EXTENSION vector UPDATE)."
+        )
+        storage = 'vector'
+
+    if storage == 'halfvec':
+        for table, column, index_name in EMBEDDING_COLUMNS:
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+            op.execute(
+                f'ALTER TABLE {table} ALTER COLUMN {column} '
+                f'TYPE halfvec(1536) USING {column}::halfvec(1536)'
+            )
+            op.execute(
+                f'CREATE INDEX {index_name} ON {table} '
+                f'USING hnsw ({column} halfvec_cosine_ops) {HNSW_PARAMS}'
+            )
+    else:
+        op.execute(
+            'CREATE INDEX IF NOT EXISTS ix_product_intelligence_embedding_hnsw ON product_intelligence '
+            f'USING hnsw (intelligence_embedding vector_cosine_ops) {HNSW_PARAMS}'
+        )
+
+    if supports_halfvec:
+        op.execute(
+            'CREATE INDEX IF NOT EXISTS ix_knowledge_chunks_embedding_bq_hnsw ON knowledge_chunks '
+            f'USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops) {HNSW_PARAMS}'
+        )
+    else:
+        logger.warning("pgvector < 0.7.0 - skipping the binary-quantized index (RAG_VECTOR_SEARCH=binary unavailable)")
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_knowledge_chunks_embedding_bq_hnsw')
+
+    for table, column, index_name in EMBEDDING_COLUMNS:
+        if table == 'product_intelligence':
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+        if not _column_type(table, column).startswith('halfvec'):
+            continue
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+        op.execute(
+            f'ALTER TABLE {table} ALTER COLUMN {column} '
+            f'TYPE vector(1536) USING {column}::vector(1536)'
+        )
+        if table != 'product_intelligence':
+            op.execute(
+                f'CREATE INDEX {index_name} ON {table} '
+                f'USING hnsw ({column} vector_cosine_ops) {HNSW_PARAMS}'
+            )
@@ -0,0 +1,44 @@
+"""Add research_cache table
+
+Revision ID: 046
+Revises: 045
+Create Date: 2026-01-19 10:00:00.000000
+
+Changes:
+- Add research_cache table keyed by sha256(source_type + normalized query) so
+  PubMed/Semantic Scholar/Tavily results survive restarts and are shared by
+  every worker (replaces the per-process ResearchCache dict)
+- Index expires_at (pruning) and created_at (size-based eviction)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '046'
+down_revision = '045'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'research_cache',
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('source_type', sa.String(length=50), nullable=False),
+        sa.Column('query', sa.Text(), nullable=False),
+        sa.Column('results', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('result_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('cache_key')
+    )
+
+    op.create_index('ix_research_cache_expires_at', 'research_cache', ['expires_at'], unique=False)
+    op.create_index('idx_research_cache_created_at', 'research_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_research_cache_created_at', table_name='research_cache')
+    op.drop_index('ix_research_cache_expires_at', table_name='research_cache')
+    op.drop_table('research_cache')
@@ -0,0 +1,35 @@
+"""Add image_classifications table
+
+Revision ID: 047
+Revises: 046
+Create Date: 2026-01-20 10:00:00.000000
+
+Changes:
+- Add image_classifications table keyed by (image SHA-256, model) so Claude
+  Vision classifications of sales-page images survive restarts and are shared
+  by every worker, recompile and product using the same image
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '047'
+down_revision = '046'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'image_classifications',
+        sa.Column('image_sha256', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('classification', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('image_sha256', 'model')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('image_classifications')
@@ -9,7 +9,7 @@ import json
 
 from app.db.session import get_db
 from app.api.auth import get_current_active_user  # FIXED: use existing dependency
-from app.services.ai_router import ai_router
+from app.services.provider_health import provider_health_registry
 
 router = APIRouter(prefix="/api/admin/ai-router", tags=["Admin - AI Router"])
 
@@ -116,7 +116,23 @@ async def update_config(
 
 @router.get("/health", dependencies=[Depends(admin_guard)])
 async def health_snapshot():
-    items = []
-    for (name, model), (ok, ts) in ai_router.health.items():
-        items.append({"provider": name, "model": model, "ok": bool(ok), "last_change_ts": ts})
-    return {"health": items}
\ No newline at end of file
+    """
+    Read-only view of the shared provider health registry.
+    Covers text, embedding and image-editing providers (one registry per worker).
+    """
+    return {"health": provider_health_registry.snapshot()}
+
+@router.get("/embeddings/metrics", dependencies=[Depends(admin_guard)])
+async def embedding_metrics():
+    """Embedding micro-batcher and cache metrics for this worker."""
+    from app.services.embeddings_router import embedding_batcher, embedding_router_service
+    return {
+        "batcher": embedding_batcher.get_metrics(),
+        "cache": embedding_router_service.cache.get_stats(),
+    }
+
+@router.get("/http/metrics", dependencies=[Depends(admin_guard)])
+async def outbound_http_metrics():
+    """Outbound HTTP pool metrics (connection reuse, HTTP/2, politeness waits) for this worker."""
+    from app.services.outbound_http import outbound_http
+    return outbound_http.get_stats()
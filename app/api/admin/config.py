@@ -7,7 +7,7 @@ from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select, text, func
 from datetime import datetime
 
 from app.models.admin_settings import AdminSettings, TierConfig, AIProviderConfig
@@ -542,15 +542,14 @@ async def update_content_lengths(content_lengths: Dict[str, Dict[str, int]]):
 @router.get("/metrics")
 async def get_admin_metrics(db: AsyncSession = Depends(get_db)):
     """Get usage metrics for admin dashboard"""
-    tier_count_result = await db.execute(
-        select(TierConfig).where(TierConfig.is_active == True)
-    )
-    tier_count = len(tier_count_result.scalars().all())
-
-    provider_count_result = await db.execute(
-        select(AIProviderConfig).where(AIProviderConfig.is_active == True)
+    # Both counts in one round-trip, without loading config rows
+    counts_result = await db.execute(
+        select(
+            select(func.count(TierConfig.id)).where(TierConfig.is_active == True).scalar_subquery(),
+            select(func.count(AIProviderConfig.id)).where(AIProviderConfig.is_active == True).scalar_subquery()
+        )
     )
-    active_provider_count = len(provider_count_result.scalars().all())
+    tier_count, active_provider_count = counts_result.one()
 
     result = await db.execute(select(AdminSettings).limit(1))
     config = result.scalar_one_or_none()
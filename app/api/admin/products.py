@@ -4,7 +4,7 @@ Admin endpoints for product library management
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from typing import Dict, Any
 import logging
 
@@ -162,13 +162,20 @@ async def get_metadata_status(
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    result = await db.execute(select(ProductIntelligence))
-    products = result.scalars().all()
-
-    total = len(products)
-    with_name = sum(1 for p in products if p.product_name and p.product_name != "Unknown Product")
-    with_category = sum(1 for p in products if p.product_category and p.product_category != "uncategorized")
-    with_thumbnail = sum(1 for p in products if p.thumbnail_image_url)
+    # Single aggregate - avoids loading intelligence_data and embeddings for every product
+    result = await db.execute(
+        select(
+            func.count(ProductIntelligence.id),
+            func.count(ProductIntelligence.id).filter(
+                ProductIntelligence.product_name.notin_(["", "Unknown Product"])
+            ),
+            func.count(ProductIntelligence.id).filter(
+                ProductIntelligence.product_category.notin_(["", "uncategorized"])
+            ),
+            func.count(ProductIntelligence.id).filter(ProductIntelligence.thumbnail_image_url != "")
+        )
+    )
+    total, with_name, with_category, with_thumbnail = result.one()
 
     return {
         "total_products": total,
@@ -184,12 +191,16 @@ async def get_metadata_status(
 @router.post("/{product_id}/compile", response_model=Dict[str, Any])
 async def recompile_product_intelligence(
     product_id: int,
+    full_recompile: bool = True,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Force recompilation of intelligence for an existing product.
 
+    Every stage is rerun by default; pass full_recompile=false to reuse the
+    output of stages whose part of the sales page hasn't changed.
+
     Available to:
     - Admins (all products)
     - Product Developers (their own products only)
@@ -245,7 +256,8 @@ async def recompile_product_intelligence(
                 'scrape_images': True,
                 'max_images': 10,
                 'enable_rag': True,
-                'force_recompile': True  # Force recompilation
+                'force_recompile': True,  # Force recompilation
+                'full_recompile': full_recompile
             }
         )
 
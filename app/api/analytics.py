@@ -77,13 +77,13 @@ async def get_developer_analytics(
         }
 
     links_result = await db.execute(
-        select(ShortenedLink).where(
+        select(ShortenedLink.id).where(
             ShortenedLink.campaign_id.in_(campaign_ids)
-        )
+        ).limit(1)
     )
-    links = links_result.scalars().all()
+    has_links = links_result.scalar_one_or_none() is not None
 
-    if not links:
+    if not has_links:
         return {
             "products": products,
             "total_affiliates": len(set(c.user_id for c in campaigns)),
@@ -103,19 +103,34 @@ async def get_developer_analytics(
             ]
         }
 
-    link_ids = [l.id for l in links]
+    # Click totals and per-product click counts are aggregated in SQL (click rows are never loaded)
+    scoped_clicks = (
+        select(LinkClick.id, LinkClick.ip_address, Campaign.product_intelligence_id)
+        .join(ShortenedLink, LinkClick.shortened_link_id == ShortenedLink.id)
+        .join(Campaign, ShortenedLink.campaign_id == Campaign.id)
+        .where(ShortenedLink.campaign_id.in_(campaign_ids))
+        .subquery()
+    )
 
-    # Get all clicks for these links
-    clicks_result = await db.execute(
-        select(LinkClick).where(
-            LinkClick.shortened_link_id.in_(link_ids)
+    totals_result = await db.execute(
+        select(
+            func.count(scoped_clicks.c.id),
+            func.count(distinct(scoped_clicks.c.ip_address))
         )
     )
-    clicks = clicks_result.scalars().all()
-
-    # Calculate unique visitors (by IP address)
-    unique_visitors = len(set(click.ip_address for click in clicks if click.ip_address))
-    total_clicks = len(clicks)
+    total_clicks, unique_visitors = totals_result.one()
+
+    per_product_result = await db.execute(
+        select(
+            scoped_clicks.c.product_intelligence_id,
+            func.count(scoped_clicks.c.id),
+            func.count(distinct(scoped_clicks.c.ip_address))
+        ).group_by(scoped_clicks.c.product_intelligence_id)
+    )
+    clicks_by_product = {
+        product_id: (total, unique)
+        for product_id, total, unique in per_product_result.all()
+    }
 
     # Get unique affiliates
     unique_affiliates = len(set(c.user_id for c in campaigns))
@@ -124,11 +139,7 @@ async def get_developer_analytics(
     product_performance = []
     for product in products:
         product_campaigns = [c for c in campaigns if c.product_intelligence_id == product.id]
-        product_link_ids = [l.id for l in links if l.campaign_id in [c.id for c in product_campaigns]]
-
-        product_clicks = [click for click in clicks if click.shortened_link_id in product_link_ids]
-        product_total_clicks = len(product_clicks)
-        product_unique_clicks = len(set(click.ip_address for click in product_clicks if click.ip_address))
+        product_total_clicks, product_unique_clicks = clicks_by_product.get(product.id, (0, 0))
         product_affiliates = len(set(c.user_id for c in product_campaigns))
 
         product_performance.append({
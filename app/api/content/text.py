@@ -26,6 +26,7 @@ from app.services.prompt_builder import PromptBuilder
 from app.services.compliance_checker import ComplianceChecker
 from app.services.video_template_engine import generate_video_script
 from app.services.usage_limits import get_effective_tier, check_usage_limit, increment_usage
+from app.services.context_pack import context_pack_cache, flatten_keywords
 
 router = APIRouter(prefix="/api/content", tags=["content"])
 logger = logging.getLogger(__name__)
@@ -354,27 +355,21 @@ async def generate_content(
             detail="Campaign not found"
         )
     
-    # Retrieve context from RAG (optional - returns empty list if no knowledge base exists)
-    # Use keywords to build a more targeted query if keywords are provided
-    query_text = f"{request.content_type} for {campaign.name}"
-    if request.keywords:
-        # Add selected keywords to the query for better context retrieval
-        all_keywords = []
-        for category, keywords in request.keywords.items():
-            if keywords:
-                all_keywords.extend(keywords)
-        if all_keywords:
-            query_text += f" - keywords: {', '.join(all_keywords)}"
-
-    try:
-        context = await rag_service.retrieve_context(
-            query=query_text,
-            user_id=current_user.id,
-            top_k=5
-        )
-    except Exception as e:
-        logger.warning(f"RAG context retrieval failed (continuing without context): {e}")
-        context = []
+    # Generation context (RAG passages + keyword-filtered intelligence), cached per
+    # (campaign, content type, keyword selection) until intelligence is recompiled
+    all_selected_keywords = flatten_keywords(request.keywords)
+    if all_selected_keywords:
+        logger.info(f"Filtering intelligence data with keywords: {all_selected_keywords}")
+
+    context_pack = await context_pack_cache.get_or_build(
+        campaign=campaign,
+        content_type=content_type_key,
+        keywords=all_selected_keywords,
+        rag_service=rag_service,
+        user_id=current_user.id
+    )
+    context = context_pack.rag_passages
+    context_text = context_pack.context_text
 
     # Build product info from campaign
     # Transform campaign fields to match prompt builder expectations
@@ -409,94 +404,6 @@ async def generate_content(
     if campaign.product_type and "local" in campaign.product_type.lower():
         product_info["price"] = None  # Can be added later if needed
 
-    # Build prompt
-    # Format context for additional_context parameter
-    context_text = "\n".join([f"- {c.get('text', '')}" for c in context]) if context else None
-
-    # Extract keywords from request for filtering intelligence
-    all_selected_keywords = []
-    if request.keywords:
-        for category, keywords in request.keywords.items():
-            if keywords:
-                all_selected_keywords.extend(keywords)
-        logger.info(f"Filtering intelligence data with keywords: {all_selected_keywords}")
-
-    # If no RAG context but we have intelligence data, use it
-    # Check both campaign.intelligence_data (legacy) and campaign.product_intelligence.intelligence_data (current)
-    intelligence_data = None
-    if campaign.intelligence_data:
-        # Legacy: Intelligence stored directly on campaign
-        logger.info("Using legacy campaign intelligence data")
-        intelligence_data = campaign.intelligence_data
-    elif campaign.product_intelligence and campaign.product_intelligence.intelligence_data:
-        # Current: Intelligence stored in ProductIntelligence table
-        logger.info("Using product intelligence data from shared library")
-        intelligence_data = campaign.product_intelligence.intelligence_data
-    else:
-        logger.warning(f"No intelligence data available for campaign {campaign.name}")
-
-    if not context_text and intelligence_data:
-        if isinstance(intelligence_data, dict):
-            # Convert intelligence to readable format
-            intel_parts = []
-            intel = intelligence_data
-
-            # Filter intelligence based on keywords if provided
-            def contains_keywords(text, keywords):
-                """Check if text contains any of the keywords"""
-                if not keywords:
-                    return True
-                text_lower = text.lower()
-                return any(keyword.lower() in text_lower for keyword in keywords)
-
-            if intel.get("product_analysis"):
-                analysis = intel["product_analysis"]
-                if analysis.get("key_points"):
-                    # Filter key points by keywords
-                    filtered_key_points = [p for p in analysis["key_points"] if contains_keywords(p, all_selected_keywords)]
-                    if filtered_key_points:
-                        intel_parts.append("Key Product Points:\n" + "\n".join([f"- {p}" for p in filtered_key_points]))
-                    elif not all_selected_keywords:  # No keywords, show all
-                        intel_parts.append("Key Product Points:\n" + "\n".join([f"- {p}" for p in analysis["key_points"]]))
-
-            # Filter competitor insights by keywords
-            if intel.get("competitor_insights"):
-                competitor_text = str(intel["competitor_insights"])
-                if contains_keywords(competitor_text, all_selected_keywords):
-                    intel_parts.append("Competitor Insights:\n" + competitor_text)
-
-            # Filter market positioning by keywords
-            if intel.get("market_positioning"):
-                positioning_text = str(intel["market_positioning"])
-                if contains_keywords(positioning_text, all_selected_keywords):
-                    intel_parts.append("Market Positioning:\n" + positioning_text)
-
-            # Filter benefits, features, pain points by keywords if they exist in intelligence
-            if intel.get("product") and isinstance(intel["product"], dict):
-                product = intel["product"]
-
-                # Filter benefits
-                if product.get("benefits") and isinstance(product["benefits"], list):
-                    filtered_benefits = [b for b in product["benefits"] if contains_keywords(b, all_selected_keywords)]
-                    if filtered_benefits:
-                        intel_parts.append("Product Benefits:\n" + "\n".join([f"- {b}" for b in filtered_benefits]))
-
-                # Filter features
-                if product.get("features") and isinstance(product["features"], list):
-                    filtered_features = [f for f in product["features"] if contains_keywords(f, all_selected_keywords)]
-                    if filtered_features:
-                        intel_parts.append("Product Features:\n" + "\n".join([f"- {f}" for f in filtered_features]))
-
-                # Filter pain points
-                if product.get("pain_points") and isinstance(product["pain_points"], list):
-                    filtered_pain_points = [p for p in product["pain_points"] if contains_keywords(p, all_selected_keywords)]
-                    if filtered_pain_points:
-                        intel_parts.append("Pain Points Addressed:\n" + "\n".join([f"- {p}" for p in filtered_pain_points]))
-
-            context_text = "\n\n".join(intel_parts)
-            if not context_text and all_selected_keywords:
-                logger.warning(f"No intelligence data matched keywords: {all_selected_keywords}")
-
     # Convert length string to word count based on content type
     length_to_words_by_type = {
         "article": {"short": 300, "medium": 600, "long": 1200},
@@ -553,13 +460,6 @@ async def generate_content(
     logger.info(f"[VIDEO DEBUG] Final word_count = {word_count}")
 
     # Build prompt with email sequence support
-    # Extract all selected keywords for the prompt constraints
-    all_selected_keywords = []
-    if request.keywords:
-        for category, keywords in request.keywords.items():
-            if keywords:
-                all_selected_keywords.extend(keywords)
-
     # For video scripts, use only keywords if provided (no intelligence data)
     # Check if content_type is video_script
     from app.schemas import ContentType
@@ -788,7 +688,7 @@ async def generate_content(
                 "metadata": {
                     "prompt": prompt,
                     "model": ai_router.last_used_model,
-                    "context_sources": [c.get("source") for c in context],
+                    "context_sources": [c.get("source_url") for c in context],
                     "generation_time": datetime.utcnow().isoformat(),
                     "sequence_type": request.sequence_type,
                     "total_emails": request.num_emails,
@@ -903,7 +803,7 @@ async def generate_content(
         "metadata": {
             "prompt": prompt,
             "model": ai_router.last_used_model,
-            "context_sources": [c.get("source") for c in context],
+            "context_sources": [c.get("source_url") for c in context],
             "generation_time": datetime.utcnow().isoformat(),
             "keywords_used": request.keywords
         }
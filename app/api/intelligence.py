@@ -30,6 +30,7 @@ class CompileIntelligenceRequest(BaseModel):
     max_images: int = 10
     enable_rag: bool = True
     force_recompile: bool = False
+    full_recompile: bool = False  # With force_recompile: rerun every stage even if the page is unchanged
 
 
 class CompileIntelligenceResponse(BaseModel):
@@ -108,7 +109,8 @@ async def compile_campaign_intelligence(
             'scrape_images': request.scrape_images,
             'max_images': request.max_images,
             'enable_rag': request.enable_rag,
-            'force_recompile': request.force_recompile
+            'force_recompile': request.force_recompile,
+            'full_recompile': request.full_recompile
         }
     )
 
@@ -415,14 +417,21 @@ async def query_rag(
     # Retrieve context
     context = await rag_service.retrieve_context(
         query=request.query,
+        user_id=current_user.id,
         campaign_id=request.campaign_id,
-        limit=request.limit or 5
+        top_k=request.top_k,
+        mode=request.mode
+    )
+    
+    context_used = "\n".join(
+        f"[Source: {entry.get('source_type') or 'unknown'}]\n{entry['content']}\n"
+        for entry in context
     )
     
     return RAGQueryResponse(
         query=request.query,
         results=context,
-        count=len(context)
+        context_used=context_used
     )
 
 
@@ -430,26 +439,21 @@ async def query_rag(
 async def delete_knowledge_base_entry(
     entry_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    rag_service: RAGService = Depends(get_rag_service)
 ):
-    """Delete a knowledge base entry."""
-    result = await db.execute(
-        select(KnowledgeBase).where(
-            KnowledgeBase.id == entry_id,
-            KnowledgeBase.user_id == current_user.id
-        )
+    """Delete a knowledge base entry (own campaign notes, or research of own products)."""
+    deleted = await rag_service.delete_knowledge_base_entry(
+        entry_id=entry_id,
+        user_id=current_user.id,
+        is_admin=current_user.role == "admin"
     )
-    entry = result.scalar_one_or_none()
 
-    if not entry:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Knowledge base entry not found"
         )
 
-    await db.delete(entry)
-    await db.commit()
-
     return None
 
 
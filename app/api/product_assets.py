@@ -338,26 +338,30 @@ async def get_asset_stats(
             detail="Campaign not found or access denied"
         )
     
-    # Get all assets
+    # Aggregate per view angle in SQL (one row per angle, never the asset rows)
     result = await db.execute(
-        select(ProductAsset).where(ProductAsset.campaign_id == campaign_id)
+        select(
+            ProductAsset.view_angle,
+            func.count(ProductAsset.id).label("assets"),
+            func.count(ProductAsset.id).filter(ProductAsset.has_transparency == True).label("transparent"),
+            func.count(ProductAsset.id).filter(ProductAsset.is_featured == True).label("featured"),
+            func.coalesce(func.sum(ProductAsset.times_used), 0).label("uses")
+        )
+        .where(ProductAsset.campaign_id == campaign_id)
+        .group_by(ProductAsset.view_angle)
     )
-    assets = result.scalars().all()
+    angle_rows = result.all()
     
-    total_assets = len(assets)
-    transparent_assets = sum(1 for a in assets if a.has_transparency)
-    featured_assets = sum(1 for a in assets if a.is_featured)
-    total_uses = sum(a.times_used for a in assets)
+    total_assets = sum(row.assets for row in angle_rows)
+    transparent_assets = sum(row.transparent for row in angle_rows)
+    featured_assets = sum(row.featured for row in angle_rows)
+    total_uses = int(sum(row.uses for row in angle_rows))
     
     # Get unique view angles
-    unique_angles = len(set(a.view_angle for a in assets if a.view_angle))
+    angle_usage = {row.view_angle: int(row.uses) for row in angle_rows if row.view_angle}
+    unique_angles = len(angle_usage)
     
     # Find most used angle
-    angle_usage = {}
-    for asset in assets:
-        if asset.view_angle:
-            angle_usage[asset.view_angle] = angle_usage.get(asset.view_angle, 0) + asset.times_used
-    
     most_used_angle = max(angle_usage, key=angle_usage.get) if angle_usage else None
     
     # Calculate quality score
@@ -1389,12 +1389,19 @@ async def get_developer_analytics(
         )
     
     # Get all products created by this user
+    # Only the columns the dashboard needs (not the full intelligence_data blob or embedding)
     result = await db.execute(
-        select(ProductIntelligence).where(
+        select(
+            ProductIntelligence.id,
+            ProductIntelligence.product_name,
+            ProductIntelligence.product_category,
+            ProductIntelligence.times_used,
+            ProductIntelligence.intelligence_data["compliance"].label("compliance")
+        ).where(
             ProductIntelligence.created_by_user_id == current_user.id
         )
     )
-    products = result.scalars().all()
+    products = result.all()
     
     # Calculate basic stats
     total_products = len(products)
@@ -1407,8 +1414,8 @@ async def get_developer_analytics(
     not_checked_count = 0
 
     for p in products:
-        if p.intelligence_data and "compliance" in p.intelligence_data:
-            status = p.intelligence_data["compliance"].get("status")
+        if p.compliance is not None:
+            status = p.compliance.get("status")
             if status == "compliant":
                 compliant_count += 1
             elif status == "warning":
@@ -1421,8 +1428,8 @@ async def get_developer_analytics(
     # Visibility stats (compliant products are visible to affiliates)
     visible_to_affiliates = 0
     for p in products:
-        if p.intelligence_data and "compliance" in p.intelligence_data:
-            comp = p.intelligence_data["compliance"]
+        if p.compliance is not None:
+            comp = p.compliance
             if comp.get("status") == "compliant" or comp.get("score", 0) >= 90:
                 visible_to_affiliates += 1
     
@@ -1434,8 +1441,8 @@ async def get_developer_analytics(
             "product_name": p.product_name,
             "times_used": p.times_used,
             "category": p.product_category,
-            "compliance_status": p.intelligence_data.get("compliance", {}).get("status") if p.intelligence_data and "compliance" in p.intelligence_data else None,
-            "compliance_score": p.intelligence_data.get("compliance", {}).get("score") if p.intelligence_data and "compliance" in p.intelligence_data else None
+            "compliance_status": p.compliance.get("status") if p.compliance is not None else None,
+            "compliance_score": p.compliance.get("score") if p.compliance is not None else None
         }
         for p in top_products
     ]
@@ -1456,11 +1463,10 @@ async def get_developer_analytics(
         {
             "id": p.id,
             "product_name": p.product_name,
-            "issue": "Not checked for compliance" if not (p.intelligence_data and "compliance" in p.intelligence_data) else f"Violation (Score: {p.intelligence_data['compliance'].get('score', 0)})"
+            "issue": "Not checked for compliance" if p.compliance is None else f"Violation (Score: {p.compliance.get('score', 0)})"
         }
         for p in products
-        if not (p.intelligence_data and "compliance" in p.intelligence_data) or
-           (p.intelligence_data.get("compliance", {}).get("status") == "violation")
+        if p.compliance is None or p.compliance.get("status") == "violation"
     ]
     
     return {
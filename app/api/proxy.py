@@ -3,6 +3,8 @@ import httpx
 import logging
 import os
 
+from app.services.outbound_http import outbound_http
+
 logger = logging.getLogger(__name__)
 
 # R2 public URL base
@@ -32,22 +34,21 @@ async def proxy_image(
             full_url = f"{R2_PUBLIC_URL}{url}"
             logger.info(f"Constructed full URL from path: {full_url}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(full_url)
-            response.raise_for_status()
-
-            content_type = response.headers.get("content-type", "image/png")
-
-            return Response(
-                content=response.content,
-                media_type=content_type,
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, OPTIONS",
-                    "Access-Control-Allow-Headers": "*",
-                    "Cache-Control": "public, max-age=31536000",
-                }
-            )
+        response = await outbound_http.get(full_url, purpose="proxy")
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "image/png")
+
+        return Response(
+            content=response.content,
+            media_type=content_type,
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Methods": "GET, OPTIONS",
+                "Access-Control-Allow-Headers": "*",
+                "Cache-Control": "public, max-age=31536000",
+            }
+        )
     except httpx.HTTPError as e:
         logger.error(f"Failed to proxy image: {e}")
         raise HTTPException(status_code=400, detail=f"Failed to load image: {str(e)}")
@@ -52,6 +52,33 @@ class Settings(BaseSettings):
 
     # ==== RAG & SEARCH ====
     TAVILY_API_KEY: Optional[str] = None  # $1 per 1,000 searches
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 2000  # Hot LRU size (~6 KB per 1536-dim vector)
+    COHERE_EMBED_MAX_CONCURRENCY: int = 4  # Worker threads for the sync Cohere SDK
+    EMBEDDING_BATCHING_ENABLED: bool = True  # Coalesce concurrent single-text embeddings
+    EMBEDDING_BATCH_MAX_ITEMS: int = 96
+    EMBEDDING_BATCH_WAIT_MS: float = 5.0
+    RAG_CHUNK_MAX_TOKENS: int = 300  # Target tokens per knowledge chunk
+    RAG_CHUNK_OVERLAP_TOKENS: int = 50
+    TIKTOKEN_CACHE_DIR: Optional[str] = ".tiktoken_cache"  # BPE files fetched at build time (see railway.json)
+    RAG_RETRIEVAL_MODE: str = "hybrid"  # vector | lexical | hybrid (reciprocal-rank fusion)
+    EMBEDDING_STORAGE: str = "vector"  # vector | halfvec (float16, pgvector >= 0.7; columns converted by migration 045)
+    RAG_VECTOR_SEARCH: str = "halfvec"  # halfvec | binary (bit-quantized shortlist + cosine re-rank)
+    RAG_BINARY_RERANK_FACTOR: int = 4  # Shortlist size multiplier for binary search
+    CONTEXT_PACK_TTL_SECONDS: int = 3600  # Cached generation context per campaign + keyword selection
+    CONTEXT_PACK_MAX_ITEMS: int = 500
+    RESEARCH_MAX_CONCURRENCY: int = 8  # Concurrent research searches per compilation
+    NCBI_API_KEY: Optional[str] = None
+    NCBI_REQUESTS_PER_SECOND: float = 3.0  # 10/s with an NCBI API key
+    SEMANTIC_SCHOLAR_REQUESTS_PER_SECOND: float = 0.33  # 100 requests / 5 minutes unauthenticated
+    TAVILY_REQUESTS_PER_SECOND: float = 5.0
+    TAVILY_BURST: int = 5
+    TAVILY_CACHE_TTL_SECONDS: int = 21600  # Normalized-query response cache
+    TAVILY_CACHE_MAX_ITEMS: int = 1000
+    RESEARCH_CACHE_MEMORY_ITEMS: int = 1000  # Hot LRU in front of the research_cache table
+    RESEARCH_CACHE_MAX_ROWS: int = 50000
+    RESEARCH_CACHE_SCHOLARLY_TTL_HOURS: int = 720  # Published papers rarely change
+    RESEARCH_CACHE_WEB_TTL_HOURS: int = 168
 
     # ==== MEDIA GENERATION ====
     STABILITY_API_KEY: str
@@ -77,6 +104,25 @@ class Settings(BaseSettings):
     AI_MONITORING_ENABLED: bool = True
     AI_MONITORING_INTERVAL_MINUTES: int = 60
     INTELLIGENCE_ANALYSIS_ENABLED: bool = True
+    COMPILE_SINGLEFLIGHT_WAIT_SECONDS: int = 600  # Max wait for an in-flight compile of the same URL
+    HTML_PARSE_PROCESSES: int = 2  # Process pool for parsing large pages off the event loop
+    HTML_PARSE_PROCESS_THRESHOLD_BYTES: int = 500000  # Smaller pages are parsed in a thread
+    IMAGE_CANDIDATE_MULTIPLIER: int = 3  # Candidates downloaded per requested sales-page image
+    IMAGE_DEDUPE_MAX_DISTANCE: int = 6  # Perceptual-hash bit distance treated as the same image
+    VISION_MAX_CONCURRENCY: int = 4  # Concurrent Claude Vision image classifications per worker
+    VISION_CACHE_MEMORY_ITEMS: int = 2000  # Hot LRU in front of the image_classifications table
+    DNA_MAX_STYLESHEETS: int = 3  # Linked stylesheets analyzed per page for brand colors
+    DNA_STYLESHEET_CONCURRENCY: int = 3
+    DNA_STYLESHEET_CACHE_TTL_SECONDS: int = 86400  # Then revalidated with ETag / Last-Modified
+    DNA_STYLESHEET_CACHE_MAX_ITEMS: int = 500
+
+    # ==== OUTBOUND HTTP ====
+    OUTBOUND_HTTP2_ENABLED: bool = True  # Used when the h2 package is installed
+    OUTBOUND_HTTP_MAX_CONNECTIONS: int = 100
+    OUTBOUND_HTTP_MAX_KEEPALIVE: int = 20
+    OUTBOUND_HTTP_KEEPALIVE_SECONDS: int = 30
+    OUTBOUND_HTTP_PER_HOST_CONNECTIONS: int = 6
+    OUTBOUND_HTTP_HOST_DELAY_MS: int = 250  # Politeness delay between page/stylesheet requests to one host
 
     # ==== CREDITS & LIMITS ====
     CREDIT_ENFORCEMENT_ENABLED: bool = True
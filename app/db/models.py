@@ -1,12 +1,16 @@
 # app/db/models.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, ARRAY, Date, Boolean, UniqueConstraint
-from sqlalchemy.dialects.postgresql import JSONB, INET
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, ARRAY, Date, Boolean, UniqueConstraint, Computed
+from sqlalchemy.dialects.postgresql import JSONB, INET, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import Vector, HALFVEC
 
+from app.core.config.settings import settings
 from app.db.session import Base
 
+# Embedding column type - must match the columns migration 045 left in place
+EMBEDDING_TYPE = HALFVEC if getattr(settings, "EMBEDDING_STORAGE", "vector") == "halfvec" else Vector
+
 # ============================================================================
 # USER MODEL
 # ============================================================================
@@ -100,7 +104,8 @@ class ProductIntelligence(Base):
 
     # RAG embedding (Cohere embed-english-v3.0: 1536 dimensions)
     # Note: Aligned with EMBEDDING_CONFIG in constants.py
-    intelligence_embedding = Column(Vector(1536), nullable=True)
+    # halfvec (float16) with EMBEDDING_STORAGE=halfvec - half the heap and HNSW index size of vector(1536)
+    intelligence_embedding = Column(EMBEDDING_TYPE(1536), nullable=True)
 
     # Metadata
     compiled_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -407,14 +412,98 @@ class KnowledgeBase(Base):
     product_intelligence_id = Column(Integer, ForeignKey("product_intelligence.id", ondelete="CASCADE"), nullable=False, index=True)
     campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="SET NULL"), nullable=True, index=True)  # Optional: for campaign-specific notes
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(1536), nullable=True)  # Cohere embed-english-v3.0 with 1536 dimensions
+    embedding = Column(EMBEDDING_TYPE(1536), nullable=True)  # Cohere embed-english-v3.0 with 1536 dimensions
     meta_data = Column("metadata", JSONB, nullable=True)  # Python: meta_data, DB: metadata
     source_url = Column(Text, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of content for document-level dedupe
+    chunk_count = Column(Integer, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     product_intelligence = relationship("ProductIntelligence", back_populates="knowledge_base")
     campaign = relationship("Campaign", back_populates="knowledge_base")
+    chunks = relationship("KnowledgeChunk", back_populates="document", cascade="all, delete-orphan", order_by="KnowledgeChunk.ordinal")
+
+
+class KnowledgeChunk(Base):
+    """
+    Passage-level slice of a KnowledgeBase document with its own vector.
+    RAG retrieval ranks chunks (not whole documents) so prompts carry only relevant passages.
+    """
+    __tablename__ = "knowledge_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    knowledge_base_id = Column(Integer, ForeignKey("knowledge_base.id", ondelete="CASCADE"), nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False)  # Position of the chunk within the document
+    content = Column(Text, nullable=False)
+    embedding = Column(EMBEDDING_TYPE(1536), nullable=True)
+    token_count = Column(Integer, nullable=True)
+    # Full-text index for lexical retrieval (exact ingredient/product names, dosages)
+    content_tsv = Column(TSVECTOR, Computed("to_tsvector('english', content)", persisted=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relationships
+    document = relationship("KnowledgeBase", back_populates="chunks")
+
+    __table_args__ = (
+        UniqueConstraint('knowledge_base_id', 'ordinal', name='uq_knowledge_chunks_document_ordinal'),
+    )
+
+# ============================================================================
+# EMBEDDING CACHE MODEL
+# ============================================================================
+
+class EmbeddingCache(Base):
+    """
+    Persistent embedding cache keyed by (content_hash, model, dimensions, input_type).
+    Lets identical product descriptions, research abstracts and repeated RAG queries
+    skip paid provider calls. See app/services/embedding_cache.py.
+    """
+    __tablename__ = "embedding_cache"
+
+    content_hash = Column(String(64), primary_key=True)  # SHA-256 of the embedded text
+    model = Column(String(100), primary_key=True)  # "openai:text-embedding-3-large", "cohere:embed-english-v3.0"
+    dimensions = Column(Integer, primary_key=True)
+    input_type = Column(String(50), primary_key=True)  # search_document, search_query, ...
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+# ============================================================================
+# RESEARCH CACHE MODEL
+# ============================================================================
+
+class ResearchCacheEntry(Base):
+    """
+    Persistent research search cache keyed by sha256(source_type + normalized query).
+    Lets recompilations and shared ingredients skip PubMed/Semantic Scholar/Tavily
+    calls. See app/services/rag/research_cache.py.
+    """
+    __tablename__ = "research_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    source_type = Column(String(50), nullable=False)  # scholarly, web
+    query = Column(Text, nullable=False)  # Normalized query
+    results = Column(JSONB, nullable=False)
+    result_count = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+# ============================================================================
+# IMAGE CLASSIFICATION CACHE MODEL
+# ============================================================================
+
+class ImageClassification(Base):
+    """
+    Persistent Claude Vision classification cache keyed by (image SHA-256, model).
+    Lets recompiles and images shared across products skip vision calls.
+    See app/services/image_classification_cache.py.
+    """
+    __tablename__ = "image_classifications"
+
+    image_sha256 = Column(String(64), primary_key=True)  # SHA-256 of the image bytes
+    model = Column(String(100), primary_key=True)
+    classification = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 # ============================================================================
 # MEDIA ASSETS MODEL
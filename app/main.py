@@ -13,6 +13,10 @@ import logging
 
 from app.core.config.settings import settings
 from app.db.session import engine, Base
+from app.services.html_document import shutdown_parse_pool
+from app.services.outbound_http import outbound_http
+from app.services.rag.intelligent_rag import rag_system
+from app.services.text_chunker import preload_encoding
 from app.api import auth, campaigns, intelligence, video, compliance, products, links, product_analytics, platform_credentials, overlays, email_signups, tracking
 from app.api.content import text_router, images_router, unified_content_router, prompt_generator_router
 from app.api.content.video_overlay import router as video_overlay_router
@@ -76,6 +80,9 @@ async def lifespan(app: FastAPI):
         logger.info(f"✅ JWT_SECRET_KEY loaded from environment (preview: {jwt_key_preview})")
     logger.info(f"✅ Token expiration: {settings.ACCESS_TOKEN_EXPIRE_MINUTES} minutes ({settings.ACCESS_TOKEN_EXPIRE_MINUTES // 60} hours)")
 
+    await outbound_http.start()
+    await preload_encoding()
+
     logger.info("Blitz API started successfully")
     logger.info("Use 'python migrate.py upgrade' to apply database migrations")
 
@@ -83,7 +90,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Blitz API...")
+    await outbound_http.aclose()
+    await rag_system.scholarly.pubmed.aclose()
+    await rag_system.web.tavily.aclose()
     await engine.dispose()
+    shutdown_parse_pool()
     logger.info("Blitz API shut down successfully")
 
 # ====
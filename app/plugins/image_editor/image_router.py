@@ -44,6 +44,8 @@ from app.services.ai_platform_router import (
     AIOperation
 )
 
+from app.services.provider_health import provider_health_registry
+
 # Import AI service providers
 from app.services.stability_service import StabilityAIService
 from app.services.replicate_service import ReplicateService
@@ -138,30 +140,40 @@ async def _process_edit(
                 logger.info(f"🎯 Using {platform.value} for {operation_type} (estimated cost: ${cost:.4f})")
                 
                 # Route to appropriate service
-                if platform == AIPlatform.REPLICATE:
-                    service = ReplicateService()
-                    # Use the operation_func passed from endpoint (has mask_data in closure)
-                    edited_image_data, metadata = await operation_func(
-                        service,
-                        original_image_data,
-                        **operation_params
-                    )
+                operation_start = time.time()
+                try:
+                    if platform == AIPlatform.REPLICATE:
+                        service = ReplicateService()
+                        # Use the operation_func passed from endpoint (has mask_data in closure)
+                        edited_image_data, metadata = await operation_func(
+                            service,
+                            original_image_data,
+                            **operation_params
+                        )
                 
-                elif platform == AIPlatform.STABILITY:
-                    # Use Stability AI (original behavior)
-                    stability_service = StabilityAIService()
-                    edited_image_data, metadata = await operation_func(
-                        stability_service, original_image_data, **operation_params
-                    )
+                    elif platform == AIPlatform.STABILITY:
+                        # Use Stability AI (original behavior)
+                        stability_service = StabilityAIService()
+                        edited_image_data, metadata = await operation_func(
+                            stability_service, original_image_data, **operation_params
+                        )
                 
-                else:
-                    # Unsupported platform - fall back to Stability
-                    logger.warning(f"⚠️ Platform {platform.value} not yet supported, using Stability")
-                    stability_service = StabilityAIService()
-                    edited_image_data, metadata = await operation_func(
-                        stability_service, original_image_data, **operation_params
+                    else:
+                        # Unsupported platform - fall back to Stability
+                        logger.warning(f"⚠️ Platform {platform.value} not yet supported, using Stability")
+                        platform_used = "stability"
+                        stability_service = StabilityAIService()
+                        edited_image_data, metadata = await operation_func(
+                            stability_service, original_image_data, **operation_params
+                        )
+                except Exception as e:
+                    provider_health_registry.record_failure(
+                        platform_used, error=e, response_time=time.time() - operation_start
                     )
-                    platform_used = "stability"
+                    raise
+                provider_health_registry.record_success(
+                    platform_used, response_time=time.time() - operation_start
+                )
             
             else:
                 # No AI operation mapping - use original behavior (Stability)
@@ -306,6 +306,7 @@ class RAGQueryRequest(BaseModel):
     campaign_id: int
     query: str
     top_k: int = Field(default=5, ge=1, le=20)
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = None  # Defaults to RAG_RETRIEVAL_MODE
 
 class RAGQueryResponse(BaseModel):
     query: str
@@ -10,26 +10,13 @@ import time
 import logging
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Any, Tuple
-from datetime import datetime, timedelta
 
 from app.core.config.settings import settings
+from app.services.provider_health import provider_health_registry, ProviderHealth
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class PlatformHealth:
-    """Track platform health metrics"""
-    name: str
-    last_success: Optional[datetime] = None
-    last_failure: Optional[datetime] = None
-    consecutive_failures: int = 0
-    total_requests: int = 0
-    total_failures: int = 0
-    avg_response_time: float = 0.0
-    is_healthy: bool = True
-
-
 @dataclass
 class PlatformSpec:
     """Platform specification with metadata"""
@@ -91,23 +78,19 @@ class AIPlatformManager:
 
     def __init__(self):
         """Initialize platform manager"""
-        self.health: Dict[str, PlatformHealth] = {}
+        # Health is shared with AIRouter and the image editor via the global registry
+        self.health = provider_health_registry
         self.rotation_counters: Dict[str, int] = {}
         self.fallback_enabled = bool(getattr(settings, "AI_FALLBACK_ENABLED", True))
         self.cache_ttl = int(getattr(settings, "AI_CACHE_TTL_SECONDS", 300))
 
-        # Initialize health tracking for all platforms
-        self._init_platform_health()
-
-    def _init_platform_health(self):
-        """Initialize health tracking for all known platforms"""
+    def _known_platforms(self) -> List[str]:
+        """All platform names referenced by PLATFORM_PRIORITIES"""
         all_platforms = set()
         for operation_platforms in self.PLATFORM_PRIORITIES.values():
             for platform_name, _ in operation_platforms:
                 all_platforms.add(platform_name)
-
-        for platform_name in all_platforms:
-            self.health[platform_name] = PlatformHealth(name=platform_name)
+        return sorted(all_platforms)
 
     async def get_platform(
         self,
@@ -146,8 +129,7 @@ class AIPlatformManager:
                 continue
 
             # Check platform health
-            health = self.health.get(platform_name)
-            if health and not self._is_platform_healthy(health):
+            if not self._is_platform_healthy(platform_name):
                 logger.warning(f"⏭️ Skipping unhealthy platform: {platform_name}")
                 continue
 
@@ -191,24 +173,9 @@ class AIPlatformManager:
         response_time: Optional[float] = None
     ):
         """Report successful operation on a platform"""
-        health = self.health.get(platform.name)
-        if not health:
-            return
-
-        health.last_success = datetime.utcnow()
-        health.consecutive_failures = 0
-        health.total_requests += 1
-
-        if response_time:
-            # Update average response time (exponential moving average)
-            if health.avg_response_time == 0:
-                health.avg_response_time = response_time
-            else:
-                health.avg_response_time = (health.avg_response_time * 0.8) + (response_time * 0.2)
-
-        health.is_healthy = True
+        self.health.record_success(platform.name, response_time=response_time)
 
-        logger.debug(f"✅ {platform.name} success for {operation_type} ({response_time:.2f}s)")
+        logger.debug(f"✅ {platform.name} success for {operation_type} ({response_time or 0:.2f}s)")
 
     async def report_failure(
         self,
@@ -218,26 +185,9 @@ class AIPlatformManager:
         response_time: Optional[float] = None
     ):
         """Report failed operation on a platform"""
-        health = self.health.get(platform.name)
-        if not health:
-            return
-
-        health.last_failure = datetime.utcnow()
-        health.consecutive_failures += 1
-        health.total_requests += 1
-        health.total_failures += 1
-
-        # Mark as unhealthy if too many consecutive failures
-        if health.consecutive_failures >= 3:
-            health.is_healthy = False
-            logger.warning(f"🚫 Marking {platform.name} as unhealthy after {health.consecutive_failures} failures")
-
-        # Special handling for credit exhaustion
-        error_msg = str(error).lower()
-        if "credit" in error_msg or "quota" in error_msg or "billing" in error_msg:
-            logger.warning(f"💳 Platform {platform.name} has credit issues: {error}")
-            # Don't mark as permanently unhealthy for credit issues (temporary)
-            health.is_healthy = True  # Keep healthy but will fail on next attempt
+        # Registry marks the platform unhealthy after repeated failures
+        # (credit/quota errors are treated as temporary and never mark it down)
+        self.health.record_failure(platform.name, error=error, response_time=response_time)
 
         logger.warning(f"❌ {platform.name} failure for {operation_type}: {error}")
 
@@ -278,8 +228,7 @@ class AIPlatformManager:
 
             for platform_name, model_name in available_platforms:
                 # Check platform health
-                health = self.health.get(platform_name)
-                if health and not self._is_platform_healthy(health):
+                if not self._is_platform_healthy(platform_name):
                     logger.warning(f"⏭️ Skipping unhealthy platform: {platform_name}")
                     continue
 
@@ -348,26 +297,14 @@ class AIPlatformManager:
 
         raise RuntimeError(error_msg)
 
-    def _is_platform_healthy(self, health: PlatformHealth) -> bool:
-        """Check if a platform is currently healthy"""
-        if not health.is_healthy:
-            # Check if we should retry after cache TTL
-            if health.last_failure:
-                time_since_failure = datetime.utcnow() - health.last_failure
-                if time_since_failure < timedelta(seconds=self.cache_ttl):
-                    return False
-                else:
-                    # Reset to healthy after cache expires
-                    health.is_healthy = True
-                    health.consecutive_failures = 0
-
-        return True
+    def _is_platform_healthy(self, platform_name: str) -> bool:
+        """Check if a platform is currently healthy (recovers after cache TTL)"""
+        return self.health.is_healthy(platform_name)
 
     def _reset_health_cache(self):
         """Reset all platform health (for retry scenarios)"""
-        for health in self.health.values():
-            health.is_healthy = True
-            health.consecutive_failures = 0
+        for platform_name in self._known_platforms():
+            self.health.reset(platform_name)
 
     def _get_estimated_cost(self, platform_name: str, operation_type: str) -> float:
         """Get estimated cost for a platform/operation combination"""
@@ -433,19 +370,13 @@ class AIPlatformManager:
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status for all platforms"""
         status = {}
-        for platform_name, health in self.health.items():
-            status[platform_name] = {
-                "is_healthy": health.is_healthy,
-                "consecutive_failures": health.consecutive_failures,
-                "total_requests": health.total_requests,
-                "failure_rate": (
-                    health.total_failures / health.total_requests
-                    if health.total_requests > 0 else 0
-                ),
-                "avg_response_time": health.avg_response_time,
-                "last_success": health.last_success.isoformat() if health.last_success else None,
-                "last_failure": health.last_failure.isoformat() if health.last_failure else None,
-            }
+        for platform_name in self._known_platforms():
+            health = self.health.get(platform_name) or ProviderHealth(name=platform_name)
+            info = health.to_dict()
+            info.pop("provider")
+            info.pop("model")
+            info["is_healthy"] = self._is_platform_healthy(platform_name)
+            status[platform_name] = info
         return status
 
 
@@ -8,6 +8,8 @@ import os
 from typing import Tuple, Optional, Literal
 from enum import Enum
 
+from app.services.provider_health import provider_health_registry
+
 
 class AIPlatform(str, Enum):
     """Available AI platforms (based on your environment variables)"""
@@ -167,6 +169,15 @@ class AIPlatformRouter:
         
         if not available_options:
             raise ValueError(f"No AI platform available for operation: {operation}")
+
+        # Skip platforms the shared health registry has marked down
+        # (if all are down, ignore health rather than failing outright)
+        healthy_options = [
+            option for option in available_options
+            if provider_health_registry.is_healthy(option[0].value)
+        ]
+        if healthy_options:
+            available_options = healthy_options
         
         # Select based on priority
         if priority == "cost":
@@ -33,6 +33,7 @@ from app.core.config.settings import settings
 from app.models.admin_settings import AIProviderConfig
 from app.db.session import AsyncSessionLocal
 from app.models.ai_credits import AIUsageTracking
+from app.services.provider_health import provider_health_registry
 
 logger = logging.getLogger(__name__)
 
@@ -202,11 +203,11 @@ class AIRouter:
       - Budget-aware if AI_COST_OPTIMIZATION is enabled.
     """
 
-    def __init__(self, health_cache_ttl: Optional[int] = None):
-        self.health_cache_ttl = health_cache_ttl or int(getattr(settings, "AI_CACHE_TTL_SECONDS", 300))
+    def __init__(self):
         self.fallback_enabled = bool(getattr(settings, "AI_FALLBACK_ENABLED", True))
         self.cost_optimization = bool(getattr(settings, "AI_COST_OPTIMIZATION", True))
-        self.health: Dict[tuple[str, str], tuple[bool, float]] = {}  # (name, model) -> (ok, ts)
+        # Health is shared process-wide so failures seen by one router reroute all of them
+        self.health = provider_health_registry
         self.last_used_model: Optional[str] = None  # Track last successful model
 
     # ------------- parsing and specs -------------
@@ -252,17 +253,18 @@ class AIRouter:
         return est <= budget_usd
 
     def _healthy(self, spec: ProviderSpec) -> bool:
-        key = (spec.name, spec.model)
-        ok, ts = self.health.get(key, (True, 0.0))
-        if not ok and (time.time() - ts) > self.health_cache_ttl:
-            return True
-        return ok
+        return self.health.is_healthy(spec.name, spec.model)
 
-    def report_failure(self, spec: ProviderSpec):
-        self.health[(spec.name, spec.model)] = (False, time.time())
+    def report_failure(
+        self,
+        spec: ProviderSpec,
+        error: Optional[Exception] = None,
+        response_time: Optional[float] = None,
+    ):
+        self.health.record_failure(spec.name, spec.model, error=error, response_time=response_time)
 
-    def report_success(self, spec: ProviderSpec):
-        self.health[(spec.name, spec.model)] = (True, time.time())
+    def report_success(self, spec: ProviderSpec, response_time: Optional[float] = None):
+        self.health.record_success(spec.name, spec.model, response_time=response_time)
 
     async def _record_usage(
         self,
@@ -381,10 +383,11 @@ class AIRouter:
             if not self._within_budget(spec, prompt_tokens, gen_tokens, budget_usd):
                 continue
 
+            start_time = time.time()
             try:
                 logger.info(f"[AIRouter] Attempt {spec.name}:{spec.model} for {use_case}")
                 result = await call_func(spec=spec, **kwargs)
-                self.report_success(spec)
+                self.report_success(spec, response_time=time.time() - start_time)
 
                 # Calculate actual cost
                 estimated_cost = (spec.cost_in * (prompt_tokens / 1000.0)) + (spec.cost_out * (gen_tokens / 1000.0))
@@ -412,7 +415,7 @@ class AIRouter:
                 }
             except Exception as e:
                 last_error = e
-                self.report_failure(spec)
+                self.report_failure(spec, error=e, response_time=time.time() - start_time)
                 logger.warning(f"[AIRouter] Provider {spec.name}:{spec.model} failed: {e}")
                 if not self.fallback_enabled:
                     break
@@ -13,19 +13,97 @@ Analyzes sales pages to extract comprehensive brand identity:
 
 This creates a "Business DNA" profile that affiliates can use to generate
 on-brand content automatically.
+
+Linked stylesheets are fetched concurrently (capped) while the page-only
+analyzers run together in one worker-thread pass. Colors found in each
+stylesheet are cached by URL and revalidated with ETag / Last-Modified, so
+popular CDN CSS isn't downloaded again for every product.
 """
 
 from typing import Dict, List, Optional, Tuple
+import asyncio
 import re
+import time
 import logging
-from collections import Counter
-import httpx
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from urllib.parse import urlparse
 import colorsys
 
+from app.core.config.settings import settings
+from app.services.html_document import ParsedPage, parse_page
+from app.services.outbound_http import outbound_http
+
 logger = logging.getLogger(__name__)
 
+# CSS patterns (compiled once, shared by inline styles, <style> blocks and stylesheets)
+COLOR_PATTERN = re.compile(r'(?:color|background-color|border-color):\s*([#\w(),.%\s]+)', re.IGNORECASE)
+FONT_FAMILY_PATTERN = re.compile(r'font-family:\s*([^;]+)', re.IGNORECASE)
+FONT_SIZE_PATTERN = re.compile(r'font-size:\s*(\d+(?:\.\d+)?(?:px|em|rem))', re.IGNORECASE)
+FONT_WEIGHT_PATTERN = re.compile(r'font-weight:\s*(\d+|bold|normal)', re.IGNORECASE)
+
+# Colors kept per external stylesheet (limit to avoid massive files)
+MAX_STYLESHEET_COLORS = 100
+
+
+@dataclass
+class StylesheetColors:
+    """Colors extracted from one stylesheet plus its validators"""
+    colors: List[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    checked_at: float
+
+
+class StylesheetCache:
+    """
+    In-memory LRU of stylesheet colors keyed by URL
+
+    Entries younger than the TTL are used as-is; older entries are
+    revalidated with a conditional request and reused on 304.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_items: Optional[int] = None):
+        self.ttl = ttl_seconds or int(getattr(settings, "DNA_STYLESHEET_CACHE_TTL_SECONDS", 86400))
+        self.max_items = max_items or int(getattr(settings, "DNA_STYLESHEET_CACHE_MAX_ITEMS", 500))
+        self._entries: "OrderedDict[str, StylesheetColors]" = OrderedDict()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    def get(self, url: str) -> Optional[StylesheetColors]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def is_fresh(self, entry: StylesheetColors) -> bool:
+        return time.time() - entry.checked_at < self.ttl
+
+    def set(self, url: str, colors: List[str], etag: Optional[str], last_modified: Optional[str]):
+        self._entries[url] = StylesheetColors(colors, etag, last_modified, time.time())
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def touch(self, url: str):
+        """Mark an entry as just revalidated"""
+        entry = self._entries.get(url)
+        if entry is not None:
+            entry.checked_at = time.time()
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        reused = self.stats["hits"] + self.stats["revalidated"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "reuse_rate": f"{(reused / lookups * 100) if lookups else 0:.1f}%",
+        }
+
+
+# Global stylesheet cache (one per worker process)
+stylesheet_cache = StylesheetCache()
+
 
 class BusinessDNAExtractor:
     """
@@ -37,11 +115,14 @@ class BusinessDNAExtractor:
     
     def __init__(self):
         self.timeout = 30.0
+        self.max_stylesheets = int(getattr(settings, "DNA_MAX_STYLESHEETS", 3))
+        self.stylesheet_concurrency = int(getattr(settings, "DNA_STYLESHEET_CONCURRENCY", 3))
         
     async def extract_business_dna(
         self,
         url: str,
-        html_content: Optional[str] = None
+        html_content: Optional[str] = None,
+        document: Optional[ParsedPage] = None
     ) -> Dict:
         """
         Extract complete Business DNA from a sales page
@@ -49,26 +130,28 @@ class BusinessDNAExtractor:
         Args:
             url: Sales page URL
             html_content: Optional pre-fetched HTML
+            document: Optional page already parsed by the scraper (no fetch or parse)
             
         Returns:
             Dict with brand colors, fonts, tone, visual style, messaging
         """
-        # Fetch HTML if not provided
-        if not html_content:
-            html_content = await self._fetch_page(url)
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if document is None:
+            # Fetch HTML if not provided
+            if not html_content:
+                html_content = await self._fetch_page(url)
+            document = await parse_page(html_content, url)
+        
+        # Stylesheets download while the page-only analyzers run in a worker thread
+        css_colors, analysis = await asyncio.gather(
+            self._fetch_stylesheet_colors(document.stylesheet_urls),
+            asyncio.to_thread(self._analyze_page, document, url),
+        )
         
         # Extract all DNA components
         dna = {
             "url": url,
-            "brand_colors": await self._extract_colors(soup, url),
-            "typography": await self._extract_typography(soup, url),
-            "tone_of_voice": await self._analyze_tone(soup),
-            "visual_style": await self._analyze_visual_style(soup, url),
-            "messaging": await self._extract_messaging(soup),
-            "layout_patterns": await self._analyze_layout(soup),
-            "cta_style": await self._analyze_ctas(soup),
+            "brand_colors": self._build_palette(analysis.pop("page_colors") + css_colors),
+            **analysis,
         }
         
         # Generate summary
@@ -78,48 +161,43 @@ class BusinessDNAExtractor:
         return dna
     
     
+    def _analyze_page(self, page: ParsedPage, url: str) -> Dict:
+        """
+        Run every analyzer that only reads the parsed page (CPU-only)
+        
+        Called once per extraction in a worker thread.
+        """
+        return {
+            "page_colors": self._extract_page_colors(page),
+            "typography": self._extract_typography(page, url),
+            "tone_of_voice": self._analyze_tone(page),
+            "visual_style": self._analyze_visual_style(page, url),
+            "messaging": self._extract_messaging(page),
+            "layout_patterns": self._analyze_layout(page),
+            "cta_style": self._analyze_ctas(page),
+        }
+    
+    
     # ========================================================================
     # COLOR EXTRACTION
     # ========================================================================
     
-    async def _extract_colors(self, soup: BeautifulSoup, url: str) -> Dict:
+    def _extract_page_colors(self, page: ParsedPage) -> List[str]:
+        """Extract color declarations from inline styles and style tags"""
+        colors = []
+        for style in page.inline_styles:
+            colors.extend(COLOR_PATTERN.findall(style))
+        for content in page.style_blocks:
+            colors.extend(COLOR_PATTERN.findall(content))
+        return colors
+    
+    
+    def _build_palette(self, colors: List[str]) -> Dict:
         """
-        Extract brand color palette from page
+        Build brand color palette from collected color declarations
         
         Returns primary, secondary, accent, and background colors
         """
-        colors = []
-        
-        # Extract from inline styles
-        for element in soup.find_all(style=True):
-            style = element['style']
-            color_matches = re.findall(
-                r'(?:color|background-color|border-color):\s*([#\w(),.%\s]+)',
-                style,
-                re.IGNORECASE
-            )
-            colors.extend(color_matches)
-        
-        # Extract from style tags
-        for style_tag in soup.find_all('style'):
-            content = style_tag.string or ''
-            color_matches = re.findall(
-                r'(?:color|background-color|border-color):\s*([#\w(),.%\s]+)',
-                content,
-                re.IGNORECASE
-            )
-            colors.extend(color_matches)
-        
-        # Try to fetch external CSS (first stylesheet only)
-        try:
-            for link in soup.find_all('link', rel='stylesheet', href=True):
-                css_url = urljoin(url, link['href'])
-                css_colors = await self._extract_colors_from_css(css_url)
-                colors.extend(css_colors)
-                break  # Only first stylesheet to avoid overwhelming
-        except Exception as e:
-            logger.warning(f"Failed to fetch external CSS: {e}")
-        
         # Parse and categorize colors
         parsed_colors = self._parse_colors(colors)
         categorized = self._categorize_colors(parsed_colors)
@@ -134,18 +212,57 @@ class BusinessDNAExtractor:
         }
     
     
+    async def _fetch_stylesheet_colors(self, css_urls: List[str]) -> List[str]:
+        """Fetch linked stylesheets concurrently (capped) and collect their colors"""
+        css_urls = list(dict.fromkeys(css_urls))[:self.max_stylesheets]
+        if not css_urls:
+            return []
+        
+        slots = asyncio.Semaphore(self.stylesheet_concurrency)
+        
+        async def fetch(css_url: str) -> List[str]:
+            async with slots:
+                return await self._extract_colors_from_css(css_url)
+        
+        # Keep page order so the palette doesn't depend on which download finished first
+        results = await asyncio.gather(*(fetch(css_url) for css_url in css_urls))
+        return [color for css_colors in results for color in css_colors]
+    
+    
     async def _extract_colors_from_css(self, css_url: str) -> List[str]:
-        """Fetch and extract colors from external CSS file"""
+        """Fetch and extract colors from external CSS file (cached by URL + ETag)"""
+        cached = stylesheet_cache.get(css_url)
+        if cached is not None and stylesheet_cache.is_fresh(cached):
+            stylesheet_cache.stats["hits"] += 1
+            return list(cached.colors)
+        
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(css_url)
-                if response.status_code == 200:
-                    css_content = response.text
-                    return re.findall(
-                        r'(?:color|background-color|border-color):\s*([#\w(),.%\s]+)',
-                        css_content,
-                        re.IGNORECASE
-                    )[:100]  # Limit to avoid massive files
+            response = await outbound_http.get(css_url, purpose="stylesheet", headers=headers)
+            if response.status_code == 304 and cached is not None:
+                stylesheet_cache.stats["revalidated"] += 1
+                stylesheet_cache.touch(css_url)
+                return list(cached.colors)
+            if response.status_code == 200:
+                stylesheet_cache.stats["misses"] += 1
+                # Stop scanning once enough colors are found
+                colors = [
+                    match.group(1)
+                    for match in islice(COLOR_PATTERN.finditer(response.text), MAX_STYLESHEET_COLORS)
+                ]
+                stylesheet_cache.set(
+                    css_url,
+                    colors,
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                )
+                return colors
         except Exception as e:
             logger.warning(f"Failed to fetch CSS from {css_url}: {e}")
         return []
@@ -270,28 +387,26 @@ class BusinessDNAExtractor:
     # TYPOGRAPHY EXTRACTION
     # ========================================================================
     
-    async def _extract_typography(self, soup: BeautifulSoup, url: str) -> Dict:
+    def _extract_typography(self, page: ParsedPage, url: str) -> Dict:
         """Extract font families, sizes, and weights from page"""
         fonts = []
         sizes = []
         weights = []
         
         # Extract from inline styles
-        for element in soup.find_all(style=True):
-            style = element['style']
-            
+        for style in page.inline_styles:
             # Font family
-            font_match = re.search(r'font-family:\s*([^;]+)', style, re.IGNORECASE)
+            font_match = FONT_FAMILY_PATTERN.search(style)
             if font_match:
                 fonts.append(font_match.group(1).strip())
             
             # Font size
-            size_match = re.search(r'font-size:\s*(\d+(?:\.\d+)?(?:px|em|rem))', style, re.IGNORECASE)
+            size_match = FONT_SIZE_PATTERN.search(style)
             if size_match:
                 sizes.append(size_match.group(1))
             
             # Font weight
-            weight_match = re.search(r'font-weight:\s*(\d+|bold|normal)', style, re.IGNORECASE)
+            weight_match = FONT_WEIGHT_PATTERN.search(style)
             if weight_match:
                 weights.append(weight_match.group(1))
         
@@ -311,15 +426,14 @@ class BusinessDNAExtractor:
     # TONE OF VOICE ANALYSIS
     # ========================================================================
     
-    async def _analyze_tone(self, soup: BeautifulSoup) -> Dict:
+    def _analyze_tone(self, page: ParsedPage) -> Dict:
         """
         Analyze tone of voice from page content
         
         Returns tone indicators: formal/casual, technical/accessible, etc.
         """
-        # Get all text content
-        text_elements = soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'span', 'div'])
-        text = ' '.join([elem.get_text().strip() for elem in text_elements])
+        # Visible page text
+        text = page.text
         
         # Analyze tone indicators
         tone = {
@@ -422,14 +536,13 @@ class BusinessDNAExtractor:
     # VISUAL STYLE ANALYSIS
     # ========================================================================
     
-    async def _analyze_visual_style(self, soup: BeautifulSoup, url: str) -> Dict:
+    def _analyze_visual_style(self, page: ParsedPage, url: str) -> Dict:
         """Analyze visual style from images and layout"""
-        images = soup.find_all('img', src=True)
+        images = page.images
         
         image_types = []
         for img in images[:20]:  # First 20 images
-            src = img.get('src', '')
-            alt = img.get('alt', '').lower()
+            alt = img['alt'].lower()
             
             # Categorize image types
             if any(word in alt for word in ['logo', 'brand']):
@@ -458,16 +571,16 @@ class BusinessDNAExtractor:
     # MESSAGING EXTRACTION
     # ========================================================================
     
-    async def _extract_messaging(self, soup: BeautifulSoup) -> Dict:
+    def _extract_messaging(self, page: ParsedPage) -> Dict:
         """Extract key messaging: headlines, value props, hooks"""
         # Headlines
-        h1s = [h1.get_text().strip() for h1 in soup.find_all('h1')]
-        h2s = [h2.get_text().strip() for h2 in soup.find_all('h2')][:5]
+        h1s = page.headings.get('h1', [])
+        h2s = page.headings.get('h2', [])[:5]
         
         # CTAs
         ctas = []
-        for button in soup.find_all(['button', 'a']):
-            text = button.get_text().strip()
+        for button in page.ctas:
+            text = button['text']
             if text and len(text) < 50:  # Reasonable CTA length
                 ctas.append(text)
         
@@ -482,13 +595,17 @@ class BusinessDNAExtractor:
     # LAYOUT ANALYSIS
     # ========================================================================
     
-    async def _analyze_layout(self, soup: BeautifulSoup) -> Dict:
+    def _analyze_layout(self, page: ParsedPage) -> Dict:
         """Analyze page layout patterns"""
+        def has_class(pattern: str) -> bool:
+            regex = re.compile(pattern, re.I)
+            return any(regex.search(class_name) for class_name in page.class_names)
+        
         # Detect common layout patterns
-        has_hero = bool(soup.find(class_=re.compile(r'hero|banner|header', re.I)))
-        has_testimonials = bool(soup.find(class_=re.compile(r'testimonial|review', re.I)))
-        has_pricing = bool(soup.find(class_=re.compile(r'pricing|price', re.I)))
-        has_features = bool(soup.find(class_=re.compile(r'feature|benefit', re.I)))
+        has_hero = has_class(r'hero|banner|header')
+        has_testimonials = has_class(r'testimonial|review')
+        has_pricing = has_class(r'pricing|price')
+        has_features = has_class(r'feature|benefit')
         
         return {
             "has_hero_section": has_hero,
@@ -502,14 +619,13 @@ class BusinessDNAExtractor:
     # CTA STYLE ANALYSIS
     # ========================================================================
     
-    async def _analyze_ctas(self, soup: BeautifulSoup) -> Dict:
+    def _analyze_ctas(self, page: ParsedPage) -> Dict:
         """Analyze CTA button styles"""
-        buttons = soup.find_all(['button', 'a'])
+        buttons = page.ctas
         
         cta_styles = []
         for button in buttons:
-            style = button.get('style', '')
-            class_name = ' '.join(button.get('class', []))
+            class_name = button['class']
             
             # Detect CTA style
             if 'primary' in class_name.lower() or 'btn-primary' in class_name.lower():
@@ -529,10 +645,9 @@ class BusinessDNAExtractor:
     
     async def _fetch_page(self, url: str) -> str:
         """Fetch HTML content from URL"""
-        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+        response = await outbound_http.get(url, purpose="page", timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
     
     
     def _generate_dna_summary(self, dna: Dict) -> str:
@@ -0,0 +1,53 @@
+"""
+Non-blocking Cohere embedding calls
+
+The Cohere SDK client is synchronous. Calling it directly from async code
+blocks the event loop (and every other request on the worker, redirects
+included) for the full HTTP round-trip. These helpers run the calls on a
+dedicated, bounded thread pool instead.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, List
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Cohere accepts at most 96 texts per embed call
+COHERE_MAX_BATCH_SIZE = 96
+
+# Dedicated pool so Cohere calls can't starve the default executor (R2 uploads etc.)
+# max_workers is also the cap on concurrent Cohere requests per worker process
+_cohere_executor = ThreadPoolExecutor(
+    max_workers=int(getattr(settings, "COHERE_EMBED_MAX_CONCURRENCY", 4)),
+    thread_name_prefix="cohere-embed",
+)
+
+
+async def cohere_embed(client, **kwargs) -> Any:
+    """Run client.embed(**kwargs) on the Cohere thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cohere_executor, partial(client.embed, **kwargs))
+
+
+async def cohere_embed_batches(
+    client,
+    texts: List[str],
+    batch_size: int = COHERE_MAX_BATCH_SIZE,
+    **kwargs,
+) -> List[Any]:
+    """
+    Embed texts in Cohere-sized chunks, sending chunks concurrently
+
+    Concurrency is capped by the thread pool size. Responses are returned
+    in chunk order.
+    """
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if len(batches) > 1:
+        logger.info(f"[Cohere] Embedding {len(texts)} texts in {len(batches)} concurrent chunks")
+    return await asyncio.gather(
+        *(cohere_embed(client, texts=batch, **kwargs) for batch in batches)
+    )
@@ -0,0 +1,147 @@
+"""
+Compile Single-Flight Guard
+Deduplicates concurrent intelligence compilations for the same product URL
+
+When several affiliates add the same product at once, every request misses the
+url_hash lookup and would start its own scrape + AI amplification. The guard
+lets one compile per url_hash run at a time:
+- in-process: a per-url_hash asyncio.Lock (callers in the same worker queue up)
+- across workers: a session-level Postgres advisory lock on a dedicated
+  connection, polled with pg_try_advisory_lock so waiting has a deadline
+
+Callers that had to wait get flight.waited = True and should re-check for
+intelligence the leader just committed before compiling themselves.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config.settings import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompileFlight:
+    """Outcome of acquiring the guard"""
+    url_hash: str
+    waited: bool = False  # Another compile for this URL held the guard first
+    wait_ms: int = 0
+
+
+def advisory_lock_key(url_hash: str) -> int:
+    """Signed 64-bit advisory lock key derived from the url_hash"""
+    return int.from_bytes(bytes.fromhex(url_hash[:16]), "big", signed=True)
+
+
+class CompileSingleFlight:
+    """
+    Per-url_hash compile guard (in-process lock + Postgres advisory lock)
+
+    Usage:
+        async with compile_singleflight.acquire(url_hash) as flight:
+            if flight.waited:
+                ...  # re-check for intelligence compiled by the leader
+            ...  # compile
+    """
+
+    def __init__(self, wait_timeout_seconds: Optional[float] = None, poll_interval_seconds: float = 1.0):
+        self.wait_timeout = wait_timeout_seconds or float(getattr(settings, "COMPILE_SINGLEFLIGHT_WAIT_SECONDS", 600))
+        self.poll_interval = poll_interval_seconds
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refs: Dict[str, int] = {}
+        self.stats = {"leaders": 0, "followers": 0, "wait_timeouts": 0, "advisory_errors": 0, "invalidated_connections": 0}
+
+    @asynccontextmanager
+    async def acquire(self, url_hash: str) -> AsyncIterator[CompileFlight]:
+        started = time.perf_counter()
+        lock = self._locks.setdefault(url_hash, asyncio.Lock())
+        self._refs[url_hash] = self._refs.get(url_hash, 0) + 1
+        waited = lock.locked()
+        if waited:
+            logger.info(f"⏳ Compile already in flight for {url_hash[:12]}… - waiting for it")
+
+        try:
+            async with lock:
+                async with self._advisory_lock(url_hash) as advisory_waited:
+                    flight = CompileFlight(
+                        url_hash=url_hash,
+                        waited=waited or advisory_waited,
+                        wait_ms=round((time.perf_counter() - started) * 1000),
+                    )
+                    self.stats["followers" if flight.waited else "leaders"] += 1
+                    yield flight
+        finally:
+            self._refs[url_hash] -= 1
+            if self._refs[url_hash] == 0:
+                del self._refs[url_hash]
+                self._locks.pop(url_hash, None)
+
+    @asynccontextmanager
+    async def _advisory_lock(self, url_hash: str) -> AsyncIterator[bool]:
+        """Hold the cross-worker lock; yields True if another worker held it first"""
+        key = advisory_lock_key(url_hash)
+        try:
+            conn = await engine.connect()
+        except Exception as e:
+            # Degrade to in-process dedupe only
+            self.stats["advisory_errors"] += 1
+            logger.warning(f"[CompileSingleFlight] Advisory lock unavailable, continuing without it: {e}")
+            yield False
+            return
+
+        acquired: Optional[bool] = False  # None while a lock call is in flight (outcome unknown)
+        waited = False
+        try:
+            deadline = time.monotonic() + self.wait_timeout
+            while True:
+                acquired = None
+                acquired = bool((await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar())
+                # Don't sit in an open transaction while polling
+                await conn.commit()
+                if acquired:
+                    break
+                if time.monotonic() >= deadline:
+                    self.stats["wait_timeouts"] += 1
+                    logger.warning(
+                        f"[CompileSingleFlight] Waited {self.wait_timeout:g}s for {url_hash[:12]}… - compiling anyway"
+                    )
+                    break
+                if not waited:
+                    logger.info(f"⏳ Compile for {url_hash[:12]}… running in another worker - waiting for it")
+                waited = True
+                await asyncio.sleep(self.poll_interval)
+
+            yield waited
+        finally:
+            released = acquired is False
+            try:
+                if acquired:
+                    released = bool((await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})).scalar())
+                    await conn.commit()
+            except Exception as e:
+                logger.warning(f"[CompileSingleFlight] Failed to release advisory lock: {e}")
+            finally:
+                # Also reached on cancellation. Session-level locks survive the pool's ROLLBACK
+                # reset, so a connection that may still hold one is discarded, not pooled
+                try:
+                    if not released:
+                        self.stats["invalidated_connections"] += 1
+                        await conn.invalidate()
+                finally:
+                    await conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "in_flight": len(self._locks)}
+
+
+# Global guard (one per worker process; advisory locks coordinate workers)
+compile_singleflight = CompileSingleFlight()
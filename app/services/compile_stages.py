@@ -0,0 +1,162 @@
+"""
+Compilation Stage Graph
+Runs intelligence compilation stages as a small dependency graph
+
+Each stage declares the stages whose output it needs. Every stage starts as
+soon as its inputs are ready, so independent stages (image processing, AI
+amplification, Business DNA) overlap and a compile takes about as long as its
+critical path instead of the sum of all stages. Each stage runs under its own
+timeout and its timing is returned for the compilation progress data.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """
+    One compilation stage
+
+    func is called with one keyword argument per input stage (its result).
+    A failing required stage aborts the graph; a failing optional stage
+    yields `fallback` to its dependents.
+    """
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    required: bool = True
+    fallback: Any = None
+
+
+class StageFailedError(Exception):
+    """A required stage failed or timed out"""
+
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+        super().__init__(f"{stage} stage failed: {error}")
+
+
+class StageGraph:
+    """
+    Dependency-ordered concurrent stage runner
+
+    Usage:
+        graph = StageGraph([
+            Stage("fetch", fetch, timeout=90),
+            Stage("images", images, inputs=("fetch",), required=False, fallback=None),
+            Stage("amplify", amplify, inputs=("fetch",), timeout=300),
+        ])
+        results, timings = await graph.run()
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names")
+        for stage in stages:
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage graph has a cycle through '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run all stages
+
+        Returns:
+            (results by stage name, timings)
+
+        Raises:
+            StageFailedError: A required stage failed (remaining stages are cancelled)
+        """
+        graph_start = time.perf_counter()
+        timings: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "inputs": list(stage.inputs)} for name, stage in self.stages.items()
+        }
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def elapsed_ms(since: float) -> int:
+            return round((time.perf_counter() - since) * 1000)
+
+        async def run_stage(stage: Stage) -> Any:
+            timing = timings[stage.name]
+            try:
+                inputs = {name: await tasks[name] for name in stage.inputs}
+            except BaseException:
+                timing["status"] = "skipped"
+                raise
+
+            started = time.perf_counter()
+            timing["status"] = "running"
+            timing["started_ms"] = elapsed_ms(graph_start)
+            try:
+                result = await asyncio.wait_for(stage.func(**inputs), timeout=stage.timeout)
+                timing["status"] = "completed"
+                return result
+            except asyncio.CancelledError:
+                timing["status"] = "cancelled"
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = asyncio.TimeoutError(f"timed out after {stage.timeout:g}s")
+                    timing["status"] = "timeout"
+                else:
+                    timing["status"] = "failed"
+                timing["error"] = str(e)
+
+                if stage.required:
+                    logger.error(f"❌ Stage '{stage.name}' {timing['status']}: {e}")
+                    raise StageFailedError(stage.name, e) from e
+
+                logger.warning(f"⚠️ Optional stage '{stage.name}' {timing['status']} (continuing): {e}")
+                return stage.fallback
+            finally:
+                timing["duration_ms"] = elapsed_ms(started)
+
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.create_task(run_stage(stage), name=f"compile-stage:{name}")
+
+        try:
+            values = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        total_ms = elapsed_ms(graph_start)
+        stage_ms = sum(t.get("duration_ms", 0) for t in timings.values())
+        breakdown = ", ".join(f"{name} {timing.get('duration_ms', 0)}ms" for name, timing in timings.items())
+        logger.info(f"⏱️  Compilation stages: {total_ms}ms wall clock, {stage_ms}ms summed ({breakdown})")
+
+        return dict(zip(tasks.keys(), values)), {
+            "stages": timings,
+            "total_ms": total_ms,
+            "sum_stage_ms": stage_ms,
+        }
@@ -0,0 +1,257 @@
+"""
+Generation Context Pack Cache
+Per-(campaign, content type, keyword selection) cache of the context used to
+build content generation prompts
+
+A context pack holds the top RAG passages for the generation query and the
+campaign intelligence sections filtered by the selected keywords. Repeat
+generations with the same selection skip the query embedding, the retrieval
+round-trip and the intelligence JSON walk.
+
+Packs are keyed by an intelligence version (product id + timestamps). A
+recompile or research ingestion bumps the product's updated_at, so packs
+cached by any worker become unreachable; the compiler also drops them from
+this worker's cache right away. Packs without RAG passages (retrieval failed
+or found nothing) are never cached, so generation picks up RAG as soon as the
+backend recovers or research lands.
+"""
+from __future__ import annotations
+
+import re
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config.settings import settings
+from app.db.models import Campaign
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ContextPackKey:
+    """Cache key for one context pack"""
+    campaign_id: int
+    content_type: str
+    keywords: Tuple[str, ...]
+    intelligence_version: str
+
+
+@dataclass
+class ContextPack:
+    """Precomputed generation context for a campaign and keyword selection"""
+    rag_passages: List[Dict[str, Any]] = field(default_factory=list)
+    intelligence_context: Optional[str] = None
+    product_intelligence_id: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def context_text(self) -> Optional[str]:
+        """RAG passages when available, otherwise the filtered intelligence sections"""
+        if self.rag_passages:
+            return "\n".join(f"- {p.get('content', '')}" for p in self.rag_passages)
+        return self.intelligence_context or None
+
+
+def flatten_keywords(keywords: Optional[Dict[str, List[str]]]) -> List[str]:
+    """Flatten the UI keyword selection ({category: [keywords]}) into one list"""
+    flattened: List[str] = []
+    for category_keywords in (keywords or {}).values():
+        if category_keywords:
+            flattened.extend(category_keywords)
+    return flattened
+
+
+def get_intelligence_data(campaign: Campaign) -> Optional[Dict[str, Any]]:
+    """Campaign intelligence (legacy campaign column first, then the shared ProductIntelligence)"""
+    if campaign.intelligence_data:
+        return campaign.intelligence_data
+    if campaign.product_intelligence and campaign.product_intelligence.intelligence_data:
+        return campaign.product_intelligence.intelligence_data
+    return None
+
+
+def build_intelligence_context(intelligence_data: Any, keywords: List[str]) -> str:
+    """
+    Render intelligence sections filtered by the selected keywords
+
+    Args:
+        intelligence_data: Campaign or ProductIntelligence intelligence_data
+        keywords: Selected keywords (empty = no filtering)
+
+    Returns:
+        Context text ("" when nothing matched)
+    """
+    if not isinstance(intelligence_data, dict):
+        return ""
+
+    # One case-insensitive alternation instead of a substring loop per keyword
+    matcher = re.compile("|".join(re.escape(k) for k in keywords if k), re.IGNORECASE) if any(keywords) else None
+
+    def matches(text: Any) -> bool:
+        return matcher is None or bool(matcher.search(str(text)))
+
+    def bullet_section(title: str, items: List[Any]) -> Optional[str]:
+        selected = [item for item in items if matches(item)]
+        if not selected:
+            return None
+        return f"{title}:\n" + "\n".join(f"- {item}" for item in selected)
+
+    intel_parts = []
+    intel = intelligence_data
+
+    analysis = intel.get("product_analysis")
+    if isinstance(analysis, dict) and analysis.get("key_points"):
+        section = bullet_section("Key Product Points", analysis["key_points"])
+        if section:
+            intel_parts.append(section)
+
+    if intel.get("competitor_insights"):
+        competitor_text = str(intel["competitor_insights"])
+        if matches(competitor_text):
+            intel_parts.append("Competitor Insights:\n" + competitor_text)
+
+    if intel.get("market_positioning"):
+        positioning_text = str(intel["market_positioning"])
+        if matches(positioning_text):
+            intel_parts.append("Market Positioning:\n" + positioning_text)
+
+    product = intel.get("product")
+    if isinstance(product, dict):
+        for key, title in (
+            ("benefits", "Product Benefits"),
+            ("features", "Product Features"),
+            ("pain_points", "Pain Points Addressed"),
+        ):
+            if isinstance(product.get(key), list):
+                section = bullet_section(title, product[key])
+                if section:
+                    intel_parts.append(section)
+
+    return "\n\n".join(intel_parts)
+
+
+class ContextPackCache:
+    """
+    In-memory LRU of context packs with TTL
+
+    Usage:
+        pack = await context_pack_cache.get_or_build(campaign, "email", keywords, rag_service, user_id)
+        context_text = pack.context_text
+    """
+
+    def __init__(self, max_items: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_items = max_items or int(getattr(settings, "CONTEXT_PACK_MAX_ITEMS", 500))
+        self.ttl_seconds = ttl_seconds or int(getattr(settings, "CONTEXT_PACK_TTL_SECONDS", 3600))
+        self._packs: "OrderedDict[ContextPackKey, ContextPack]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def intelligence_version(campaign: Campaign) -> str:
+        """Version token that changes whenever the campaign's intelligence is (re)compiled"""
+        # Campaign edits (name, legacy intelligence_data) also change the pack
+        version = f"campaign:{campaign.updated_at.isoformat() if campaign.updated_at else ''}"
+        product = campaign.product_intelligence
+        if product is not None:
+            stamp = product.updated_at or product.compiled_at
+            version += f"|product:{product.id}:{stamp.isoformat() if stamp else ''}"
+        return version
+
+    def make_key(self, campaign: Campaign, content_type: str, keywords: List[str]) -> ContextPackKey:
+        return ContextPackKey(
+            campaign_id=campaign.id,
+            content_type=content_type,
+            keywords=tuple(sorted({k.strip().lower() for k in keywords if k and k.strip()})),
+            intelligence_version=self.intelligence_version(campaign),
+        )
+
+    def get(self, key: ContextPackKey) -> Optional[ContextPack]:
+        pack = self._packs.get(key)
+        if pack is None:
+            return None
+        if time.time() - pack.created_at > self.ttl_seconds:
+            del self._packs[key]
+            return None
+        self._packs.move_to_end(key)
+        return pack
+
+    def set(self, key: ContextPackKey, pack: ContextPack):
+        self._packs[key] = pack
+        self._packs.move_to_end(key)
+        while len(self._packs) > self.max_items:
+            self._packs.popitem(last=False)
+
+    async def get_or_build(
+        self,
+        campaign: Campaign,
+        content_type: str,
+        keywords: List[str],
+        rag_service,
+        user_id: int
+    ) -> ContextPack:
+        """Return the cached pack for this selection, building it on a miss"""
+        key = self.make_key(campaign, content_type, keywords)
+        pack = self.get(key)
+        if pack is not None:
+            self.stats["hits"] += 1
+            return pack
+        self.stats["misses"] += 1
+
+        # Use keywords to build a more targeted query if keywords are provided
+        query_text = f"{content_type} for {campaign.name}"
+        if keywords:
+            query_text += f" - keywords: {', '.join(keywords)}"
+
+        try:
+            rag_passages = await rag_service.retrieve_context(
+                query=query_text,
+                user_id=user_id,
+                campaign_id=campaign.id,
+                top_k=5
+            )
+        except Exception as e:
+            logger.warning(f"RAG context retrieval failed (continuing without context): {e}")
+            rag_passages = []
+
+        intelligence_context = None
+        if not rag_passages:
+            intelligence_data = get_intelligence_data(campaign)
+            if intelligence_data:
+                intelligence_context = build_intelligence_context(intelligence_data, keywords)
+                if not intelligence_context and keywords:
+                    logger.warning(f"No intelligence data matched keywords: {keywords}")
+            else:
+                logger.warning(f"No intelligence data available for campaign {campaign.name}")
+
+        pack = ContextPack(
+            rag_passages=rag_passages,
+            intelligence_context=intelligence_context,
+            product_intelligence_id=campaign.product_intelligence_id,
+        )
+        # A degraded pack would pin generation to the fallback context for the whole TTL
+        if rag_passages:
+            self.set(key, pack)
+        return pack
+
+    def invalidate_campaign(self, campaign_id: int):
+        """Drop every pack for a campaign"""
+        self._drop(lambda key, pack: key.campaign_id == campaign_id)
+
+    def invalidate_product(self, product_intelligence_id: int):
+        """Drop every pack built from a product's intelligence or research"""
+        self._drop(lambda key, pack: pack.product_intelligence_id == product_intelligence_id)
+
+    def _drop(self, predicate):
+        stale = [key for key, pack in self._packs.items() if predicate(key, pack)]
+        for key in stale:
+            del self._packs[key]
+        self.stats["invalidations"] += len(stale)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "items": len(self._packs), "max_items": self.max_items}
+
+
+# Global cache instance (one per worker process)
+context_pack_cache = ContextPackCache()
@@ -1,11 +1,12 @@
 """Web scraping and content extraction service."""
-import httpx
-from bs4 import BeautifulSoup
 from typing import Dict, Any, Optional, List
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse
 import asyncio
 
+from app.services.html_document import ParsedPage, parse_page
+from app.services.outbound_http import outbound_http
+
 
 class CrawlerService:
     """Service for web scraping and content extraction."""
@@ -30,10 +31,9 @@ class CrawlerService:
         """
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
-                    response = await client.get(url, headers=self.headers)
-                    response.raise_for_status()
-                    return response.text
+                response = await outbound_http.get(url, purpose="page", timeout=self.timeout, headers=self.headers)
+                response.raise_for_status()
+                return response.text
             except Exception as e:
                 if attempt == self.max_retries - 1:
                     print(f"Failed to fetch {url} after {self.max_retries} attempts: {str(e)}")
@@ -42,101 +42,42 @@ class CrawlerService:
         
         return None
     
-    def extract_text(self, html: str) -> str:
+    def extract_text(self, document: ParsedPage) -> str:
         """
-        Extract clean text from HTML.
+        Extract clean text from a parsed page.
         
         Args:
-            html: HTML content
+            document: Parsed page (see parse_page)
             
         Returns:
             Cleaned text content
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-        
-        # Get text
-        text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text
+        return document.text
     
-    def extract_metadata(self, html: str, url: str) -> Dict[str, Any]:
+    def extract_metadata(self, document: ParsedPage) -> Dict[str, Any]:
         """
-        Extract metadata from HTML.
+        Extract metadata from a parsed page.
         
         Args:
-            html: HTML content
-            url: Source URL
+            document: Parsed page (see parse_page)
             
         Returns:
             Dictionary containing metadata
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        metadata = {
-            'url': url,
-            'title': '',
-            'description': '',
-            'keywords': [],
-            'og_data': {},
-            'links': []
-        }
-        
-        # Extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.get_text().strip()
-        
-        # Extract meta description
-        desc_tag = soup.find('meta', attrs={'name': 'description'})
-        if desc_tag and desc_tag.get('content'):
-            metadata['description'] = desc_tag['content'].strip()
-        
-        # Extract keywords
-        keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
-        if keywords_tag and keywords_tag.get('content'):
-            metadata['keywords'] = [k.strip() for k in keywords_tag['content'].split(',')]
-        
-        # Extract Open Graph data
-        og_tags = soup.find_all('meta', attrs={'property': re.compile(r'^og:')})
-        for tag in og_tags:
-            property_name = tag.get('property', '').replace('og:', '')
-            content = tag.get('content', '')
-            if property_name and content:
-                metadata['og_data'][property_name] = content
-        
-        # Extract links
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            # Convert relative URLs to absolute
-            absolute_url = urljoin(url, href)
-            metadata['links'].append({
-                'url': absolute_url,
-                'text': link.get_text().strip()
-            })
-        
+        metadata = document.metadata
+        metadata['links'] = [dict(link) for link in document.links]
         return metadata
     
-    def extract_product_info(self, html: str) -> Dict[str, Any]:
+    def extract_product_info(self, document: ParsedPage) -> Dict[str, Any]:
         """
-        Extract product-specific information from HTML.
+        Extract product-specific information from a parsed page.
         
         Args:
-            html: HTML content
+            document: Parsed page (see parse_page)
             
         Returns:
             Dictionary containing product information
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        
         product_info = {
             'price': None,
             'features': [],
@@ -153,27 +94,20 @@ class CrawlerService:
             r'\d+(?:\.\d{2})?\s*(?:USD|EUR|GBP)'
         ]
         
-        text = soup.get_text()
         for pattern in price_patterns:
-            match = re.search(pattern, text)
+            match = re.search(pattern, document.text)
             if match:
                 product_info['price'] = match.group(0)
                 break
         
-        # Extract features (look for lists)
-        feature_sections = soup.find_all(['ul', 'ol'])
-        for section in feature_sections:
-            items = section.find_all('li')
-            if items:
-                features = [item.get_text().strip() for item in items]
-                product_info['features'].extend(features)
+        # Extract features (list items)
+        product_info['features'] = list(document.list_items)
         
         # Extract CTAs
-        cta_buttons = soup.find_all(['button', 'a'], class_=re.compile(r'(btn|button|cta)', re.I))
-        for button in cta_buttons:
-            text = button.get_text().strip()
-            if text:
-                product_info['cta_buttons'].append(text)
+        cta_class = re.compile(r'(btn|button|cta)', re.I)
+        for button in document.ctas:
+            if button['text'] and any(cta_class.search(name) for name in button['class'].split()):
+                product_info['cta_buttons'].append(button['text'])
         
         return product_info
     
@@ -197,9 +131,11 @@ class CrawlerService:
             }
         
         try:
-            text_content = self.extract_text(html)
-            metadata = self.extract_metadata(html, url)
-            product_info = self.extract_product_info(html)
+            # Parse once and extract everything from the same document
+            document = await parse_page(html, url)
+            text_content = self.extract_text(document)
+            metadata = self.extract_metadata(document)
+            product_info = self.extract_product_info(document)
             
             return {
                 'success': True,
@@ -0,0 +1,162 @@
+"""
+Embedding Micro-Batcher
+Coalesces single-text embedding requests from concurrent callers into one
+batched provider call
+
+RAG retrieval and ingestion embed one text at a time from many concurrent
+requests. Both providers accept large batches (2048 texts for OpenAI, 96 for
+Cohere) with much better per-text latency and rate-limit use, so requests are
+queued per input_type for a few milliseconds (or until max_batch_size items
+arrive), embedded together, and each caller's future is resolved with its
+own vector.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+BatchFunc = Callable[[List[str], str], Awaitable[List[List[float]]]]
+SingleFunc = Callable[[str, str], Awaitable[List[float]]]
+
+# Batch-size histogram buckets (upper bounds)
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 96, 256, 2048)
+
+
+@dataclass
+class BatcherMetrics:
+    """Batch-size and outcome metrics for the coalescer"""
+    batches: int = 0
+    items: int = 0
+    max_batch_size: int = 0
+    size_flushes: int = 0  # flushed because the batch was full
+    timer_flushes: int = 0  # flushed because the wait window expired
+    batch_failures: int = 0
+    size_histogram: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, size: int, full: bool):
+        self.batches += 1
+        self.items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        if full:
+            self.size_flushes += 1
+        else:
+            self.timer_flushes += 1
+        bucket = next((b for b in _SIZE_BUCKETS if size <= b), _SIZE_BUCKETS[-1])
+        label = f"<={bucket}"
+        self.size_histogram[label] = self.size_histogram.get(label, 0) + 1
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "size_flushes": self.size_flushes,
+            "timer_flushes": self.timer_flushes,
+            "batch_failures": self.batch_failures,
+            "size_histogram": dict(self.size_histogram),
+        }
+
+
+class EmbeddingBatcher:
+    """
+    Per-input_type coalescing queues in front of a batch embedding function
+
+    Usage:
+        batcher = EmbeddingBatcher(batch_func=service.generate_embeddings_batch)
+        vector = await batcher.embed("some text", "search_query")
+    """
+
+    def __init__(
+        self,
+        batch_func: BatchFunc,
+        single_func: Optional[SingleFunc] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        self.batch_func = batch_func
+        # Used per-text when a whole batch fails (lets single-call fallback kick in)
+        self.single_func = single_func
+        self.max_batch_size = max_batch_size or int(getattr(settings, "EMBEDDING_BATCH_MAX_ITEMS", 96))
+        wait_ms = max_wait_ms if max_wait_ms is not None else float(getattr(settings, "EMBEDDING_BATCH_WAIT_MS", 5))
+        self.max_wait = wait_ms / 1000.0
+        self._queues: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # Strong references so in-flight batch tasks aren't garbage-collected
+        self._tasks: Set[asyncio.Task] = set()
+        self.metrics: Dict[str, BatcherMetrics] = {}
+
+    async def embed(self, text: str, input_type: str = "search_document") -> List[float]:
+        """Queue a text for embedding and wait for its vector"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues.setdefault(input_type, [])
+        queue.append((text, future))
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(input_type, full=True)
+        elif input_type not in self._timers:
+            self._timers[input_type] = loop.call_later(self.max_wait, self._flush, input_type, False)
+
+        return await future
+
+    def _flush(self, input_type: str, full: bool):
+        timer = self._timers.pop(input_type, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._queues.pop(input_type, [])
+        if not batch:
+            return
+
+        self.metrics.setdefault(input_type, BatcherMetrics()).record(len(batch), full)
+        task = asyncio.get_running_loop().create_task(self._run_batch(input_type, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, input_type: str, batch: List[Tuple[str, asyncio.Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await self.batch_func(texts, input_type)
+            if len(embeddings) != len(texts):
+                # Never leave callers waiting on futures that zip() would skip
+                raise ValueError(f"Provider returned {len(embeddings)} embeddings for {len(texts)} texts")
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+        except Exception as e:
+            self.metrics[input_type].batch_failures += 1
+            logger.warning(f"[EmbeddingBatcher] Batch of {len(batch)} ({input_type}) failed: {e}")
+
+            if self.single_func is None:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            # Retry per text so each caller gets the single-call fallback path
+            results = await asyncio.gather(
+                *(self.single_func(text, input_type) for text in texts),
+                return_exceptions=True,
+            )
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def get_metrics(self) -> Dict[str, object]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queued": {input_type: len(queue) for input_type, queue in self._queues.items()},
+            "by_input_type": {input_type: m.to_dict() for input_type, m in self.metrics.items()},
+        }
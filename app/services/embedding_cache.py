@@ -0,0 +1,179 @@
+"""
+Embedding Cache
+Two-level cache for text embeddings: hot in-memory LRU + Postgres table
+
+Keyed by (sha256(text), model, dimensions, input_type) so the same product
+descriptions, research abstracts and repeated RAG queries are only sent to
+OpenAI/Cohere once. Database errors never fail an embedding request - the
+cache degrades to memory-only and logs the problem.
+"""
+from __future__ import annotations
+
+import array
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config.settings import settings
+from app.db.models import EmbeddingCache as EmbeddingCacheRow
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EmbeddingCacheKey:
+    """Cache key for one embedded text"""
+    content_hash: str
+    model: str
+    dimensions: int
+    input_type: str
+
+
+class EmbeddingCache:
+    """
+    Hot LRU in front of the embedding_cache table
+
+    Usage:
+        key = embedding_cache.make_key(text, "openai:text-embedding-3-large", 1536, "search_document")
+        cached = await embedding_cache.get_many([key])
+        ...
+        await embedding_cache.set_many({key: embedding})
+    """
+
+    def __init__(self, max_items: Optional[int] = None, enabled: Optional[bool] = None):
+        self.max_items = max_items or int(getattr(settings, "EMBEDDING_CACHE_MEMORY_ITEMS", 2000))
+        self.enabled = bool(getattr(settings, "EMBEDDING_CACHE_ENABLED", True)) if enabled is None else enabled
+        # Vectors are stored as float32 arrays (~6 KB per 1536 dims instead of ~48 KB as a list)
+        self._memory: "OrderedDict[EmbeddingCacheKey, array.array]" = OrderedDict()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """SHA-256 of the exact text that is sent to the provider"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def make_key(self, text: str, model: str, dimensions: int, input_type: str) -> EmbeddingCacheKey:
+        return EmbeddingCacheKey(
+            content_hash=self.hash_text(text),
+            model=model,
+            dimensions=dimensions,
+            input_type=input_type,
+        )
+
+    # ------------- memory tier -------------
+
+    def _memory_get(self, key: EmbeddingCacheKey) -> Optional[List[float]]:
+        vector = self._memory.get(key)
+        if vector is None:
+            return None
+        self._memory.move_to_end(key)
+        return vector.tolist()
+
+    def _memory_set(self, key: EmbeddingCacheKey, embedding: Iterable[float]):
+        self._memory[key] = array.array("f", embedding)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    # ------------- public API -------------
+
+    async def get_many(self, keys: List[EmbeddingCacheKey]) -> Dict[EmbeddingCacheKey, List[float]]:
+        """Return cached embeddings for the keys that are present (memory first, then Postgres)"""
+        if not self.enabled or not keys:
+            return {}
+
+        found: Dict[EmbeddingCacheKey, List[float]] = {}
+        missing: List[EmbeddingCacheKey] = []
+        for key in dict.fromkeys(keys):
+            embedding = self._memory_get(key)
+            if embedding is not None:
+                found[key] = embedding
+            else:
+                missing.append(key)
+        self.stats["memory_hits"] += len(found)
+
+        if missing:
+            db_found = await self._db_get_many(missing)
+            for key, embedding in db_found.items():
+                self._memory_set(key, embedding)
+                found[key] = embedding
+            self.stats["db_hits"] += len(db_found)
+            self.stats["misses"] += len(missing) - len(db_found)
+
+        return found
+
+    async def get(self, key: EmbeddingCacheKey) -> Optional[List[float]]:
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, entries: Dict[EmbeddingCacheKey, List[float]]):
+        """Store embeddings in both tiers (existing rows are left untouched)"""
+        if not self.enabled or not entries:
+            return
+
+        for key, embedding in entries.items():
+            self._memory_set(key, embedding)
+
+        try:
+            rows = [
+                {
+                    "content_hash": key.content_hash,
+                    "model": key.model,
+                    "dimensions": key.dimensions,
+                    "input_type": key.input_type,
+                    "embedding": list(embedding),
+                }
+                for key, embedding in entries.items()
+            ]
+            async with AsyncSessionLocal() as session:
+                stmt = insert(EmbeddingCacheRow).values(rows).on_conflict_do_nothing()
+                await session.execute(stmt)
+                await session.commit()
+            self.stats["writes"] += len(rows)
+        except Exception as e:
+            logger.warning(f"[EmbeddingCache] Failed to persist {len(entries)} embeddings: {e}")
+
+    async def set(self, key: EmbeddingCacheKey, embedding: List[float]):
+        await self.set_many({key: embedding})
+
+    def clear_memory(self):
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "memory_items": len(self._memory), "memory_max_items": self.max_items}
+
+    # ------------- database tier -------------
+
+    async def _db_get_many(self, keys: List[EmbeddingCacheKey]) -> Dict[EmbeddingCacheKey, List[float]]:
+        # Group by (model, dimensions, input_type) so each group is one IN query
+        groups: Dict[tuple, Dict[str, EmbeddingCacheKey]] = {}
+        for key in keys:
+            groups.setdefault((key.model, key.dimensions, key.input_type), {})[key.content_hash] = key
+
+        found: Dict[EmbeddingCacheKey, List[float]] = {}
+        try:
+            async with AsyncSessionLocal() as session:
+                for (model, dimensions, input_type), by_hash in groups.items():
+                    result = await session.execute(
+                        select(EmbeddingCacheRow.content_hash, EmbeddingCacheRow.embedding).where(
+                            EmbeddingCacheRow.content_hash.in_(list(by_hash.keys())),
+                            EmbeddingCacheRow.model == model,
+                            EmbeddingCacheRow.dimensions == dimensions,
+                            EmbeddingCacheRow.input_type == input_type,
+                        )
+                    )
+                    for content_hash, embedding in result.all():
+                        found[by_hash[content_hash]] = [float(x) for x in embedding]
+        except Exception as e:
+            logger.warning(f"[EmbeddingCache] Lookup failed, treating as miss: {e}")
+
+        return found
+
+
+# Global cache instance (memory tier is per worker, database tier is shared)
+embedding_cache = EmbeddingCache()
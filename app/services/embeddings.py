@@ -7,6 +7,7 @@ import hashlib
 import logging
 from typing import List, Optional
 from app.core.config.settings import settings, EMBEDDING_CONFIG
+from app.services.cohere_embed import cohere_embed, cohere_embed_batches, COHERE_MAX_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,8 @@ class EmbeddingService:
             List of floats representing the embedding vector
         """
         try:
-            response = self.client.embed(
+            response = await cohere_embed(
+                self.client,
                 texts=[text],
                 model=self.model,
                 input_type=input_type,
@@ -66,20 +68,18 @@ class EmbeddingService:
             List of embedding vectors
         """
         try:
-            # Cohere supports up to 96 texts per batch
-            batch_size = 96
+            # Cohere supports up to 96 texts per batch; chunks are sent concurrently
             all_embeddings = []
+            responses = await cohere_embed_batches(
+                self.client,
+                texts,
+                batch_size=COHERE_MAX_BATCH_SIZE,
+                model=self.model,
+                input_type=input_type,
+                truncate="END"
+            )
             
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                
-                response = self.client.embed(
-                    texts=batch,
-                    model=self.model,
-                    input_type=input_type,
-                    truncate="END"
-                )
-                
+            for response in responses:
                 all_embeddings.extend(response.embeddings)
             
             logger.info(f"✅ Generated {len(all_embeddings)} embeddings")
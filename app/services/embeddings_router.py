@@ -2,20 +2,34 @@
 Embedding Service with AI Router
 Generates vector embeddings using AI Router for automatic failover
 Supports OpenAI and Cohere with consistent 1536-dimensional output
+
+Embeddings are cached by (content hash, model, dimensions, input_type);
+only cache misses are sent to the provider.
 """
-import hashlib
 import logging
+import time
 import openai
 import cohere
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.core.config.settings import settings
 from app.services.ai_router import AIRouter
+from app.services.embedding_cache import embedding_cache, EmbeddingCacheKey
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.cohere_embed import cohere_embed, cohere_embed_batches, COHERE_MAX_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
 # Fixed dimension for all embeddings (matches database Vector columns)
 EMBEDDING_DIMENSIONS = 1536
 
+# Models actually called per provider (part of the embedding cache key)
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-large"
+COHERE_EMBEDDING_MODEL = "embed-english-v3.0"
+_PROVIDER_MODELS = {
+    "openai": OPENAI_EMBEDDING_MODEL,
+    "cohere": COHERE_EMBEDDING_MODEL,
+}
+
 
 class EmbeddingRouterService:
     """Service for generating text embeddings with AI Router failover"""
@@ -25,6 +39,12 @@ class EmbeddingRouterService:
         self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.cohere_client = cohere.Client(settings.COHERE_API_KEY)
         self.dimensions = EMBEDDING_DIMENSIONS
+        self.cache = embedding_cache
+
+    def _cache_key(self, text: str, provider: str, input_type: str) -> EmbeddingCacheKey:
+        """Cache key for text embedded by a provider"""
+        model = f"{provider}:{_PROVIDER_MODELS.get(provider, provider)}"
+        return self.cache.make_key(text, model, self.dimensions, input_type)
 
     async def generate_embedding(
         self,
@@ -41,6 +61,17 @@ class EmbeddingRouterService:
         Returns:
             List of floats representing the embedding vector (1536 dimensions)
         """
+        # Concurrent single-text calls are coalesced into one batched provider call
+        if settings.EMBEDDING_BATCHING_ENABLED:
+            return await embedding_batcher.embed(text, input_type)
+        return await self._generate_single_embedding(text, input_type)
+
+    async def _generate_single_embedding(
+        self,
+        text: str,
+        input_type: str = "search_document"
+    ) -> List[float]:
+        """Embed one text with its own provider call (with cache and fallback)"""
         # Use AI Router to pick best provider
         spec = self.router.pick(
             use_case="embeddings",
@@ -48,32 +79,29 @@ class EmbeddingRouterService:
             gen_tokens=0  # Embeddings don't generate tokens
         )
 
+        cache_key = self._cache_key(text, spec.name, input_type)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"[EmbeddingRouter] Cache hit ({spec.name}, {input_type})")
+            return cached
+
         logger.info(f"[EmbeddingRouter] Using {spec.name}:{spec.model} for embeddings")
 
+        start_time = time.time()
         try:
-            if spec.name == "openai":
-                embedding = await self._generate_openai_embedding(text)
-            elif spec.name == "cohere":
-                embedding = await self._generate_cohere_embedding(text, input_type)
-            else:
-                raise ValueError(f"Unsupported embedding provider: {spec.name}")
-
-            # Verify dimension
-            if len(embedding) != self.dimensions:
-                raise ValueError(
-                    f"Embedding dimension mismatch: expected {self.dimensions}, got {len(embedding)}"
-                )
+            embedding = await self._embed_with_provider(spec.name, text, input_type)
 
             # Report success to router
-            self.router.report_success(spec)
+            self.router.report_success(spec, response_time=time.time() - start_time)
             logger.info(f"✅ Generated embedding (provider: {spec.name}, dim: {len(embedding)})")
 
+            await self.cache.set(cache_key, embedding)
             return embedding
 
         except Exception as e:
             logger.error(f"❌ Embedding generation failed with {spec.name}:{spec.model}: {e}")
             # Report failure to router
-            self.router.report_failure(spec)
+            self.router.report_failure(spec, error=e, response_time=time.time() - start_time)
 
             # Try fallback provider if enabled
             if self.router.fallback_enabled:
@@ -82,10 +110,26 @@ class EmbeddingRouterService:
             else:
                 raise
 
+    async def _embed_with_provider(self, provider: str, text: str, input_type: str) -> List[float]:
+        """Embed a single text with a specific provider and verify the dimension"""
+        if provider == "openai":
+            embedding = await self._generate_openai_embedding(text)
+        elif provider == "cohere":
+            embedding = await self._generate_cohere_embedding(text, input_type)
+        else:
+            raise ValueError(f"Unsupported embedding provider: {provider}")
+
+        # Verify dimension
+        if len(embedding) != self.dimensions:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected {self.dimensions}, got {len(embedding)}"
+            )
+        return embedding
+
     async def _generate_openai_embedding(self, text: str) -> List[float]:
         """Generate embedding using OpenAI text-embedding-3-large with dimension reduction"""
         response = await self.openai_client.embeddings.create(
-            model="text-embedding-3-large",
+            model=OPENAI_EMBEDDING_MODEL,
             input=text,
             dimensions=self.dimensions  # Request specific dimension output
         )
@@ -94,10 +138,11 @@ class EmbeddingRouterService:
     async def _generate_cohere_embedding(self, text: str, input_type: str) -> List[float]:
         """Generate embedding using Cohere embed-english-v3.0"""
         # Cohere supports 1024, 1536, 2048 dimensions - we use 1536
-        # Note: Cohere's synchronous API doesn't have async support
-        response = self.cohere_client.embed(
+        # The Cohere client is synchronous, so run it off the event loop
+        response = await cohere_embed(
+            self.cohere_client,
             texts=[text],
-            model="embed-english-v3.0",
+            model=COHERE_EMBEDDING_MODEL,
             input_type=input_type,
             embedding_types=["float"],
             truncate="END"
@@ -125,10 +170,19 @@ class EmbeddingRouterService:
         """Try the other provider as fallback"""
         if failed_provider == "openai":
             logger.info("[EmbeddingRouter] Fallback to Cohere")
-            return await self._generate_cohere_embedding(text, input_type)
+            provider = "cohere"
         else:
             logger.info("[EmbeddingRouter] Fallback to OpenAI")
-            return await self._generate_openai_embedding(text)
+            provider = "openai"
+
+        cache_key = self._cache_key(text, provider, input_type)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        embedding = await self._embed_with_provider(provider, text, input_type)
+        await self.cache.set(cache_key, embedding)
+        return embedding
 
     async def generate_embeddings_batch(
         self,
@@ -138,13 +192,19 @@ class EmbeddingRouterService:
         """
         Generate embeddings for multiple texts (batch)
 
+        Cached texts are served locally; only unique cache misses are sent
+        to the provider.
+
         Args:
             texts: List of texts to embed
             input_type: Type of input
 
         Returns:
-            List of embedding vectors
+            List of embedding vectors (same order as texts)
         """
+        if not texts:
+            return []
+
         # Use AI Router to pick best provider
         spec = self.router.pick(
             use_case="embeddings",
@@ -152,32 +212,53 @@ class EmbeddingRouterService:
             gen_tokens=0
         )
 
-        logger.info(f"[EmbeddingRouter] Batch processing {len(texts)} texts with {spec.name}:{spec.model}")
+        keys = [self._cache_key(text, spec.name, input_type) for text in texts]
+        resolved: Dict[EmbeddingCacheKey, List[float]] = await self.cache.get_many(keys)
+
+        # Unique misses only (identical texts in one batch are embedded once)
+        miss_texts: Dict[EmbeddingCacheKey, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in resolved and key not in miss_texts:
+                miss_texts[key] = text
 
+        if not miss_texts:
+            logger.info(f"[EmbeddingRouter] Batch of {len(texts)} texts fully served from cache")
+            return [resolved[key] for key in keys]
+
+        pending = list(miss_texts.values())
+        logger.info(
+            f"[EmbeddingRouter] Batch processing {len(pending)} texts with {spec.name}:{spec.model} "
+            f"({len(texts) - len(pending)} served from cache)"
+        )
+
+        start_time = time.time()
         try:
             if spec.name == "openai":
                 # OpenAI supports up to 2048 texts per batch
-                response = await self.openai_client.embeddings.create(
-                    model="text-embedding-3-large",
-                    input=texts,
-                    dimensions=self.dimensions
-                )
-                embeddings = [data.embedding for data in response.data]
+                embeddings = []
+                batch_size = 2048
+                for i in range(0, len(pending), batch_size):
+                    response = await self.openai_client.embeddings.create(
+                        model=OPENAI_EMBEDDING_MODEL,
+                        input=pending[i:i + batch_size],
+                        dimensions=self.dimensions
+                    )
+                    embeddings.extend(data.embedding for data in response.data)
 
             elif spec.name == "cohere":
-                # Cohere supports up to 96 texts per batch
-                batch_size = 96
+                # Cohere supports up to 96 texts per batch; chunks are sent concurrently
                 embeddings = []
+                responses = await cohere_embed_batches(
+                    self.cohere_client,
+                    pending,
+                    batch_size=COHERE_MAX_BATCH_SIZE,
+                    model=COHERE_EMBEDDING_MODEL,
+                    input_type=input_type,
+                    embedding_types=["float"],
+                    truncate="END"
+                )
 
-                for i in range(0, len(texts), batch_size):
-                    batch = texts[i:i + batch_size]
-                    response = self.cohere_client.embed(
-                        texts=batch,
-                        model="embed-english-v3.0",
-                        input_type=input_type,
-                        embedding_types=["float"],
-                        truncate="END"
-                    )
+                for response in responses:
                     batch_embeddings = response.embeddings.float_ if hasattr(response.embeddings, 'float_') else response.embeddings
 
                     # Ensure correct dimensions
@@ -190,15 +271,19 @@ class EmbeddingRouterService:
             else:
                 raise ValueError(f"Unsupported embedding provider: {spec.name}")
 
-            self.router.report_success(spec)
+            self.router.report_success(spec, response_time=time.time() - start_time)
             logger.info(f"✅ Generated {len(embeddings)} embeddings (provider: {spec.name})")
-            return embeddings
 
         except Exception as e:
             logger.error(f"❌ Batch embedding generation failed: {e}")
-            self.router.report_failure(spec)
+            self.router.report_failure(spec, error=e, response_time=time.time() - start_time)
             raise
 
+        new_entries = dict(zip(miss_texts.keys(), embeddings))
+        await self.cache.set_many(new_entries)
+        resolved.update(new_entries)
+        return [resolved[key] for key in keys]
+
     def generate_content_hash(self, text: str) -> str:
         """
         Generate a hash for content deduplication
@@ -207,9 +292,9 @@ class EmbeddingRouterService:
             text: Text to hash
 
         Returns:
-            SHA256 hash string
+            SHA256 hash string (same hash the embedding cache is keyed by)
         """
-        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return self.cache.hash_text(text)
 
     async def embed_for_storage(
         self,
@@ -326,3 +411,9 @@ class EmbeddingRouterService:
 
 # Global embedding service instance
 embedding_router_service = EmbeddingRouterService()
+
+# Global micro-batcher shared by every EmbeddingRouterService instance
+embedding_batcher = EmbeddingBatcher(
+    batch_func=embedding_router_service.generate_embeddings_batch,
+    single_func=embedding_router_service._generate_single_embedding,
+)
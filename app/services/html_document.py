@@ -0,0 +1,224 @@
+"""
+HTML Document Model
+Parses a fetched page once with lxml and exposes everything downstream
+services read from it
+
+The sales page scraper, Business DNA extractor and crawler used to parse the
+same HTML separately (several times each, with BeautifulSoup's pure-Python
+html.parser). parse_html() walks the tree once and returns a ParsedPage of
+plain data: metadata, visible text, image URLs, stylesheet links, CTA
+elements and the style/class information Business DNA analysis needs.
+
+ParsedPage holds no lxml objects, so it can be built in a worker process:
+parse_page() parses small pages in a thread and large pages in a process
+pool, keeping CPU-heavy parsing off the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Elements that never contribute to the page's visible text
+NON_VISIBLE_TAGS = ('script', 'style', 'nav', 'footer', 'header')
+
+
+@dataclass
+class ParsedPage:
+    """Everything extracted from one HTML document (picklable plain data)"""
+    url: str
+    title: str = ''
+    description: str = ''
+    keywords: List[str] = field(default_factory=list)
+    og_data: Dict[str, str] = field(default_factory=dict)
+    text: str = ''  # Visible text (script/style/nav/footer/header removed), whitespace-collapsed
+    image_urls: List[str] = field(default_factory=list)  # Absolute, unique, page order (unfiltered)
+    images: List[Dict[str, str]] = field(default_factory=list)  # <img src> elements: src, alt
+    stylesheet_urls: List[str] = field(default_factory=list)  # Absolute <link rel="stylesheet"> hrefs
+    style_blocks: List[str] = field(default_factory=list)  # <style> contents
+    inline_styles: List[str] = field(default_factory=list)  # style="" attributes
+    class_names: List[str] = field(default_factory=list)  # Unique class tokens
+    headings: Dict[str, List[str]] = field(default_factory=dict)  # h1 / h2 texts
+    ctas: List[Dict[str, str]] = field(default_factory=list)  # <button> and <a>: tag, text, href, class, style
+    links: List[Dict[str, str]] = field(default_factory=list)  # <a href>: absolute url, text
+    list_items: List[str] = field(default_factory=list)  # <li> texts inside <ul>/<ol>
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Page metadata in the shape the scraper has always returned"""
+        return {
+            'url': self.url,
+            'title': self.title,
+            'description': self.description,
+            'keywords': list(self.keywords),
+            'og_data': dict(self.og_data)
+        }
+
+    @property
+    def word_count(self) -> int:
+        return len(self.text.split())
+
+
+def _clean_text(text: str) -> str:
+    """Collapse whitespace the way the scraper always has"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def _build_tree(html: str):
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration must be passed as bytes
+        return lxml.html.document_fromstring(html.encode('utf-8'))
+
+
+def parse_html(html: str, url: str) -> ParsedPage:
+    """
+    Parse an HTML document once and extract everything downstream services need
+
+    Args:
+        html: HTML content
+        url: Page URL (base for relative links)
+
+    Returns:
+        ParsedPage (empty apart from the URL when the document can't be parsed)
+    """
+    page = ParsedPage(url=url)
+    try:
+        root = _build_tree(html)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Failed to parse HTML for {url}: {e}")
+        return page
+
+    # Metadata
+    title = root.find('.//title')
+    if title is not None:
+        page.title = title.text_content().strip()
+
+    for meta in root.iter('meta'):
+        name = meta.get('name')
+        content = meta.get('content')
+        if name == 'description' and content and not page.description:
+            page.description = content.strip()
+        elif name == 'keywords' and content and not page.keywords:
+            page.keywords = [k.strip() for k in content.split(',')]
+
+        prop = meta.get('property') or ''
+        if prop.startswith('og:') and content:
+            og_name = prop.replace('og:', '')
+            if og_name:
+                page.og_data[og_name] = content
+
+    # Images
+    seen_images = set()
+    for img in root.iter('img'):
+        src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+        if src:
+            absolute_url = urljoin(url, src)
+            if absolute_url not in seen_images:
+                seen_images.add(absolute_url)
+                page.image_urls.append(absolute_url)
+        if img.get('src') is not None:
+            page.images.append({'src': img.get('src'), 'alt': img.get('alt') or ''})
+
+    # Styles
+    for link in root.iter('link'):
+        rel = (link.get('rel') or '').lower().split()
+        if 'stylesheet' in rel and link.get('href'):
+            page.stylesheet_urls.append(urljoin(url, link.get('href')))
+
+    page.style_blocks = [style.text_content() for style in root.iter('style')]
+
+    classes = {}
+    for element in root.iter(etree.Element):
+        style = element.get('style')
+        if style is not None:
+            page.inline_styles.append(style)
+        for class_name in (element.get('class') or '').split():
+            classes.setdefault(class_name, None)
+    page.class_names = list(classes)
+
+    # Headings, CTAs, links and lists
+    page.headings = {
+        'h1': [h.text_content().strip() for h in root.iter('h1')],
+        'h2': [h.text_content().strip() for h in root.iter('h2')],
+    }
+
+    for element in root.iter('button', 'a'):
+        text = element.text_content().strip()
+        page.ctas.append({
+            'tag': element.tag,
+            'text': text,
+            'href': element.get('href') or '',
+            'class': element.get('class') or '',
+            'style': element.get('style') or ''
+        })
+        if element.tag == 'a' and element.get('href') is not None:
+            page.links.append({'url': urljoin(url, element.get('href')), 'text': text})
+
+    page.list_items = [
+        li.text_content().strip()
+        for li in root.iter('li')
+        if li.getparent() is not None and li.getparent().tag in ('ul', 'ol')
+    ]
+
+    # Visible text (last: removes non-visible elements from the tree)
+    for element in list(root.iter(*NON_VISIBLE_TAGS)):
+        if element.getparent() is not None:
+            element.drop_tree()
+    page.text = _clean_text(root.text_content())
+
+    return page
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        workers = int(getattr(settings, "HTML_PARSE_PROCESSES", 2))
+        _process_pool = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"✓ HTML parse process pool started ({workers} workers)")
+    return _process_pool
+
+
+async def parse_page(html: str, url: str) -> ParsedPage:
+    """
+    Parse an HTML document off the event loop
+
+    Pages above HTML_PARSE_PROCESS_THRESHOLD_BYTES go to the process pool;
+    smaller pages are parsed in a thread (pool startup and pickling would
+    cost more than the parse).
+    """
+    threshold = int(getattr(settings, "HTML_PARSE_PROCESS_THRESHOLD_BYTES", 500_000))
+    if len(html) >= threshold:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(_get_process_pool(), parse_html, html, url)
+        except BrokenProcessPool as e:
+            # A worker died - start a fresh pool next time and parse this page in a thread
+            logger.warning(f"HTML parse process pool broken, parsing in thread: {e}")
+            shutdown_parse_pool()
+    return await asyncio.to_thread(parse_html, html, url)
+
+
+def shutdown_parse_pool():
+    """Stop the parse process pool (application shutdown)"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,116 @@
+"""
+Image Classification Cache
+Two-level cache for Claude Vision image classifications: hot in-memory LRU + Postgres table
+
+Keyed by (sha256(image bytes), model), so an image is classified once no matter
+how often its product is recompiled or how many sales pages (or URLs) serve it.
+Only successful classifications are stored. Database errors never fail image
+processing - the cache degrades to memory-only and logs the problem.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config.settings import settings
+from app.db.models import ImageClassification
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+Classification = Dict[str, Any]
+
+
+class ImageClassificationCache:
+    """
+    Hot LRU in front of the image_classifications table
+
+    Usage:
+        image_hash = image_classification_cache.hash_image(image_bytes)
+        cached = await image_classification_cache.get(image_hash, model)
+        ...
+        await image_classification_cache.set(image_hash, model, classification)
+    """
+
+    def __init__(self, max_items: Optional[int] = None):
+        self.max_items = max_items or int(getattr(settings, "VISION_CACHE_MEMORY_ITEMS", 2000))
+        self._memory: "OrderedDict[Tuple[str, str], Classification]" = OrderedDict()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def hash_image(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _memory_set(self, key: Tuple[str, str], classification: Classification):
+        self._memory[key] = classification
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    async def get(self, image_hash: str, model: str) -> Optional[Classification]:
+        """Cached classification (a copy - callers may adjust scores) or None"""
+        key = (image_hash, model)
+        classification = self._memory.get(key)
+        if classification is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return dict(classification)
+
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(ImageClassification.classification).where(
+                        ImageClassification.image_sha256 == image_hash,
+                        ImageClassification.model == model,
+                    )
+                )
+                classification = result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"[ImageClassificationCache] Lookup failed, treating as miss: {e}")
+            classification = None
+
+        if classification is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["db_hits"] += 1
+        self._memory_set(key, classification)
+        return dict(classification)
+
+    async def set(self, image_hash: str, model: str, classification: Classification):
+        """Store a successful classification in both tiers"""
+        self._memory_set((image_hash, model), dict(classification))
+        try:
+            async with AsyncSessionLocal() as session:
+                stmt = insert(ImageClassification).values(
+                    image_sha256=image_hash,
+                    model=model,
+                    classification=classification,
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[ImageClassification.image_sha256, ImageClassification.model],
+                    set_={"classification": stmt.excluded.classification},
+                )
+                await session.execute(stmt)
+                await session.commit()
+            self.stats["writes"] += 1
+        except Exception as e:
+            logger.warning(f"[ImageClassificationCache] Failed to persist classification: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["db_hits"]
+        total = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "cache_size": len(self._memory),
+            "hit_rate": f"{(hits / total * 100) if total else 0:.1f}%",
+        }
+
+
+# Global cache instance (memory tier is per worker, database tier is shared)
+image_classification_cache = ImageClassificationCache()
@@ -0,0 +1,128 @@
+"""
+Image Fingerprinting
+Cheap checks run on downloaded sales-page images before vision classification
+
+- probe_image(): dimensions, format and transparency from the image header
+  (PIL opens lazily - no pixel decode)
+- perceptual_hash(): 64-bit difference hash (dHash) computed from a tiny
+  grayscale thumbnail; resized, recompressed or lightly cropped copies of the
+  same shot land within a few bits of each other
+- hamming_distance(): bit distance between two hashes
+- vision_image(): the downloaded bytes in a form Claude Vision accepts
+
+Sales pages repeat the same product shot at several sizes (srcset variants,
+retina copies, lazy-load placeholders), so collapsing near-duplicates before
+classification keeps them from each costing a Claude Vision call and an R2
+upload.
+"""
+from __future__ import annotations
+
+import io
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# PIL formats Claude Vision accepts as-is (MPO is a multi-picture JPEG)
+VISION_MEDIA_TYPES = {
+    'JPEG': 'image/jpeg',
+    'MPO': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+VISION_MAX_BYTES = 5 * 1024 * 1024  # API limit per image
+VISION_MAX_EDGE = 1568  # Larger images are downscaled by the API anyway
+
+
+@dataclass
+class ImageProbe:
+    """Header-level facts about an image"""
+    width: int
+    height: int
+    format: Optional[str]
+    has_transparency: bool
+
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+    @property
+    def aspect_ratio(self) -> float:
+        return max(self.width, self.height) / max(1, min(self.width, self.height))
+
+
+def probe_image(data: bytes) -> Optional[ImageProbe]:
+    """Read dimensions/format/transparency from the header (None if not an image)"""
+    try:
+        img = Image.open(io.BytesIO(data))
+        width, height = img.size
+        has_transparency = img.mode in ('RGBA', 'LA') or (
+            img.mode == 'P' and 'transparency' in img.info
+        )
+        return ImageProbe(width=width, height=height, format=img.format, has_transparency=has_transparency)
+    except Exception as e:
+        logger.debug(f"Image probe failed: {e}")
+        return None
+
+
+def perceptual_hash(data: bytes, hash_size: int = 8) -> Optional[int]:
+    """
+    Difference hash of an image (hash_size² bits)
+
+    Decodes at reduced size where the format allows it (JPEG draft mode), so
+    large photos cost a fraction of a full decode.
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.draft('L', (hash_size * 8, hash_size * 8))
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Flatten transparency onto white so cut-out product shots hash by their shape
+            img = img.convert('RGBA')
+            background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+            img = Image.alpha_composite(background, img)
+        small = img.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+        pixels = list(small.getdata())
+    except Exception as e:
+        logger.debug(f"Perceptual hash failed: {e}")
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def vision_image(data: bytes, format: Optional[str]) -> Optional[Tuple[str, bytes]]:
+    """
+    (media_type, bytes) to send to Claude Vision for a downloaded image
+
+    Supported formats under the size limit are sent unchanged; anything else
+    is downscaled and re-encoded (PNG when it has transparency, else JPEG).
+    Returns None when the image can't be decoded.
+    """
+    media_type = VISION_MEDIA_TYPES.get((format or '').upper())
+    if media_type and len(data) <= VISION_MAX_BYTES:
+        return media_type, data
+
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE))
+        out = io.BytesIO()
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img.convert('RGBA').save(out, 'PNG', optimize=True)
+            return 'image/png', out.getvalue()
+        img.convert('RGB').save(out, 'JPEG', quality=90)
+        return 'image/jpeg', out.getvalue()
+    except Exception as e:
+        logger.debug(f"Vision re-encode failed: {e}")
+        return None
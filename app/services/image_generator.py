@@ -23,6 +23,7 @@ from PIL import Image
 
 from app.core.config.settings import settings
 from app.services.storage_r2 import r2_storage as old_r2_storage
+from app.services.outbound_http import outbound_http
 from app.services.r2_storage import r2_storage
 from app.services.r2_storage import R2Storage
 from app.services.image_provider_config import provider_config
@@ -36,43 +37,42 @@ async def check_image_has_transparency(image_url: str) -> bool:
     Returns True if the image has an alpha channel with non-opaque pixels.
     """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(image_url)
-            response.raise_for_status()
+        response = await outbound_http.get(image_url, timeout=30.0)
+        response.raise_for_status()
 
-            # Open image from bytes
-            image = Image.open(io.BytesIO(response.content))
+        # Open image from bytes
+        image = Image.open(io.BytesIO(response.content))
 
-            # Convert to RGBA if not already
-            if image.mode != 'RGBA':
-                image = image.convert('RGBA')
+        # Convert to RGBA if not already
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
 
-            # Check if image has alpha channel
-            if image.mode != 'RGBA':
-                return False
+        # Check if image has alpha channel
+        if image.mode != 'RGBA':
+            return False
 
-            # Sample the image to check for transparency
-            # Get the alpha channel
-            alpha = image.split()[-1] if len(image.split()) == 4 else None
+        # Sample the image to check for transparency
+        # Get the alpha channel
+        alpha = image.split()[-1] if len(image.split()) == 4 else None
 
-            if alpha is None:
-                return False
+        if alpha is None:
+            return False
 
-            # Sample pixels to check for transparency
-            # Check every 10th pixel to speed up the process
-            width, height = image.size
-            total_samples = 0
-            transparent_samples = 0
+        # Sample pixels to check for transparency
+        # Check every 10th pixel to speed up the process
+        width, height = image.size
+        total_samples = 0
+        transparent_samples = 0
 
-            for y in range(0, height, 10):
-                for x in range(0, width, 10):
-                    pixel_alpha = alpha.getpixel((x, y))
-                    if pixel_alpha < 255:  # Any transparency
-                        transparent_samples += 1
-                    total_samples += 1
+        for y in range(0, height, 10):
+            for x in range(0, width, 10):
+                pixel_alpha = alpha.getpixel((x, y))
+                if pixel_alpha < 255:  # Any transparency
+                    transparent_samples += 1
+                total_samples += 1
 
-            # If more than 1% of sampled pixels are transparent, consider it a transparent image
-            return total_samples > 0 and (transparent_samples / total_samples) > 0.01
+        # If more than 1% of sampled pixels are transparent, consider it a transparent image
+        return total_samples > 0 and (transparent_samples / total_samples) > 0.01
 
     except Exception as e:
         logger.error(f"Error checking image transparency for {image_url}: {e}")
@@ -584,9 +584,8 @@ class ImageGenerator:
             raise Exception(f"Unexpected FAL response format")
 
         # Download the generated image
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            image_response = await client.get(image_url)
-            image_data = image_response.content
+        image_response = await outbound_http.get(image_url, timeout=20.0)
+        image_data = image_response.content
 
         return {"image_data": image_data, "image_url": image_url, "metadata": data}
 
@@ -1005,26 +1004,25 @@ class ImageGenerator:
     async def _generate_thumbnail(self, image_url: str, campaign_id: int, size: tuple = (256, 256)) -> Optional[str]:
         """Generate thumbnail for image."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(image_url)
-                image = Image.open(io.BytesIO(response.content))
-
-                # Resize image
-                image.thumbnail(size, Image.Resampling.LANCZOS)
-
-                # Save to bytes
-                buffer = io.BytesIO()
-                image.save(buffer, format="JPEG", quality=80)
-                thumbnail_data = buffer.getvalue()
-
-                # Upload to R2
-                _, thumbnail_url = await self.r2_storage.upload_file(
-                    file_bytes=thumbnail_data,
-                    key=f"campaignforge-storage/campaigns/{campaign_id}/generated_files/thumbnails/{int(time.time())}_{hashlib.md5(image_url.encode()).hexdigest()[:8]}.jpg",
-                    content_type="image/jpeg"
-                )
+            response = await outbound_http.get(image_url, timeout=5.0)
+            image = Image.open(io.BytesIO(response.content))
+
+            # Resize image
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+
+            # Save to bytes
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=80)
+            thumbnail_data = buffer.getvalue()
 
-                return thumbnail_url
+            # Upload to R2
+            _, thumbnail_url = await self.r2_storage.upload_file(
+                file_bytes=thumbnail_data,
+                key=f"campaignforge-storage/campaigns/{campaign_id}/generated_files/thumbnails/{int(time.time())}_{hashlib.md5(image_url.encode()).hexdigest()[:8]}.jpg",
+                content_type="image/jpeg"
+            )
+
+            return thumbnail_url
         except Exception as e:
             logger.error(f"Failed to generate thumbnail: {e}")
             return None
@@ -1191,16 +1189,15 @@ class ImageGenerator:
                     logger.warning(f"⚠️ Very long URL detected ({len(image_url)} chars) from provider: {image_url[:50]}...")
 
                 # Download image from provider URL with extended timeout
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    logger.info(f"⬇️ Downloading draft from: {shortened_url[:100]}...")
-                    try:
-                        response = await client.get(shortened_url)
-                        response.raise_for_status()
-                        image_data = response.content
-                        logger.info(f"✅ Downloaded {len(image_data)} bytes")
-                    except httpx.HTTPError as e:
-                        logger.error(f"❌ HTTP error downloading draft: {e}")
-                        raise Exception(f"Failed to download draft image: {str(e)}")
+                logger.info(f"⬇️ Downloading draft from: {shortened_url[:100]}...")
+                try:
+                    response = await outbound_http.get(shortened_url, timeout=60.0)
+                    response.raise_for_status()
+                    image_data = response.content
+                    logger.info(f"✅ Downloaded {len(image_data)} bytes")
+                except httpx.HTTPError as e:
+                    logger.error(f"❌ HTTP error downloading draft: {e}")
+                    raise Exception(f"Failed to download draft image: {str(e)}")
 
             # Generate filename using centralized utility
             filename = R2Storage.generate_filename("draft", "png", campaign_id, timestamp=time.time())
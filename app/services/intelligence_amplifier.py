@@ -6,7 +6,7 @@ Replaces Blitz's 6 separate enhancers with a single unified analysis
 import json
 import logging
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 from app.core.config.settings import settings
 from app.services.ai_router import ai_router
@@ -112,17 +112,7 @@ class IntelligenceAmplifier:
             }
 
             # Add image data
-            intelligence['images'] = [
-                {
-                    'r2_url': img['r2_url'],
-                    'type': img['classification']['type'],
-                    'quality_score': img['classification']['quality_score'],
-                    'has_transparency': img.get('has_transparency', False),
-                    'dimensions': img.get('dimensions', {})
-                }
-                for img in scraped_data.get('images', [])
-                if img.get('success')
-            ]
+            intelligence['images'] = self.summarize_images(scraped_data.get('images', []))
 
             # Step 3: Conduct RAG research using clean extracted data
             if enable_rag:
@@ -322,6 +312,21 @@ class IntelligenceAmplifier:
             logger.error(f"Provider {spec.name} call failed: {e}")
             raise
 
+    def summarize_images(self, images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Image entries stored in intelligence data (successfully processed images only)"""
+        return [
+            {
+                'r2_url': img['r2_url'],
+                'r2_key': img.get('r2_key'),
+                'type': img['classification']['type'],
+                'quality_score': img['classification']['quality_score'],
+                'has_transparency': img.get('has_transparency', False),
+                'dimensions': img.get('dimensions', {})
+            }
+            for img in images
+            if img.get('success')
+        ]
+
     def _build_intelligence_prompt(
         self,
         scraped_data: Dict[str, Any],
@@ -331,7 +336,7 @@ class IntelligenceAmplifier:
 
         metadata = scraped_data.get('metadata', {})
         text_content = scraped_data.get('text_content', '')
-        image_count = len(scraped_data.get('images', []))
+        image_count = scraped_data.get('image_count', len(scraped_data.get('images', [])))
 
         # Build RAG research section if available
         rag_section = ""
@@ -2,12 +2,13 @@
 Intelligence Compiler Service - Main Orchestrator
 Coordinates scraping, amplification, RAG, and global intelligence sharing
 """
+import copy
 import hashlib
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func
 from sqlalchemy.future import select
 
 from app.db.models import Campaign, ProductIntelligence, KnowledgeBase
@@ -16,10 +17,24 @@ from app.services.intelligence_amplifier import IntelligenceAmplifier
 from app.services.embeddings_router import EmbeddingRouterService
 from app.services.storage_r2 import r2_storage
 from app.services.rag.intelligent_rag import rag_system
+from app.services.vector_rag import RAGService
+from app.services.context_pack import context_pack_cache
 from app.services.business_dna_extractor import business_dna_extractor
+from app.services.html_document import ParsedPage
+from app.services.compile_stages import Stage, StageGraph, StageFailedError
+from app.services.compile_singleflight import compile_singleflight
 
 logger = logging.getLogger(__name__)
 
+# Per-stage timeouts (seconds)
+STAGE_TIMEOUTS = {
+    "fetch": 120,  # Includes retries with backoff across URL variants
+    "images": 180,
+    "amplify": 420,  # AI analysis + research fan-out
+    "business_dna": 120,
+    "embedding": 60,
+}
+
 
 class IntelligenceCompilerService:
     """
@@ -51,7 +66,8 @@ class IntelligenceCompilerService:
                     'scrape_images': bool,
                     'max_images': int,
                     'enable_rag': bool,
-                    'force_recompile': bool
+                    'force_recompile': bool,
+                    'full_recompile': bool  # Rerun every stage (no incremental reuse)
                 }
 
         Returns:
@@ -136,45 +152,35 @@ class IntelligenceCompilerService:
             if existing_intelligence and is_complete and not options.get('force_recompile'):
                 # CACHE HIT: Reuse existing intelligence
                 logger.info(f"✨ Cache HIT! Reusing existing intelligence (ID: {existing_intelligence.id})")
+                return await self._reuse_existing_intelligence(campaign, existing_intelligence, start_time)
+
+            # Single-flight: only one compile per URL at a time (across workers);
+            # later callers wait and link to the leader's result
+            async with compile_singleflight.acquire(url_hash) as flight:
+                if flight.waited:
+                    existing_intelligence, is_complete = await self._find_existing_intelligence(url_hash, refresh=True)
+                    if existing_intelligence and is_complete:
+                        logger.info(
+                            f"🤝 Joined in-flight compile after {flight.wait_ms}ms - "
+                            f"reusing intelligence (ID: {existing_intelligence.id})"
+                        )
+                        result = await self._reuse_existing_intelligence(campaign, existing_intelligence, start_time)
+                        result['joined_in_flight'] = True
+                        return result
 
-                result = await self._link_campaign_to_intelligence(campaign, existing_intelligence)
-
-                processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
-
-                return {
-                    'success': True,
-                    'campaign_id': campaign_id,
-                    'status': 'completed',
-                    'was_cached': True,
-                    'product_intelligence_id': existing_intelligence.id,
-                    'intelligence_summary': self._generate_summary(existing_intelligence.intelligence_data),
-                    'processing_time_ms': round(processing_time),
-                    'costs': {
-                        'scraping': 0,
-                        'analysis': 0,
-                        'embeddings': 0,
-                        'total': 0
-                    },
-                    'cache_info': {
-                        'originally_compiled_at': existing_intelligence.compiled_at.isoformat(),
-                        'times_reused': existing_intelligence.times_used,
-                        'compilation_version': existing_intelligence.compilation_version
-                    }
-                }
-
-            # CACHE MISS or INCOMPLETE: Compile (or recompile) intelligence
-            if existing_intelligence and not is_complete:
-                logger.info(f"🔄 Found incomplete intelligence (ID: {existing_intelligence.id}). Recompiling...")
-            else:
-                logger.info(f"🆕 Cache MISS. Starting full compilation...")
-
-            result = await self._compile_new_intelligence(
-                campaign,
-                url_hash,
-                user_role,
-                options,
-                existing_intelligence_id=existing_intelligence.id if existing_intelligence else None
-            )
+                # CACHE MISS or INCOMPLETE: Compile (or recompile) intelligence
+                if existing_intelligence and not is_complete:
+                    logger.info(f"🔄 Found incomplete intelligence (ID: {existing_intelligence.id}). Recompiling...")
+                else:
+                    logger.info(f"🆕 Cache MISS. Starting full compilation...")
+
+                result = await self._compile_new_intelligence(
+                    campaign,
+                    url_hash,
+                    user_role,
+                    options,
+                    existing_intelligence_id=existing_intelligence.id if existing_intelligence else None
+                )
 
             processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
             result['processing_time_ms'] = round(processing_time)
@@ -233,230 +239,212 @@ class IntelligenceCompilerService:
             # Step 2: Check if already compiled (unless force_recompile)
             # Only skip if we have ACTUAL compiled intelligence (sales_page data from scraping)
             # Don't skip if it only has submission metadata
-            is_fully_compiled = (
-                product_intelligence.intelligence_data and
-                'sales_page' in product_intelligence.intelligence_data and
-                product_intelligence.intelligence_data.get('status') != 'pending_intelligence_compilation'
-            )
+            is_fully_compiled = self._is_fully_compiled(product_intelligence)
 
             if is_fully_compiled and not options.get('force_recompile'):
                 logger.info(f"✨ Product already has complete intelligence data. Skipping compilation.")
-                processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
-
-                return {
-                    'success': True,
-                    'product_intelligence_id': product_intelligence_id,
-                    'status': 'already_compiled',
-                    'was_cached': True,
-                    'intelligence_summary': self._generate_summary(product_intelligence.intelligence_data),
-                    'processing_time_ms': round(processing_time),
-                    'costs': {'total': 0}
-                }
+                return self._already_compiled_result(product_intelligence, start_time)
 
             # If only has submission metadata, proceed with compilation
             if product_intelligence.intelligence_data and not is_fully_compiled:
                 logger.info(f"📝 Product has submission metadata but no compiled intelligence. Proceeding with compilation...")
 
-            # Step 3: Perform compilation (Scrape → Amplify → RAG)
-            costs = {
-                'scraping': 0,
-                'analysis': 0,
-                'embeddings': 0,
-                'storage': 0
-            }
+            # Single-flight: only one compile per URL at a time (across workers);
+            # later callers wait and reuse the leader's result
+            async with compile_singleflight.acquire(product_intelligence.url_hash) as flight:
+                if flight.waited:
+                    await self.db.refresh(product_intelligence)
+                    if self._is_fully_compiled(product_intelligence):
+                        logger.info(f"🤝 Joined in-flight compile after {flight.wait_ms}ms - intelligence now complete")
+                        result = self._already_compiled_result(product_intelligence, start_time)
+                        result['joined_in_flight'] = True
+                        return result
 
-            # Clean up old images if this is a force recompile
-            if options.get('force_recompile') and product_intelligence.intelligence_data:
-                await self._cleanup_old_images(product_intelligence.intelligence_data)
+                return await self._compile_product_intelligence(product_intelligence, user_role, options, start_time)
 
-            # Step 3a: Scrape Sales Page
-            logger.info("📄 Step 1/3: Scraping sales page...")
+        except Exception as e:
+            logger.error(f"❌ Product intelligence compilation failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'product_intelligence_id': product_intelligence_id
+            }
 
-            scraped_data = await self.scraper.scrape_sales_page(
-                url=product_intelligence.product_url,
-                product_intelligence_id=product_intelligence.id,
-                max_images=options.get('max_images', 10),
-                scrape_images=options.get('scrape_images', True)
-            )
+    def _is_fully_compiled(self, product_intelligence: ProductIntelligence) -> bool:
+        """Has ACTUAL compiled intelligence (sales_page data from scraping), not just submission metadata"""
+        return bool(
+            product_intelligence.intelligence_data and
+            'sales_page' in product_intelligence.intelligence_data and
+            product_intelligence.intelligence_data.get('status') != 'pending_intelligence_compilation'
+        )
 
-            if not scraped_data.get('success'):
-                return {
-                    'success': False,
-                    'error': f"Scraping failed: {scraped_data.get('error')}"
-                }
+    def _already_compiled_result(self, product_intelligence: ProductIntelligence, start_time: datetime) -> Dict[str, Any]:
+        processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
 
-            logger.info(f"✅ Scraped {scraped_data.get('word_count', 0)} words, {scraped_data.get('image_count', 0)} images")
+        return {
+            'success': True,
+            'product_intelligence_id': product_intelligence.id,
+            'status': 'already_compiled',
+            'was_cached': True,
+            'intelligence_summary': self._generate_summary(product_intelligence.intelligence_data),
+            'processing_time_ms': round(processing_time),
+            'costs': {'total': 0}
+        }
 
-            # Step 3b: Amplify Intelligence
-            logger.info("🧠 Step 2/3: Amplifying intelligence with Claude...")
+    async def _compile_product_intelligence(
+        self,
+        product_intelligence: ProductIntelligence,
+        user_role: str,
+        options: Dict[str, Any],
+        start_time: datetime
+    ) -> Dict[str, Any]:
+        """
+        Scrape → Amplify → RAG for a product-only compilation (see compile_for_product)
 
-            amplified_intelligence = await self.amplifier.amplify_intelligence(scraped_data)
+        Returns:
+            Compilation result with costs
+        """
+        # Step 3: Perform compilation (Scrape → Amplify → RAG)
+        costs = {
+            'scraping': 0,
+            'analysis': 0,
+            'embeddings': 0,
+            'storage': 0
+        }
 
-            # Estimate Claude cost
-            costs['analysis'] = 0.05
+        previous_intelligence = product_intelligence.intelligence_data
 
-            logger.info(f"✅ Intelligence amplified")
+        # Step 3a-c: Scrape, process images, amplify, extract Business DNA and embed (stage graph)
+        # On a recompile only the stages whose page sections changed are rerun
+        try:
+            stages = await self._run_compilation_stages(
+                url=product_intelligence.product_url,
+                product_intelligence_id=product_intelligence.id,
+                user_role=user_role,
+                options=options,
+                previous=previous_intelligence,
+                has_embedding=product_intelligence.intelligence_embedding is not None
+            )
+        except StageFailedError as e:
+            return {
+                'success': False,
+                'error': str(e.error) if e.stage == 'fetch' else str(e)
+            }
 
+        scraped_data = stages['scraped_data']
+        amplified_intelligence = stages['intelligence']
+        if 'amplify' not in stages['reused_stages']:
+            costs['analysis'] = 0.05  # Estimate Claude cost
+        if stages['images_replaced']:
+            # Remove images from the previous compile that the new image set didn't overwrite
+            await self._cleanup_old_images(previous_intelligence, keep_keys=stages['image_keys'])
+        if stages['embedding'] is not None:
+            product_intelligence.intelligence_embedding = stages['embedding']['vector']
+            costs['embeddings'] = stages['embedding']['cost']
+
+        # Step 4: Store intelligence in ProductIntelligence
+        product_intelligence.intelligence_data = amplified_intelligence
+        product_intelligence.compiled_at = datetime.utcnow()
+        product_intelligence.compilation_version = "1.0"
 
-            # Step 2.5: Extract Business DNA (Role-Based - Business & Admin only)
-            if user_role in ['business', 'admin']:
-                try:
-                    logger.info("🧬 Extracting Business DNA (Business/Admin user)...")
-                    business_dna = await business_dna_extractor.extract_business_dna(
-                        url=product_intelligence.product_url
-                    )
-                    business_dna["available"] = True
-                    business_dna["extracted_by_role"] = user_role
-                    amplified_intelligence["business_dna"] = business_dna
-                    logger.info(f"✅ Business DNA extracted: {business_dna.get('summary', 'No summary')}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Business DNA extraction failed (non-critical): {str(e)}")
-                    amplified_intelligence["business_dna"] = {
-                        "available": False,
-                        "error": str(e),
-                        "extracted_by_role": user_role
-                    }
-            else:
-                logger.info(f"👨‍💻 User role '{user_role}' - Business DNA not available (Business tier feature)")
-                amplified_intelligence["business_dna"] = {
-                    "available": False,
-                    "tier": "business",
-                    "reason": "Business DNA extraction is available for Business tier only",
-                    "features": [
-                        "Automatic brand color extraction",
-                        "Typography and font detection",
-                        "Tone of voice analysis",
-                        "Visual style guidelines"
-                    ],
-                    "upgrade_message": "Upgrade to Business tier to unlock brand intelligence",
-                    "user_role": user_role
-                }
-            # Step 3c: Generate RAG Embeddings
-            if options.get('enable_rag', True):
-                logger.info("🔢 Step 3/3: Generating embeddings...")
+        # Remove pending status if it exists (from initial submission)
+        if 'status' in amplified_intelligence:
+            amplified_intelligence.pop('status', None)
 
-                embedding_text = self.embeddings.prepare_text_for_embedding(amplified_intelligence)
-                embedding_vector = await self.embeddings.generate_embedding(embedding_text)
+        # Extract and save product metadata for library display
+        self._extract_and_save_product_metadata_standalone(
+            product_intelligence,
+            amplified_intelligence,
+            scraped_data
+        )
 
-                product_intelligence.intelligence_embedding = embedding_vector
+        # Step 5: Skip KnowledgeBase ingestion for product-only compilations
+        # KnowledgeBase is campaign-specific and used for content generation
+        # Products compiled without campaigns don't need this step
+        # The research is still stored in intelligence_data and accessible
+        logger.info(f"⏭️  Skipping KnowledgeBase ingestion (product-only compilation, no campaign context)")
 
-                # Calculate embedding cost
-                token_count = self.embeddings.estimate_tokens(embedding_text)
-                costs['embeddings'] = self.embeddings.get_embedding_cost(token_count)
+        await self.db.commit()
+        context_pack_cache.invalidate_product(product_intelligence.id)
 
-                logger.info(f"✅ Generated {len(embedding_vector)}D embedding")
-            else:
-                logger.info("⏭️  Step 3/3: Skipping RAG (disabled)")
-
-            # Step 4: Store intelligence in ProductIntelligence
-            product_intelligence.intelligence_data = amplified_intelligence
-            product_intelligence.compiled_at = datetime.utcnow()
-            product_intelligence.compilation_version = "1.0"
-
-            # Remove pending status if it exists (from initial submission)
-            if 'status' in amplified_intelligence:
-                amplified_intelligence.pop('status', None)
-
-            # Extract and save product metadata for library display
-            self._extract_and_save_product_metadata_standalone(
-                product_intelligence,
-                amplified_intelligence,
-                scraped_data
+        # Step 6: Auto-check compliance so products become visible to affiliates
+        logger.info("⚖️  Checking compliance for affiliate visibility...")
+        try:
+            from app.services.compliance_checker import ComplianceChecker
+            compliance_checker = ComplianceChecker()
+
+            # Extract description from intelligence data
+            product_description = None
+            if amplified_intelligence.get("product", {}).get("description"):
+                product_description = amplified_intelligence["product"]["description"]
+            elif product_intelligence.product_name:
+                product_description = f"Product: {product_intelligence.product_name}"
+
+            # Build content to check
+            content_parts = []
+            if product_intelligence.product_name:
+                content_parts.append(f"Product: {product_intelligence.product_name}")
+            if product_description:
+                content_parts.append(f"Description: {product_description}")
+            if product_intelligence.commission_rate:
+                content_parts.append(f"Commission: {product_intelligence.commission_rate}")
+
+            content_to_check = "\n\n".join(content_parts)
+
+            # Check compliance (skip disclosure requirements for product descriptions)
+            result = compliance_checker.check_content(
+                content=content_to_check,
+                content_type="landing_page",
+                product_category=product_intelligence.product_category,
+                is_product_description=True  # Skip affiliate disclosure checks for products
             )
 
-            # Step 5: Skip KnowledgeBase ingestion for product-only compilations
-            # KnowledgeBase is campaign-specific and used for content generation
-            # Products compiled without campaigns don't need this step
-            # The research is still stored in intelligence_data and accessible
-            logger.info(f"⏭️  Skipping KnowledgeBase ingestion (product-only compilation, no campaign context)")
-
-            await self.db.commit()
-
-            # Step 6: Auto-check compliance so products become visible to affiliates
-            logger.info("⚖️  Checking compliance for affiliate visibility...")
-            try:
-                from app.services.compliance_checker import ComplianceChecker
-                compliance_checker = ComplianceChecker()
-
-                # Extract description from intelligence data
-                product_description = None
-                if amplified_intelligence.get("product", {}).get("description"):
-                    product_description = amplified_intelligence["product"]["description"]
-                elif product_intelligence.product_name:
-                    product_description = f"Product: {product_intelligence.product_name}"
-
-                # Build content to check
-                content_parts = []
-                if product_intelligence.product_name:
-                    content_parts.append(f"Product: {product_intelligence.product_name}")
-                if product_description:
-                    content_parts.append(f"Description: {product_description}")
-                if product_intelligence.commission_rate:
-                    content_parts.append(f"Commission: {product_intelligence.commission_rate}")
-
-                content_to_check = "\n\n".join(content_parts)
-
-                # Check compliance (skip disclosure requirements for product descriptions)
-                result = compliance_checker.check_content(
-                    content=content_to_check,
-                    content_type="landing_page",
-                    product_category=product_intelligence.product_category,
-                    is_product_description=True  # Skip affiliate disclosure checks for products
-                )
-
-                # Save compliance results to intelligence_data
-                if product_intelligence.intelligence_data is None:
-                    product_intelligence.intelligence_data = {}
-
-                product_intelligence.intelligence_data["compliance"] = {
-                    "status": result["status"],
-                    "score": result["score"],
-                    "issues": result["issues"],
-                    "warnings": result.get("warnings", []),
-                    "summary": result.get("summary", ""),
-                    "checked_at": datetime.utcnow().isoformat()
-                }
-
-                from sqlalchemy.orm.attributes import flag_modified
-                flag_modified(product_intelligence, "intelligence_data")
+            # Save compliance results to intelligence_data
+            if product_intelligence.intelligence_data is None:
+                product_intelligence.intelligence_data = {}
+
+            product_intelligence.intelligence_data["compliance"] = {
+                "status": result["status"],
+                "score": result["score"],
+                "issues": result["issues"],
+                "warnings": result.get("warnings", []),
+                "summary": result.get("summary", ""),
+                "checked_at": datetime.utcnow().isoformat()
+            }
 
-                # Auto-publish compliant products to affiliate library
-                if result["status"] == "compliant" or result.get("score", 0) >= 90:
-                    product_intelligence.is_public = "true"
-                    logger.info(f"✅ Product is compliant! Auto-published to affiliate library")
-                else:
-                    logger.info(f"⚠️  Product is not compliant yet. Visible only to creators/admin")
+            from sqlalchemy.orm.attributes import flag_modified
+            flag_modified(product_intelligence, "intelligence_data")
 
-                await self.db.commit()
-                logger.info(f"✅ Compliance check complete - Status: {result['status']}, Score: {result['score']}")
+            # Auto-publish compliant products to affiliate library
+            if result["status"] == "compliant" or result.get("score", 0) >= 90:
+                product_intelligence.is_public = "true"
+                logger.info(f"✅ Product is compliant! Auto-published to affiliate library")
+            else:
+                logger.info(f"⚠️  Product is not compliant yet. Visible only to creators/admin")
 
-            except Exception as e:
-                logger.error(f"⚠️  Compliance check failed: {str(e)}")
-                # Don't fail the whole compilation if compliance check fails
-                # Product will be visible only to creators/admin
+            await self.db.commit()
+            logger.info(f"✅ Compliance check complete - Status: {result['status']}, Score: {result['score']}")
 
-            costs['total'] = sum(costs.values())
-            processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+        except Exception as e:
+            logger.error(f"⚠️  Compliance check failed: {str(e)}")
+            # Don't fail the whole compilation if compliance check fails
+            # Product will be visible only to creators/admin
 
-            logger.info(f"🎉 Compilation complete! Total cost: ${costs['total']:.4f}")
+        costs['total'] = sum(costs.values())
+        processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
 
-            return {
-                'success': True,
-                'product_intelligence_id': product_intelligence.id,
-                'status': 'completed',
-                'was_cached': False,
-                'intelligence_summary': self._generate_summary(amplified_intelligence),
-                'processing_time_ms': round(processing_time),
-                'costs': costs
-            }
+        logger.info(f"🎉 Compilation complete! Total cost: ${costs['total']:.4f}")
 
-        except Exception as e:
-            logger.error(f"❌ Product intelligence compilation failed: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'product_intelligence_id': product_intelligence_id
-            }
+        return {
+            'success': True,
+            'product_intelligence_id': product_intelligence.id,
+            'status': 'completed',
+            'was_cached': False,
+            'intelligence_summary': self._generate_summary(amplified_intelligence),
+            'processing_time_ms': round(processing_time),
+            'stage_timings': amplified_intelligence.get('compilation'),
+            'costs': costs
+        }
 
     async def _compile_new_intelligence(
         self,
@@ -483,9 +471,6 @@ class IntelligenceCompilerService:
             'storage': 0
         }
 
-        # Step 1: Scrape Sales Page
-        logger.info("📄 Step 1/3: Scraping sales page...")
-
         # Get or create ProductIntelligence record (need ID for image storage)
         if existing_intelligence_id:
             # Reuse existing incomplete record
@@ -493,10 +478,6 @@ class IntelligenceCompilerService:
             result = await self.db.execute(stmt)
             product_intelligence = result.scalar_one()
 
-            # Clean up old images if this is a force recompile
-            if options.get('force_recompile') and product_intelligence.intelligence_data:
-                await self._cleanup_old_images(product_intelligence.intelligence_data)
-
             # Update affiliate_network if missing
             if not product_intelligence.affiliate_network and campaign.affiliate_network:
                 product_intelligence.affiliate_network = campaign.affiliate_network
@@ -541,81 +522,35 @@ class IntelligenceCompilerService:
                 await self.db.flush()  # Get ID without committing
                 logger.info(f"✓ Created new intelligence record (ID: {product_intelligence.id})")
 
-        scraped_data = await self.scraper.scrape_sales_page(
-            url=campaign.product_url,
-            product_intelligence_id=product_intelligence.id,
-            max_images=options.get('max_images', 10),
-            scrape_images=options.get('scrape_images', True)
-        )
+        previous_intelligence = product_intelligence.intelligence_data
 
-        if not scraped_data.get('success'):
+        # Scrape, process images, amplify, extract Business DNA and embed (stage graph)
+        # On a recompile only the stages whose page sections changed are rerun
+        try:
+            stages = await self._run_compilation_stages(
+                url=campaign.product_url,
+                product_intelligence_id=product_intelligence.id,
+                user_role=user_role,
+                options=options,
+                previous=previous_intelligence,
+                has_embedding=product_intelligence.intelligence_embedding is not None
+            )
+        except StageFailedError as e:
             return {
                 'success': False,
-                'error': f"Scraping failed: {scraped_data.get('error')}"
-            }
-
-        logger.info(f"✅ Scraped {scraped_data.get('word_count', 0)} words, {scraped_data.get('image_count', 0)} images")
-
-        # Step 2: Amplify Intelligence
-        logger.info("🧠 Step 2/3: Amplifying intelligence with Claude...")
-
-        amplified_intelligence = await self.amplifier.amplify_intelligence(scraped_data)
-
-        # Estimate Claude cost (rough: ~5K input + 2K output tokens)
-        costs['analysis'] = 0.05
-
-        logger.info(f"✅ Intelligence amplified")
-
-
-        # Step 2.5: Extract Business DNA (Role-Based - Business & Admin only)
-        if user_role in ['business', 'admin']:
-            try:
-                logger.info("🧬 Extracting Business DNA (Business/Admin user)...")
-                business_dna = await business_dna_extractor.extract_business_dna(
-                    url=campaign.product_url
-                )
-                business_dna["available"] = True
-                business_dna["extracted_by_role"] = user_role
-                amplified_intelligence["business_dna"] = business_dna
-                logger.info(f"✅ Business DNA extracted: {business_dna.get('summary', 'No summary')}")
-            except Exception as e:
-                logger.warning(f"⚠️ Business DNA extraction failed (non-critical): {str(e)}")
-                amplified_intelligence["business_dna"] = {
-                    "available": False,
-                    "error": str(e),
-                    "extracted_by_role": user_role
-                }
-        else:
-            logger.info(f"👨‍💻 User role '{user_role}' - Business DNA not available (Business tier feature)")
-            amplified_intelligence["business_dna"] = {
-                "available": False,
-                "tier": "business",
-                "reason": "Business DNA extraction is available for Business tier only",
-                "features": [
-                    "Automatic brand color extraction",
-                    "Typography and font detection",
-                    "Tone of voice analysis",
-                    "Visual style guidelines"
-                ],
-                "upgrade_message": "Upgrade to Business tier to unlock brand intelligence",
-                "user_role": user_role
+                'error': str(e.error) if e.stage == 'fetch' else str(e)
             }
-        # Step 3: Generate RAG Embeddings
-        if options.get('enable_rag', True):
-            logger.info("🔢 Step 3/3: Generating embeddings...")
 
-            embedding_text = self.embeddings.prepare_text_for_embedding(amplified_intelligence)
-            embedding_vector = await self.embeddings.generate_embedding(embedding_text)
-
-            product_intelligence.intelligence_embedding = embedding_vector
-
-            # Calculate embedding cost
-            token_count = self.embeddings.estimate_tokens(embedding_text)
-            costs['embeddings'] = self.embeddings.get_embedding_cost(token_count)
-
-            logger.info(f"✅ Generated {len(embedding_vector)}D embedding")
-        else:
-            logger.info("⏭️  Step 3/3: Skipping RAG (disabled)")
+        scraped_data = stages['scraped_data']
+        amplified_intelligence = stages['intelligence']
+        if 'amplify' not in stages['reused_stages']:
+            costs['analysis'] = 0.05  # Estimate Claude cost (rough: ~5K input + 2K output tokens)
+        if stages['images_replaced']:
+            # Remove images from the previous compile that the new image set didn't overwrite
+            await self._cleanup_old_images(previous_intelligence, keep_keys=stages['image_keys'])
+        if stages['embedding'] is not None:
+            product_intelligence.intelligence_embedding = stages['embedding']['vector']
+            costs['embeddings'] = stages['embedding']['cost']
 
         # Store intelligence in ProductIntelligence
         product_intelligence.intelligence_data = amplified_intelligence
@@ -641,6 +576,7 @@ class IntelligenceCompilerService:
             )
 
         await self.db.commit()
+        context_pack_cache.invalidate_product(product_intelligence.id)
 
         costs['total'] = sum(costs.values())
 
@@ -653,9 +589,284 @@ class IntelligenceCompilerService:
             'was_cached': False,
             'product_intelligence_id': product_intelligence.id,
             'intelligence_summary': self._generate_summary(amplified_intelligence),
+            'stage_timings': amplified_intelligence.get('compilation'),
             'costs': costs
         }
 
+    async def _reuse_existing_intelligence(
+        self,
+        campaign: Campaign,
+        existing_intelligence: ProductIntelligence,
+        start_time: datetime
+    ) -> Dict[str, Any]:
+        """Link the campaign to already compiled intelligence and build the cached result"""
+        await self._link_campaign_to_intelligence(campaign, existing_intelligence)
+
+        processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+
+        return {
+            'success': True,
+            'campaign_id': campaign.id,
+            'status': 'completed',
+            'was_cached': True,
+            'product_intelligence_id': existing_intelligence.id,
+            'intelligence_summary': self._generate_summary(existing_intelligence.intelligence_data),
+            'processing_time_ms': round(processing_time),
+            'costs': {
+                'scraping': 0,
+                'analysis': 0,
+                'embeddings': 0,
+                'total': 0
+            },
+            'cache_info': {
+                'originally_compiled_at': existing_intelligence.compiled_at.isoformat(),
+                'times_reused': existing_intelligence.times_used,
+                'compilation_version': existing_intelligence.compilation_version
+            }
+        }
+
+    async def _run_compilation_stages(
+        self,
+        url: str,
+        product_intelligence_id: int,
+        user_role: str,
+        options: Dict[str, Any],
+        previous: Optional[Dict[str, Any]] = None,
+        has_embedding: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the compilation stages as a dependency graph
+
+            fetch ──┬──► images
+                    ├──► amplify ──► embedding
+                    └──► business_dna
+
+        The page is fetched and parsed once; image processing, AI
+        amplification (incl. research) and Business DNA then run concurrently
+        on it. The stage timings are stored with the intelligence.
+
+        Incremental recompiles: when the previous intelligence carries a page
+        fingerprint (and options['full_recompile'] isn't set), the page is
+        fetched conditionally (ETag / Last-Modified) and its section hashes are
+        compared with the previous ones. Stages whose sections didn't change
+        reuse the previous output:
+        - images: rerun when the candidate image URLs changed
+        - amplify: rerun when the page text or metadata changed
+        - embedding: rerun when amplify reran (or there is no stored vector)
+        - business_dna: rerun when anything on the page changed
+
+        Args:
+            url: Sales page URL
+            product_intelligence_id: ID to organize images in R2
+            user_role: User role for feature access control (Business DNA)
+            options: Compilation options
+            previous: Intelligence data from the previous compile (if any)
+            has_embedding: The record already has an intelligence embedding
+
+        Returns:
+            scraped_data, intelligence (with images, business_dna and stage
+            timings merged in), embedding ({'vector', 'cost'} or None - None
+            leaves the stored vector untouched), reused_stages, image_keys
+            (R2 keys of the current images) and images_replaced (the images
+            stage completed, so old R2 images may be cleaned up)
+
+        Raises:
+            StageFailedError: Scraping, amplification or embedding failed
+        """
+        scrape_images = options.get('scrape_images', True)
+        max_images = options.get('max_images', 10)
+        enable_rag = options.get('enable_rag', True)
+
+        previous_page = ((previous or {}).get('compilation') or {}).get('page') or {}
+        incremental = bool(
+            previous_page.get('section_hashes') and
+            'sales_page' in previous and
+            not options.get('full_recompile')
+        )
+        reused: set = set()
+
+        async def fetch() -> Dict[str, Any]:
+            logger.info("📄 Scraping sales page...")
+            if incremental:
+                page = await self.scraper.fetch_sales_page(
+                    url,
+                    etag=previous_page.get('etag'),
+                    last_modified=previous_page.get('last_modified')
+                )
+            else:
+                page = await self.scraper.fetch_sales_page(url)
+            if not page.get('success'):
+                raise RuntimeError(f"Scraping failed: {page.get('error')}")
+
+            if page.get('not_modified'):
+                page['changed_sections'] = []
+            else:
+                logger.info(f"✅ Scraped {page.get('word_count', 0)} words, {len(page.get('image_urls', []))} candidate images")
+                previous_hashes = previous_page.get('section_hashes', {}) if incremental else {}
+                page['changed_sections'] = [
+                    section for section, digest in page['section_hashes'].items()
+                    if previous_hashes.get(section) != digest
+                ]
+
+            if incremental:
+                logger.info(f"🔎 Changed page sections: {', '.join(page['changed_sections']) or 'none'}")
+            return page
+
+        async def images(fetch: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+            if not scrape_images:
+                return []
+            if incremental and 'images' not in fetch['changed_sections']:
+                reused.add('images')
+                return None
+            return await self.scraper.process_page_images(fetch['image_urls'], product_intelligence_id, max_images)
+
+        async def amplify(fetch: Dict[str, Any]) -> Dict[str, Any]:
+            if incremental and not {'text', 'metadata'} & set(fetch['changed_sections']):
+                logger.info("♻️  Page text unchanged - reusing previous intelligence analysis")
+                reused.add('amplify')
+                return copy.deepcopy(previous)
+
+            logger.info("🧠 Amplifying intelligence with Claude...")
+            # Only the page text is needed; processed images are merged in afterwards
+            page = {key: value for key, value in fetch.items() if key not in ('image_urls', 'changed_sections', 'document')}
+            page['images'] = []
+            page['image_count'] = min(len(fetch['image_urls']), max_images) if scrape_images else 0
+            intelligence = await self.amplifier.amplify_intelligence(page)
+            logger.info("✅ Intelligence amplified")
+            return intelligence
+
+        async def business_dna(fetch: Dict[str, Any]) -> Dict[str, Any]:
+            previous_dna = (previous or {}).get('business_dna') or {}
+            if (
+                incremental and not fetch['changed_sections'] and
+                user_role in ['business', 'admin'] and previous_dna.get('available')
+            ):
+                reused.add('business_dna')
+                return copy.deepcopy(previous_dna)
+            # Reuse the scraper's parsed page (None after a 304 - the extractor fetches it)
+            return await self._extract_business_dna(url, user_role, document=fetch.get('document'))
+
+        async def embedding(amplify: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            if not enable_rag:
+                logger.info("⏭️  Skipping RAG embedding (disabled)")
+                return None
+            if 'amplify' in reused and has_embedding:
+                reused.add('embedding')
+                return None
+            logger.info("🔢 Generating embeddings...")
+            embedding_text = self.embeddings.prepare_text_for_embedding(amplify)
+            vector = await self.embeddings.generate_embedding(embedding_text)
+            token_count = self.embeddings.estimate_tokens(embedding_text)
+            logger.info(f"✅ Generated {len(vector)}D embedding")
+            return {'vector': vector, 'cost': self.embeddings.get_embedding_cost(token_count)}
+
+        graph = StageGraph([
+            Stage("fetch", fetch, timeout=STAGE_TIMEOUTS["fetch"]),
+            Stage("images", images, inputs=("fetch",), timeout=STAGE_TIMEOUTS["images"], required=False, fallback=None),
+            Stage("amplify", amplify, inputs=("fetch",), timeout=STAGE_TIMEOUTS["amplify"]),
+            Stage(
+                "business_dna", business_dna, inputs=("fetch",),
+                timeout=STAGE_TIMEOUTS["business_dna"], required=False,
+                fallback={"available": False, "error": "Business DNA extraction timed out", "extracted_by_role": user_role}
+            ),
+            Stage("embedding", embedding, inputs=("amplify",), timeout=STAGE_TIMEOUTS["embedding"]),
+        ])
+        results, timings = await graph.run()
+
+        fetched = results['fetch']
+        intelligence = results['amplify']
+        intelligence.pop('compilation', None)
+
+        # Only a completed images stage replaces the stored images; if it failed or timed out
+        # the previous images (and their R2 objects) are kept
+        images_replaced = 'images' not in reused and timings['stages']['images']['status'] == 'completed'
+        if results['images'] is None:
+            # Image set unchanged (or image processing failed) - keep the stored images
+            if 'images' not in reused:
+                logger.warning("⚠️ Image processing didn't complete - keeping previous images")
+            image_summaries = copy.deepcopy((previous or {}).get('images', []))
+        else:
+            image_summaries = self.amplifier.summarize_images(results['images'])
+
+        scraped_data = {
+            key: value for key, value in fetched.items()
+            if key not in ('image_urls', 'changed_sections', 'not_modified', 'document')
+        }
+        scraped_data['images'] = results['images'] if results['images'] is not None else image_summaries
+        scraped_data['image_count'] = len(scraped_data['images'])
+
+        if fetched.get('not_modified'):
+            page_fingerprint = {**previous_page, 'checked_at': fetched['scraped_at']}
+        else:
+            page_fingerprint = {
+                'etag': fetched.get('etag'),
+                'last_modified': fetched.get('last_modified'),
+                'content_hash': fetched['content_hash'],
+                'section_hashes': fetched['section_hashes'],
+                'checked_at': fetched['scraped_at'],
+            }
+
+        intelligence['images'] = image_summaries
+        intelligence['business_dna'] = results['business_dna']
+        intelligence['compilation'] = {
+            'stage_timings': timings['stages'],
+            'total_ms': timings['total_ms'],
+            'sum_stage_ms': timings['sum_stage_ms'],
+            'page': page_fingerprint,
+            'incremental': incremental,
+            'changed_sections': fetched['changed_sections'],
+            'reused_stages': sorted(reused),
+        }
+        if reused:
+            logger.info(f"♻️  Reused stages: {', '.join(sorted(reused))}")
+
+        return {
+            'scraped_data': scraped_data,
+            'intelligence': intelligence,
+            'embedding': results['embedding'],
+            'reused_stages': sorted(reused),
+            'image_keys': [self._image_r2_key(img) for img in image_summaries],
+            'images_replaced': images_replaced,
+        }
+
+    async def _extract_business_dna(
+        self,
+        url: str,
+        user_role: str,
+        document: Optional[ParsedPage] = None
+    ) -> Dict[str, Any]:
+        """Extract Business DNA (Role-Based - Business & Admin only)"""
+        if user_role in ['business', 'admin']:
+            try:
+                logger.info("🧬 Extracting Business DNA (Business/Admin user)...")
+                business_dna = await business_dna_extractor.extract_business_dna(url=url, document=document)
+                business_dna["available"] = True
+                business_dna["extracted_by_role"] = user_role
+                logger.info(f"✅ Business DNA extracted: {business_dna.get('summary', 'No summary')}")
+                return business_dna
+            except Exception as e:
+                logger.warning(f"⚠️ Business DNA extraction failed (non-critical): {str(e)}")
+                return {
+                    "available": False,
+                    "error": str(e),
+                    "extracted_by_role": user_role
+                }
+
+        logger.info(f"👨‍💻 User role '{user_role}' - Business DNA not available (Business tier feature)")
+        return {
+            "available": False,
+            "tier": "business",
+            "reason": "Business DNA extraction is available for Business tier only",
+            "features": [
+                "Automatic brand color extraction",
+                "Typography and font detection",
+                "Tone of voice analysis",
+                "Visual style guidelines"
+            ],
+            "upgrade_message": "Upgrade to Business tier to unlock brand intelligence",
+            "user_role": user_role
+        }
+
     async def _get_campaign(self, campaign_id: int) -> Optional[Campaign]:
         """Retrieve campaign from database"""
         stmt = select(Campaign).where(Campaign.id == campaign_id)
@@ -670,17 +881,23 @@ class IntelligenceCompilerService:
 
     async def _find_existing_intelligence(
         self,
-        url_hash: str
+        url_hash: str,
+        refresh: bool = False
     ) -> tuple[Optional[ProductIntelligence], bool]:
         """
         Check if intelligence already exists for this URL and validate completeness
 
+        Args:
+            refresh: Overwrite already-loaded attributes (e.g. after another compile committed)
+
         Returns:
             Tuple of (intelligence_record, is_complete)
         """
         stmt = select(ProductIntelligence).where(
             ProductIntelligence.url_hash == url_hash
         )
+        if refresh:
+            stmt = stmt.execution_options(populate_existing=True)
         result = await self.db.execute(stmt)
         intelligence = result.scalar_one_or_none()
 
@@ -726,6 +943,7 @@ class IntelligenceCompilerService:
             logger.info(f"📝 Updated commission_rate from campaign: {campaign.commission_rate}")
 
         await self.db.commit()
+        context_pack_cache.invalidate_campaign(campaign.id)
 
         logger.info(f"🔗 Linked campaign {campaign.id} to intelligence {intelligence.id}")
         logger.info(f"   Total campaigns using this intelligence: {intelligence.times_used}")
@@ -949,10 +1167,15 @@ class IntelligenceCompilerService:
             }
 
         if campaign.product_intelligence_id:
+            stmt = select(ProductIntelligence.intelligence_data["compilation"]).where(
+                ProductIntelligence.id == campaign.product_intelligence_id
+            )
+            stage_timings = (await self.db.execute(stmt)).scalar_one_or_none()
             return {
                 'status': 'completed',
                 'progress': 100,
-                'message': 'Intelligence compilation complete'
+                'message': 'Intelligence compilation complete',
+                'stage_timings': stage_timings
             }
 
         return {
@@ -961,12 +1184,26 @@ class IntelligenceCompilerService:
             'message': 'Compilation not started'
         }
 
-    async def _cleanup_old_images(self, intelligence_data: Dict[str, Any]) -> None:
+    def _image_r2_key(self, image: Dict[str, Any]) -> Optional[str]:
+        """R2 key of a stored image (older entries only carry the public URL)"""
+        if image.get('r2_key'):
+            return image['r2_key']
+        prefix = f"{self.r2_storage.public_url}/"
+        r2_url = image.get('r2_url') or ''
+        return r2_url[len(prefix):] if r2_url.startswith(prefix) else None
+
+    async def _cleanup_old_images(
+        self,
+        intelligence_data: Optional[Dict[str, Any]],
+        keep_keys: Optional[List[str]] = None
+    ) -> None:
         """
-        Delete old R2 images before recompiling to prevent orphaned files.
+        Delete R2 images from a previous compile to prevent orphaned files.
 
         Args:
-            intelligence_data: Existing intelligence data with images array
+            intelligence_data: Previous intelligence data with images array
+            keep_keys: R2 keys still referenced by the new compile (image keys
+                are deterministic, so a recompile may have overwritten them)
 
         Returns:
             None
@@ -974,7 +1211,12 @@ class IntelligenceCompilerService:
         if not intelligence_data:
             return
 
-        images = intelligence_data.get('images', [])
+        keep = set(keep_keys or [])
+        images = [
+            {**img, 'r2_key': self._image_r2_key(img)}
+            for img in intelligence_data.get('images', [])
+            if isinstance(img, dict) and self._image_r2_key(img) not in keep
+        ]
         if not images:
             logger.info("🗑️  No old images to clean up")
             return
@@ -1012,8 +1254,9 @@ class IntelligenceCompilerService:
         """
         Ingest RAG research sources into KnowledgeBase for content generation access.
 
-        Creates individual KnowledgeBase entries for each research source to enable
-        precise semantic search and retrieval during content generation.
+        Creates individual KnowledgeBase entries (with per-chunk vectors) for each
+        research source to enable precise semantic search and retrieval during
+        content generation.
 
         Research is owned by the product (not campaign) and shared across all campaigns
         using that product. This prevents duplicate storage and CASCADE DELETE issues.
@@ -1036,78 +1279,74 @@ class IntelligenceCompilerService:
 
             product_name = intelligence_data.get('product', {}).get('name', 'Product')
 
-            ingested_count = 0
-            failed_count = 0
-
-            # Process each source individually for granular semantic search
+            # Build content for every source
+            ingested_at = datetime.utcnow().isoformat()
+            documents = []
             for idx, source in enumerate(all_sources, 1):
-                try:
-                    # Build content for embedding from source data
-                    content_parts = []
-
-                    if source.get('title'):
-                        content_parts.append(f"Title: {source['title']}")
-
-                    # Web sources use 'content', scholarly use 'abstract', some use 'snippet'
-                    if source.get('content'):
-                        content_parts.append(f"Content: {source['content']}")
-                    elif source.get('abstract'):
-                        content_parts.append(f"Abstract: {source['abstract']}")
-                    elif source.get('snippet'):
-                        content_parts.append(f"Summary: {source['snippet']}")
-
-                    # Add context about the product
-                    content_parts.append(f"Product: {product_name}")
-
-                    content = "\n\n".join(content_parts)
-
-                    if not content.strip():
-                        logger.warning(f"⚠️  Skipping source {idx} - no content")
-                        continue
-
-                    # Generate embedding for this specific source
-                    embedding_vector = await self.embeddings.generate_embedding(content)
-
-                    # Store individual source in KnowledgeBase
-                    # Research is owned by product and shared across all campaigns
-                    kb_entry = KnowledgeBase(
-                        product_intelligence_id=product_intelligence_id,
-                        campaign_id=None,  # NULL = shared across campaigns, not owned by any specific campaign
-                        content=content,
-                        embedding=embedding_vector,
-                        source_url=source.get('url', ''),
-                        meta_data={
-                            "product_name": product_name,
-                            "source_type": "rag_research_source",
-                            "source_index": idx,
-                            "source_title": source.get('title', ''),
-                            "source_journal": source.get('journal'),
-                            "source_pub_date": source.get('pub_date'),
-                            "ingested_at": datetime.utcnow().isoformat()
-                        }
-                    )
-
-                    self.db.add(kb_entry)
-                    ingested_count += 1
-
-                    # Flush every 10 entries to avoid memory issues
-                    if ingested_count % 10 == 0:
-                        await self.db.flush()
-                        logger.info(f"   ✓ Ingested {ingested_count}/{len(all_sources)} sources...")
-
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"❌ Failed to ingest source {idx}: {str(e)}")
+                content = self._build_research_source_content(source, product_name)
+                if not content:
+                    logger.warning(f"⚠️  Skipping source {idx} - no content")
                     continue
+                documents.append({
+                    "content": content,
+                    "source_url": source.get('url', ''),
+                    "meta_data": {
+                        "product_name": product_name,
+                        "source_type": "rag_research_source",
+                        "source_index": idx,
+                        "source_title": source.get('title', ''),
+                        "source_journal": source.get('journal'),
+                        "source_pub_date": source.get('pub_date'),
+                        "ingested_at": ingested_at
+                    }
+                })
+
+            if not documents:
+                return
 
-            # Final flush
-            await self.db.flush()
+            # Chunk, batch-embed and bulk-insert documents + chunks
+            # Research is owned by product and shared across all campaigns (campaign_id NULL)
+            document_ids = await RAGService(self.db).ingest_documents(
+                product_intelligence_id=product_intelligence_id,
+                documents=documents
+            )
+            if document_ids:
+                # New research changes the product's intelligence version, so context
+                # packs cached by other workers are skipped too (caller commits)
+                await self.db.execute(
+                    update(ProductIntelligence)
+                    .where(ProductIntelligence.id == product_intelligence_id)
+                    .values(updated_at=func.now())
+                )
+                context_pack_cache.invalidate_product(product_intelligence_id)
 
             logger.info(f"✅ RAG research ingested into KnowledgeBase:")
-            logger.info(f"   - Ingested: {ingested_count} sources")
-            if failed_count > 0:
-                logger.warning(f"   - Failed: {failed_count} sources")
+            logger.info(f"   - Ingested: {len(document_ids)} sources")
+            skipped = len(documents) - len(document_ids)
+            if skipped > 0:
+                logger.warning(f"   - Skipped (duplicate or failed): {skipped} sources")
 
         except Exception as e:
             logger.error(f"❌ Failed to ingest research to KnowledgeBase: {str(e)}")
-            # Don't raise - this is not critical for compilation
\ No newline at end of file
+            # Don't raise - this is not critical for compilation
+
+    def _build_research_source_content(self, source: Dict[str, Any], product_name: str) -> Optional[str]:
+        """Build the text stored and embedded for one research source"""
+        content_parts = []
+
+        if source.get('title'):
+            content_parts.append(f"Title: {source['title']}")
+
+        # Web sources use 'content', scholarly use 'abstract', some use 'snippet'
+        if source.get('content'):
+            content_parts.append(f"Content: {source['content']}")
+        elif source.get('abstract'):
+            content_parts.append(f"Abstract: {source['abstract']}")
+        elif source.get('snippet'):
+            content_parts.append(f"Summary: {source['snippet']}")
+
+        # Add context about the product
+        content_parts.append(f"Product: {product_name}")
+
+        content = "\n\n".join(content_parts)
+        return content if content.strip() else None
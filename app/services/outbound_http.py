@@ -0,0 +1,192 @@
+"""
+Outbound HTTP Client Registry
+Process-wide pooled httpx clients for fetching third-party pages and assets
+
+Scraping, Business DNA, the crawler, image downloads and the image proxy used
+to open a new httpx.AsyncClient per request, paying a TCP + TLS handshake
+every time. All of them now share one keep-alive connection pool (HTTP/2 when
+the h2 package is installed):
+- request profiles by purpose (timeouts, redirects, politeness)
+- per-host connection caps so one slow site can't take the whole pool
+- a politeness delay between requests to the same host for scraping
+- connection-reuse metrics (requests vs. new connections)
+
+Sales pages with broken TLS still need verify=False, so unverified requests
+go through a second client with the same settings. Clients are created
+lazily and closed in the application lifespan.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class RequestProfile:
+    """How requests for one purpose are made"""
+    timeout: httpx.Timeout
+    follow_redirects: bool = True
+    polite: bool = False  # Space out requests to the same host
+
+
+REQUEST_PROFILES: Dict[str, RequestProfile] = {
+    "page": RequestProfile(httpx.Timeout(30.0, connect=10.0), polite=True),  # Sales pages
+    "stylesheet": RequestProfile(httpx.Timeout(10.0, connect=5.0), polite=True),
+    "asset": RequestProfile(httpx.Timeout(15.0, connect=5.0)),  # Images and other downloads
+    "proxy": RequestProfile(httpx.Timeout(30.0, connect=10.0), follow_redirects=False),  # R2 image proxy
+}
+
+
+class OutboundHttpClient:
+    """
+    Shared outbound client pool
+
+    Usage:
+        response = await outbound_http.get(url, purpose="page", headers=headers)
+    """
+
+    def __init__(self):
+        self.http2 = HTTP2_AVAILABLE and bool(getattr(settings, "OUTBOUND_HTTP2_ENABLED", True))
+        self.limits = httpx.Limits(
+            max_connections=int(getattr(settings, "OUTBOUND_HTTP_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(getattr(settings, "OUTBOUND_HTTP_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(getattr(settings, "OUTBOUND_HTTP_KEEPALIVE_SECONDS", 30)),
+        )
+        self.per_host_connections = int(getattr(settings, "OUTBOUND_HTTP_PER_HOST_CONNECTIONS", 6))
+        self.host_delay = float(getattr(settings, "OUTBOUND_HTTP_HOST_DELAY_MS", 250)) / 1000
+        self._clients: Dict[bool, httpx.AsyncClient] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_refs: Dict[str, int] = {}
+        self._host_next_at: Dict[str, float] = {}
+        self.stats = {"requests": 0, "errors": 0, "connections_opened": 0, "http2_responses": 0, "polite_wait_ms": 0}
+        self.requests_by_purpose: Counter = Counter()
+
+    def _get_client(self, verify: bool) -> httpx.AsyncClient:
+        client = self._clients.get(verify)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                verify=verify,
+            )
+            self._clients[verify] = client
+        return client
+
+    async def start(self):
+        """Create the default client up front (application startup)"""
+        self._get_client(True)
+        logger.info(
+            f"✓ Outbound HTTP pool ready (HTTP/2: {'on' if self.http2 else 'off'}, "
+            f"{self.limits.max_connections} connections, {self.per_host_connections} per host)"
+        )
+
+    async def aclose(self):
+        """Close all pooled connections (application shutdown)"""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.stats["connections_opened"] += 1
+
+    async def _wait_for_host(self, host: str):
+        """Politeness delay: reserve the next request slot for this host"""
+        now = time.monotonic()
+        start_at = max(now, self._host_next_at.get(host, 0.0))
+        self._host_next_at[host] = start_at + self.host_delay
+        if start_at > now:
+            self.stats["polite_wait_ms"] += round((start_at - now) * 1000)
+            await asyncio.sleep(start_at - now)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        purpose: str = "asset",
+        verify: bool = True,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the shared pool
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            purpose: Request profile name (page, stylesheet, asset, proxy)
+            verify: Verify TLS certificates
+            **kwargs: Passed to httpx (headers, params, timeout overrides, ...)
+
+        Raises:
+            httpx.HTTPError: As httpx does (callers keep their own handling)
+        """
+        profile = REQUEST_PROFILES[purpose]
+        kwargs.setdefault("timeout", profile.timeout)
+        kwargs.setdefault("follow_redirects", profile.follow_redirects)
+
+        host = urlparse(url).netloc.lower()
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_connections))
+        self._host_refs[host] = self._host_refs.get(host, 0) + 1
+
+        extensions = {**kwargs.pop("extensions", {}), "trace": self._trace}
+
+        try:
+            async with slots:
+                if profile.polite and self.host_delay > 0:
+                    await self._wait_for_host(host)
+
+                self.stats["requests"] += 1
+                self.requests_by_purpose[purpose] += 1
+                try:
+                    response = await self._get_client(verify).request(method, url, extensions=extensions, **kwargs)
+                except Exception:
+                    self.stats["errors"] += 1
+                    raise
+        finally:
+            # Forget idle hosts so the per-host tables don't grow without bound
+            self._host_refs[host] -= 1
+            if self._host_refs[host] == 0:
+                del self._host_refs[host]
+                self._host_slots.pop(host, None)
+                if self._host_next_at.get(host, 0.0) <= time.monotonic():
+                    self._host_next_at.pop(host, None)
+
+        if response.http_version == "HTTP/2":
+            self.stats["http2_responses"] += 1
+        return response
+
+    async def get(self, url: str, purpose: str = "asset", verify: bool = True, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, purpose=purpose, verify=verify, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        reused = max(0, requests - self.stats["connections_opened"])
+        return {
+            **self.stats,
+            "reused_connections": reused,
+            "connection_reuse_rate": f"{(reused / requests * 100) if requests else 0:.1f}%",
+            "requests_by_purpose": dict(self.requests_by_purpose),
+            "active_hosts": len(self._host_slots),
+            "http2_enabled": self.http2,
+        }
+
+
+# Global client registry (one pool per worker process)
+outbound_http = OutboundHttpClient()
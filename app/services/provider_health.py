@@ -0,0 +1,227 @@
+"""
+Provider Health Registry
+Process-wide health and latency tracking shared by every AI subsystem
+
+AIRouter (text + embeddings), AIPlatformManager and the image editor all
+report into the same registry, so an outage detected on one path reroutes
+every other path immediately instead of being rediscovered per request.
+
+Health is tracked at two levels:
+  - (provider, model): marked unhealthy on the first failure (AIRouter semantics)
+  - provider: marked unhealthy after PROVIDER_FAILURE_THRESHOLD consecutive
+    failures across any of its models (AIPlatformManager semantics)
+
+Unhealthy entries recover automatically after AI_CACHE_TTL_SECONDS.
+"""
+
+from __future__ import annotations
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, Tuple
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures before a whole provider is considered down
+PROVIDER_FAILURE_THRESHOLD = 3
+
+# Error fragments that indicate billing/quota problems rather than an outage
+_QUOTA_MARKERS = ("credit", "quota", "billing")
+
+
+@dataclass
+class ProviderHealth:
+    """Health and latency metrics for a provider or a provider model"""
+    name: str
+    model: Optional[str] = None
+    is_healthy: bool = True
+    consecutive_failures: int = 0
+    total_requests: int = 0
+    total_failures: int = 0
+    avg_response_time: float = 0.0
+    last_success: Optional[float] = None
+    last_failure: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "model": self.model,
+            "is_healthy": self.is_healthy,
+            "consecutive_failures": self.consecutive_failures,
+            "total_requests": self.total_requests,
+            "failure_rate": (
+                self.total_failures / self.total_requests
+                if self.total_requests > 0 else 0
+            ),
+            "avg_response_time": self.avg_response_time,
+            "last_success": self.last_success,
+            "last_failure": self.last_failure,
+            "last_error": self.last_error,
+        }
+
+
+class ProviderHealthRegistry:
+    """
+    Shared provider health registry
+
+    Usage:
+        from app.services.provider_health import provider_health_registry
+
+        if provider_health_registry.is_healthy("openai", "gpt-4o-mini"):
+            ...
+        provider_health_registry.record_success("openai", "gpt-4o-mini", response_time=1.2)
+        provider_health_registry.record_failure("openai", "gpt-4o-mini", error=e)
+    """
+
+    def __init__(self, cache_ttl: Optional[int] = None):
+        self.cache_ttl = cache_ttl or int(getattr(settings, "AI_CACHE_TTL_SECONDS", 300))
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._models: Dict[Tuple[str, str], ProviderHealth] = {}
+
+    # ------------- internal helpers -------------
+
+    def _provider(self, name: str) -> ProviderHealth:
+        health = self._providers.get(name)
+        if health is None:
+            health = self._providers[name] = ProviderHealth(name=name)
+        return health
+
+    def _model(self, name: str, model: str) -> ProviderHealth:
+        key = (name, model)
+        health = self._models.get(key)
+        if health is None:
+            health = self._models[key] = ProviderHealth(name=name, model=model)
+        return health
+
+    def _recovered(self, health: ProviderHealth) -> bool:
+        """True when an unhealthy entry's last failure is older than the TTL"""
+        return bool(health.last_failure) and (time.time() - health.last_failure) > self.cache_ttl
+
+    def _peek(self, health: Optional[ProviderHealth]) -> bool:
+        """Effective health without re-admitting the entry (read-only _check)"""
+        return health is None or health.is_healthy or self._recovered(health)
+
+    def _check(self, health: Optional[ProviderHealth]) -> bool:
+        """Return health, recovering entries whose failure is older than the TTL"""
+        if health is None or health.is_healthy:
+            return True
+        if self._recovered(health):
+            health.is_healthy = True
+            health.consecutive_failures = 0
+            return True
+        return False
+
+    @staticmethod
+    def _update_latency(health: ProviderHealth, response_time: Optional[float]):
+        if not response_time:
+            return
+        if health.avg_response_time == 0:
+            health.avg_response_time = response_time
+        else:
+            # Exponential moving average
+            health.avg_response_time = (health.avg_response_time * 0.8) + (response_time * 0.2)
+
+    # ------------- public API -------------
+
+    def is_healthy(self, name: str, model: Optional[str] = None) -> bool:
+        """Check provider-level health, and model-level health when a model is given"""
+        if not self._check(self._providers.get(name)):
+            return False
+        if model is not None:
+            return self._check(self._models.get((name, model)))
+        return True
+
+    def record_success(
+        self,
+        name: str,
+        model: Optional[str] = None,
+        response_time: Optional[float] = None,
+    ):
+        """Record a successful call"""
+        now = time.time()
+        entries = [self._provider(name)]
+        if model is not None:
+            entries.append(self._model(name, model))
+
+        for health in entries:
+            health.last_success = now
+            health.consecutive_failures = 0
+            health.total_requests += 1
+            health.is_healthy = True
+            self._update_latency(health, response_time)
+
+    def record_failure(
+        self,
+        name: str,
+        model: Optional[str] = None,
+        error: Optional[Exception] = None,
+        response_time: Optional[float] = None,
+    ):
+        """Record a failed call"""
+        now = time.time()
+        error_msg = str(error) if error is not None else None
+        quota_issue = bool(error_msg) and any(m in error_msg.lower() for m in _QUOTA_MARKERS)
+
+        provider = self._provider(name)
+        provider.last_failure = now
+        provider.last_error = error_msg
+        provider.consecutive_failures += 1
+        provider.total_requests += 1
+        provider.total_failures += 1
+        self._update_latency(provider, response_time)
+
+        # Credit/quota issues are account-level, not an outage of the provider
+        if quota_issue:
+            logger.warning(f"💳 Provider {name} has credit issues: {error_msg}")
+        elif provider.consecutive_failures >= PROVIDER_FAILURE_THRESHOLD and provider.is_healthy:
+            provider.is_healthy = False
+            logger.warning(
+                f"🚫 Marking {name} as unhealthy after {provider.consecutive_failures} failures"
+            )
+
+        if model is not None:
+            health = self._model(name, model)
+            health.last_failure = now
+            health.last_error = error_msg
+            health.consecutive_failures += 1
+            health.total_requests += 1
+            health.total_failures += 1
+            health.is_healthy = False
+            self._update_latency(health, response_time)
+
+    def reset(self, name: Optional[str] = None):
+        """Reset health for one provider (and its models) or for all providers"""
+        entries = list(self._providers.values()) + list(self._models.values())
+        for health in entries:
+            if name is None or health.name == name:
+                health.is_healthy = True
+                health.consecutive_failures = 0
+
+    def get(self, name: str, model: Optional[str] = None) -> Optional[ProviderHealth]:
+        """Get the raw health record for a provider or provider model"""
+        if model is not None:
+            return self._models.get((name, model))
+        return self._providers.get(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Read-only view of every tracked provider and model"""
+        return {
+            "cache_ttl_seconds": self.cache_ttl,
+            "provider_failure_threshold": PROVIDER_FAILURE_THRESHOLD,
+            "providers": [
+                {**h.to_dict(), "is_healthy": self._peek(h)}
+                for h in sorted(self._providers.values(), key=lambda h: h.name)
+            ],
+            "models": [
+                {**h.to_dict(), "is_healthy": self._peek(self._providers.get(h.name)) and self._peek(h)}
+                for h in sorted(self._models.values(), key=lambda h: (h.name, h.model or ""))
+            ],
+        }
+
+
+# Global registry instance (one per worker process)
+provider_health_registry = ProviderHealthRegistry()
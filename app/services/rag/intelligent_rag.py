@@ -3,76 +3,20 @@ Intelligent RAG System - Hybrid Free + Paid Research
 Routes queries to optimal sources with caching for cost optimization
 """
 import logging
-import hashlib
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+from datetime import datetime
 import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config.settings import settings
+from app.services.rag.research_cache import ResearchCache, research_cache
 from app.services.rag.scholarly_search import ScholarlySearchService
 from app.services.rag.web_search import WebSearchService
 
 logger = logging.getLogger(__name__)
 
 
-class ResearchCache:
-    """
-    In-memory cache for ingredient/component research
-    Dramatically reduces search costs for repeated ingredients
-    """
-
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self.hits = 0
-        self.misses = 0
-
-    def get_cache_key(self, query: str, source_type: str) -> str:
-        """Generate cache key from query"""
-        normalized = query.lower().strip()
-        return hashlib.sha256(f"{source_type}:{normalized}".encode()).hexdigest()
-
-    def get(self, query: str, source_type: str) -> Optional[List[Dict[str, Any]]]:
-        """Get cached results"""
-        key = self.get_cache_key(query, source_type)
-        cached = self._cache.get(key)
-
-        if cached:
-            # Check if expired (24 hours)
-            cached_at = cached.get("cached_at")
-            if datetime.utcnow() - cached_at < timedelta(hours=24):
-                self.hits += 1
-                logger.info(f"💾 Cache HIT: '{query}' (hits: {self.hits}, misses: {self.misses})")
-                return cached.get("results")
-
-        self.misses += 1
-        return None
-
-    def set(self, query: str, source_type: str, results: List[Dict[str, Any]]):
-        """Cache results"""
-        key = self.get_cache_key(query, source_type)
-        self._cache[key] = {
-            "results": results,
-            "cached_at": datetime.utcnow(),
-            "query": query,
-            "source_type": source_type
-        }
-        logger.info(f"💾 Cache SET: '{query}' ({len(results)} results)")
-
-    def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
-        total = self.hits + self.misses
-        hit_rate = (self.hits / total * 100) if total > 0 else 0
-
-        return {
-            "cache_size": len(self._cache),
-            "hits": self.hits,
-            "misses": self.misses,
-            "hit_rate": f"{hit_rate:.1f}%",
-            "estimated_savings_usd": self.hits * 0.001  # $0.001 per saved search
-        }
-
-
 class IntelligentRAGSystem:
     """
     Hybrid RAG orchestrator
@@ -82,7 +26,59 @@ class IntelligentRAGSystem:
     def __init__(self):
         self.scholarly = ScholarlySearchService()
         self.web = WebSearchService()
-        self.cache = ResearchCache()
+        self.cache: ResearchCache = research_cache
+        # Searches in flight per research stage; per-API quotas are enforced by the rate limiters
+        self.max_concurrency = int(getattr(settings, "RESEARCH_MAX_CONCURRENCY", 8))
+
+    async def _fan_out(
+        self,
+        queries: List[str],
+        source_type: str,
+        search: Optional[Callable[[str], Awaitable[List[Dict[str, Any]]]]] = None,
+        search_many: Optional[Callable[[List[str]], Awaitable[Dict[str, List[Dict[str, Any]]]]]] = None
+    ) -> List[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Run searches concurrently (cache first, bounded concurrency)
+
+        Args:
+            queries: Queries to run
+            source_type: Cache namespace ("scholarly" or "web")
+            search: Coroutine function running one uncached query
+            search_many: Coroutine function running all uncached queries as one batch
+                (used instead of search, e.g. batched PubMed lookups)
+
+        Returns:
+            (results, cached) per query, in the same order as queries
+        """
+        # One cache round-trip for the whole stage
+        cached = await self.cache.get_many(queries, source_type)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(query: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await search(query)
+                except Exception as e:
+                    logger.warning(f"⚠️ Research search failed for '{query}': {e}")
+                    return []
+
+        uncached = [query for query in dict.fromkeys(queries) if query not in cached]
+        if search_many is not None and uncached:
+            try:
+                fetched = await search_many(uncached)
+            except Exception as e:
+                logger.warning(f"⚠️ Batched research search failed for {len(uncached)} queries: {e}")
+                fetched = {}
+            fetched = {query: fetched.get(query, []) for query in uncached}
+        else:
+            # gather preserves input order, so research output stays deterministic
+            fetched = dict(zip(uncached, await asyncio.gather(*(run(query) for query in uncached))))
+        await self.cache.set_many(fetched, source_type)
+
+        return [
+            (cached[query], True) if query in cached else (fetched[query], False)
+            for query in queries
+        ]
 
     async def research_product(
         self,
@@ -250,31 +246,31 @@ class IntelligentRAGSystem:
             "searches_conducted": 0
         }
 
+        # Generate targeted queries for every ingredient up front, then search them all concurrently
+        ingredient_queries = []
         for ingredient in ingredients[:10]:  # Limit to first 10 ingredients
-            # Generate targeted queries
             queries = [
                 f"{ingredient} clinical studies benefits",
                 f"{ingredient} efficacy research",
                 f"{ingredient} safety dosage",
                 f"{ingredient} mechanism of action"
             ]
+            ingredient_queries.append((ingredient, queries[:max_per_ingredient]))
 
-            ingredient_sources = []
+        # Search PubMed ONLY for ingredients (health-specific, no irrelevant results)
+        outcomes = iter(await self._fan_out(
+            [query for _, queries in ingredient_queries for query in queries],
+            "scholarly",
+            search_many=lambda queries: self.scholarly.search_many(queries, max_results=3, sources=["pubmed"])
+        ))
 
-            for query in queries[:max_per_ingredient]:
-                # Check cache first
-                cached = self.cache.get(query, "scholarly")
-                if cached:
-                    ingredient_sources.extend(cached)
-                    continue
-
-                # Search PubMed ONLY for ingredients (health-specific, no irrelevant results)
-                results = await self.scholarly.search(query, max_results=3, sources=["pubmed"])
-                ingredient_data["searches_conducted"] += 1
-
-                if results:
-                    self.cache.set(query, "scholarly", results)
-                    ingredient_sources.extend(results)
+        for ingredient, queries in ingredient_queries:
+            ingredient_sources = []
+            for _ in queries:
+                results, cached = next(outcomes)
+                if not cached:
+                    ingredient_data["searches_conducted"] += 1
+                ingredient_sources.extend(results)
 
             ingredient_data["researched"].append({
                 "ingredient": ingredient,
@@ -304,37 +300,25 @@ class IntelligentRAGSystem:
             "searches_conducted": 0
         }
 
-        for feature in features:
-            # Generate query
-            query = f"{product_name} {feature} research evidence"
-
-            # Check cache
-            cached = self.cache.get(query, "scholarly")
-            if cached:
-                feature_data["sources"].extend(cached)
-                feature_data["researched"].append({
-                    "feature": feature,
-                    "sources_found": len(cached),
-                    "cached": True
-                })
-                continue
-
-            # Search scholarly sources
-            # For health products: use PubMed only (clinical evidence)
-            # For other products: use Semantic Scholar only (tech/business papers)
-            # NEVER use PubMed for non-health products (it's biomedical only)
-            sources = ["pubmed"] if is_health_product else ["semantic_scholar"]
-            results = await self.scholarly.search(query, max_results=max_results, sources=sources)
-            feature_data["searches_conducted"] += 1
-
-            if results:
-                self.cache.set(query, "scholarly", results)
-                feature_data["sources"].extend(results)
+        # Search scholarly sources
+        # For health products: use PubMed only (clinical evidence)
+        # For other products: use Semantic Scholar only (tech/business papers)
+        # NEVER use PubMed for non-health products (it's biomedical only)
+        sources = ["pubmed"] if is_health_product else ["semantic_scholar"]
+        outcomes = await self._fan_out(
+            [f"{product_name} {feature} research evidence" for feature in features],
+            "scholarly",
+            search_many=lambda queries: self.scholarly.search_many(queries, max_results=max_results, sources=sources)
+        )
 
+        for feature, (results, cached) in zip(features, outcomes):
+            if not cached:
+                feature_data["searches_conducted"] += 1
+            feature_data["sources"].extend(results)
             feature_data["researched"].append({
                 "feature": feature,
                 "sources_found": len(results),
-                "cached": False
+                "cached": cached
             })
 
         logger.info(f"✅ Feature research: {len(feature_data['sources'])} sources, {feature_data['searches_conducted']} searches")
@@ -367,31 +351,22 @@ class IntelligentRAGSystem:
         # Limit queries based on max_results budget
         queries_to_run = queries[:max_results // 2]  # 2 results per query
 
-        for query in queries_to_run:
-            # Check cache
-            cached = self.cache.get(query, "web")
-            if cached:
-                market_data["sources"].extend(cached)
-                market_data["queries"].append({
-                    "query": query,
-                    "sources_found": len(cached),
-                    "cached": True
-                })
-                continue
-
-            # Web search (Tavily - cost not a concern since each product researched once)
-            # Use "advanced" for better quality: deeper crawling, better extraction
-            results = await self.web.search(query, max_results=2, search_depth="advanced")
-            market_data["searches_conducted"] += 1
-
-            if results:
-                self.cache.set(query, "web", results)
-                market_data["sources"].extend(results)
+        # Web search (Tavily - cost not a concern since each product researched once)
+        # Use "advanced" for better quality: deeper crawling, better extraction
+        outcomes = await self._fan_out(
+            queries_to_run,
+            "web",
+            lambda query: self.web.search(query, max_results=2, search_depth="advanced")
+        )
 
+        for query, (results, cached) in zip(queries_to_run, outcomes):
+            if not cached:
+                market_data["searches_conducted"] += 1
+            market_data["sources"].extend(results)
             market_data["queries"].append({
                 "query": query,
                 "sources_found": len(results),
-                "cached": False
+                "cached": cached
             })
 
         logger.info(f"✅ Market research: {len(market_data['sources'])} sources, {market_data['searches_conducted']} searches")
@@ -468,31 +443,22 @@ class IntelligentRAGSystem:
 
         logger.info(f"   - Running {len(queries_to_run)} queries (budget: {max_results} searches)")
 
-        for query in queries_to_run:
-            # Check cache
-            cached = self.cache.get(query, "web")
-            if cached:
-                research_data["sources"].extend(cached)
-                research_data["queries"].append({
-                    "query": query,
-                    "sources_found": len(cached),
-                    "cached": True
-                })
-                continue
-
-            # Web search (Tavily - cost not a concern since each product researched once)
-            # Use "advanced" for better quality: deeper crawling, better extraction
-            results = await self.web.search(query, max_results=2, search_depth="advanced")
-            research_data["searches_conducted"] += 1
-
-            if results:
-                self.cache.set(query, "web", results)
-                research_data["sources"].extend(results)
+        # Web search (Tavily - cost not a concern since each product researched once)
+        # Use "advanced" for better quality: deeper crawling, better extraction
+        outcomes = await self._fan_out(
+            queries_to_run,
+            "web",
+            lambda query: self.web.search(query, max_results=2, search_depth="advanced")
+        )
 
+        for query, (results, cached) in zip(queries_to_run, outcomes):
+            if not cached:
+                research_data["searches_conducted"] += 1
+            research_data["sources"].extend(results)
             research_data["queries"].append({
                 "query": query,
                 "sources_found": len(results),
-                "cached": False
+                "cached": cached
             })
 
         logger.info(f"✅ Web research: {len(research_data['sources'])} sources, {research_data['searches_conducted']} searches")
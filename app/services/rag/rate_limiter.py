@@ -0,0 +1,86 @@
+"""
+Research API Rate Limiters
+Process-wide token buckets for the external research APIs
+
+Research fan-out runs many searches concurrently; these limiters keep the
+aggregate request rate per upstream API under its quota no matter how many
+compilations are researching at once:
+- NCBI E-utilities (PubMed): 3 requests/s without an API key
+- Semantic Scholar: 100 requests per 5 minutes unauthenticated
+- Tavily: plan-dependent, configurable
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """
+    Token-bucket rate limiter for asyncio callers
+
+    Waiters are served in arrival order. A rate of 0 disables limiting.
+
+    Usage:
+        await ncbi_rate_limiter.acquire()
+        response = await client.get(...)
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            self.stats["acquired"] += 1
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            waited = 0.0
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                delay = (1 - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+        self.stats["acquired"] += 1
+        if waited:
+            self.stats["waited"] += 1
+            self.stats["wait_seconds"] += waited
+
+    def get_stats(self) -> Dict[str, object]:
+        return {"name": self.name, "rate_per_second": self.rate, "burst": self.capacity, **self.stats}
+
+
+# Global limiters (one per worker process)
+ncbi_rate_limiter = AsyncRateLimiter(
+    "ncbi",
+    rate=float(getattr(settings, "NCBI_REQUESTS_PER_SECOND", 3.0)),
+)
+semantic_scholar_rate_limiter = AsyncRateLimiter(
+    "semantic_scholar",
+    rate=float(getattr(settings, "SEMANTIC_SCHOLAR_REQUESTS_PER_SECOND", 0.33)),
+)
+tavily_rate_limiter = AsyncRateLimiter(
+    "tavily",
+    rate=float(getattr(settings, "TAVILY_REQUESTS_PER_SECOND", 5.0)),
+    burst=int(getattr(settings, "TAVILY_BURST", 5)),
+)
@@ -0,0 +1,255 @@
+"""
+Research Cache
+Two-level cache for research search results: hot in-memory LRU + Postgres table
+
+Keyed by sha256(source_type + normalized query), so recompiling a product or
+researching an ingredient shared by several products costs zero external
+calls - across restarts, deploys and workers. Entries expire per source type
+(scholarly results change slowly, web results go stale faster) and the table
+is pruned to a maximum size. Database errors never fail research - the cache
+degrades to memory-only and logs the problem.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config.settings import settings
+from app.db.models import ResearchCacheEntry
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+Results = List[Dict[str, Any]]
+
+
+class ResearchCache:
+    """
+    Hot LRU in front of the research_cache table
+
+    Usage:
+        cached = await research_cache.get_many(queries, "scholarly")
+        ...
+        await research_cache.set_many({query: results}, "scholarly")
+    """
+
+    def __init__(self, max_items: Optional[int] = None, max_rows: Optional[int] = None):
+        self.max_items = max_items or int(getattr(settings, "RESEARCH_CACHE_MEMORY_ITEMS", 1000))
+        self.max_rows = max_rows or int(getattr(settings, "RESEARCH_CACHE_MAX_ROWS", 50000))
+        self.ttl_hours = {
+            "scholarly": int(getattr(settings, "RESEARCH_CACHE_SCHOLARLY_TTL_HOURS", 720)),
+            "web": int(getattr(settings, "RESEARCH_CACHE_WEB_TTL_HOURS", 168)),
+        }
+        self.default_ttl_hours = 24
+        # Prune the table every N persisted writes
+        self.prune_every = 200
+        self._writes_since_prune = 0
+        self._memory: "OrderedDict[str, Tuple[Results, datetime]]" = OrderedDict()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "writes": 0, "pruned": 0}
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return re.sub(r"\s+", " ", query.lower().strip())
+
+    def get_cache_key(self, query: str, source_type: str) -> str:
+        """Generate cache key from query"""
+        return hashlib.sha256(f"{source_type}:{self.normalize_query(query)}".encode()).hexdigest()
+
+    def ttl_for(self, source_type: str) -> timedelta:
+        return timedelta(hours=self.ttl_hours.get(source_type, self.default_ttl_hours))
+
+    @property
+    def hits(self) -> int:
+        return self.stats["memory_hits"] + self.stats["db_hits"]
+
+    @property
+    def misses(self) -> int:
+        return self.stats["misses"]
+
+    # ------------- memory tier -------------
+
+    def _memory_get(self, key: str, now: datetime) -> Optional[Results]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        results, expires_at = entry
+        if expires_at <= now:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return results
+
+    def _memory_set(self, key: str, results: Results, expires_at: datetime):
+        self._memory[key] = (results, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    # ------------- public API -------------
+
+    async def get_many(self, queries: List[str], source_type: str) -> Dict[str, Results]:
+        """Return cached results for the queries that are present (memory first, then Postgres)"""
+        now = datetime.now(timezone.utc)
+        keys = {query: self.get_cache_key(query, source_type) for query in dict.fromkeys(queries)}
+
+        found: Dict[str, Results] = {}
+        missing: Dict[str, List[str]] = {}
+        for query, key in keys.items():
+            results = self._memory_get(key, now)
+            if results is not None:
+                found[query] = results
+            else:
+                missing.setdefault(key, []).append(query)
+        self.stats["memory_hits"] += len(found)
+
+        if missing:
+            db_found = await self._db_get_many(list(missing.keys()), now)
+            for key, (results, expires_at) in db_found.items():
+                self._memory_set(key, results, expires_at)
+                for query in missing[key]:
+                    found[query] = results
+            db_hits = sum(len(missing[key]) for key in db_found)
+            self.stats["db_hits"] += db_hits
+            self.stats["misses"] += sum(len(q) for q in missing.values()) - db_hits
+
+        if found:
+            logger.info(f"💾 Research cache: {len(found)}/{len(keys)} {source_type} queries cached")
+        return found
+
+    async def get(self, query: str, source_type: str) -> Optional[Results]:
+        """Get cached results"""
+        return (await self.get_many([query], source_type)).get(query)
+
+    async def set_many(self, entries: Dict[str, Results], source_type: str):
+        """Store results in both tiers (replaces existing rows and restarts their TTL)"""
+        entries = {query: results for query, results in entries.items() if results}
+        if not entries:
+            return
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + self.ttl_for(source_type)
+        rows = {}
+        for query, results in entries.items():
+            key = self.get_cache_key(query, source_type)
+            self._memory_set(key, results, expires_at)
+            rows[key] = {
+                "cache_key": key,
+                "source_type": source_type,
+                "query": self.normalize_query(query),
+                "results": results,
+                "result_count": len(results),
+                "created_at": now,
+                "expires_at": expires_at,
+            }
+
+        try:
+            async with AsyncSessionLocal() as session:
+                stmt = insert(ResearchCacheEntry).values(list(rows.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[ResearchCacheEntry.cache_key],
+                    set_={
+                        "results": stmt.excluded.results,
+                        "result_count": stmt.excluded.result_count,
+                        "created_at": stmt.excluded.created_at,
+                        "expires_at": stmt.excluded.expires_at,
+                    }
+                )
+                await session.execute(stmt)
+                await session.commit()
+            self.stats["writes"] += len(rows)
+            self._writes_since_prune += len(rows)
+            logger.info(f"💾 Research cache SET: {len(rows)} {source_type} queries")
+        except Exception as e:
+            logger.warning(f"[ResearchCache] Failed to persist {len(rows)} entries: {e}")
+            return
+
+        if self._writes_since_prune >= self.prune_every:
+            self._writes_since_prune = 0
+            await self.prune()
+
+    async def set(self, query: str, source_type: str, results: Results):
+        """Cache results"""
+        await self.set_many({query: results}, source_type)
+
+    async def prune(self) -> int:
+        """Delete expired rows, then the oldest rows beyond max_rows"""
+        try:
+            async with AsyncSessionLocal() as session:
+                expired = await session.execute(
+                    delete(ResearchCacheEntry).where(ResearchCacheEntry.expires_at <= func.now())
+                )
+                removed = expired.rowcount or 0
+
+                total = (await session.execute(select(func.count()).select_from(ResearchCacheEntry))).scalar() or 0
+                if total > self.max_rows:
+                    oldest = (
+                        select(ResearchCacheEntry.cache_key)
+                        .order_by(ResearchCacheEntry.created_at)
+                        .limit(total - self.max_rows)
+                        .scalar_subquery()
+                    )
+                    evicted = await session.execute(
+                        delete(ResearchCacheEntry).where(ResearchCacheEntry.cache_key.in_(oldest))
+                    )
+                    removed += evicted.rowcount or 0
+
+                await session.commit()
+            self.stats["pruned"] += removed
+            if removed:
+                logger.info(f"🧹 Research cache pruned {removed} rows")
+            return removed
+        except Exception as e:
+            logger.warning(f"[ResearchCache] Prune failed: {e}")
+            return 0
+
+    def clear_memory(self):
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total > 0 else 0
+
+        return {
+            **self.stats,
+            "cache_size": len(self._memory),
+            "memory_max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{hit_rate:.1f}%",
+            "estimated_savings_usd": self.hits * 0.001  # $0.001 per saved search
+        }
+
+    # ------------- database tier -------------
+
+    async def _db_get_many(self, keys: List[str], now: datetime) -> Dict[str, Tuple[Results, datetime]]:
+        found: Dict[str, Tuple[Results, datetime]] = {}
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(
+                        ResearchCacheEntry.cache_key,
+                        ResearchCacheEntry.results,
+                        ResearchCacheEntry.expires_at,
+                    ).where(
+                        ResearchCacheEntry.cache_key.in_(keys),
+                        ResearchCacheEntry.expires_at > now,
+                    )
+                )
+                for cache_key, results, expires_at in result.all():
+                    found[cache_key] = (results, expires_at)
+        except Exception as e:
+            logger.warning(f"[ResearchCache] Lookup failed, treating as miss: {e}")
+
+        return found
+
+
+# Global cache instance (memory tier is per worker, database tier is shared)
+research_cache = ResearchCache()
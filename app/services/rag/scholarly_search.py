@@ -7,89 +7,206 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import asyncio
+from xml.etree import ElementTree
+
+from app.core.config.settings import settings
+from app.services.rag.rate_limiter import ncbi_rate_limiter, semantic_scholar_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
+def _text(node: Optional[ElementTree.Element]) -> str:
+    """Full text of an XML element (including inline markup like <i>), stripped"""
+    if node is None:
+        return ""
+    return "".join(node.itertext()).strip()
+
+
 class PubMedSearch:
     """
     PubMed/NIH API - FREE, unlimited access
     Perfect for health products, clinical studies, ingredient research
+
+    Queries are resolved in batches: one esearch per query for the PMIDs, then
+    a single efetch for the deduplicated PMIDs of the whole batch, parsed once
+    and fanned back out to each query. All calls share one connection pool.
     """
 
+    # PMIDs per efetch request (NCBI recommends POST and modest batches)
+    FETCH_BATCH_SIZE = 200
+
     def __init__(self):
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
         self.timeout = 30
+        self.api_key = getattr(settings, "NCBI_API_KEY", None)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared NCBI client (keep-alive connections reused across queries)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4)
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    def _params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if self.api_key:
+            params["api_key"] = self.api_key
+        return params
 
     async def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Search PubMed for scientific articles"""
-        try:
-            logger.info(f"🔬 PubMed search: '{query}' (max: {max_results})")
+        return (await self.search_many([query], max_results)).get(query, [])
 
-            # Step 1: Search for article IDs
-            search_url = f"{self.base_url}/esearch.fcgi"
-            search_params = {
-                "db": "pubmed",
-                "term": query,
-                "retmax": max_results,
-                "retmode": "json",
-                "sort": "relevance"
-            }
+    async def search_many(self, queries: List[str], max_results: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search PubMed for several queries with one batched article fetch
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                search_response = await client.get(search_url, params=search_params)
-                search_response.raise_for_status()
-                search_data = search_response.json()
+        Args:
+            queries: Search queries
+            max_results: Maximum articles per query
 
-            # Extract PMIDs
-            pmids = search_data.get("esearchresult", {}).get("idlist", [])
+        Returns:
+            Results per query (same article dicts as search())
+        """
+        queries = list(dict.fromkeys(queries))
+        results: Dict[str, List[Dict[str, Any]]] = {query: [] for query in queries}
+        if not queries:
+            return results
 
-            if not pmids:
-                logger.info(f"📭 PubMed: No results for '{query}'")
-                return []
+        # Step 1: Search for article IDs (one esearch per query)
+        pmid_lists = await asyncio.gather(*(self._esearch(query, max_results) for query in queries))
+        pmids_by_query = dict(zip(queries, pmid_lists))
 
-            logger.info(f"📚 PubMed: Found {len(pmids)} articles")
+        unique_pmids = list(dict.fromkeys(pmid for pmids in pmid_lists for pmid in pmids))
+        if not unique_pmids:
+            return results
 
-            # Step 2: Fetch article details
-            fetch_url = f"{self.base_url}/esummary.fcgi"
-            fetch_params = {
-                "db": "pubmed",
-                "id": ",".join(pmids),
-                "retmode": "json"
-            }
+        total = sum(len(pmids) for pmids in pmid_lists)
+        logger.info(f"📚 PubMed: {total} hits across {len(queries)} queries ({len(unique_pmids)} unique articles)")
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                fetch_response = await client.get(fetch_url, params=fetch_params)
-                fetch_response.raise_for_status()
-                fetch_data = fetch_response.json()
+        # Step 2: Fetch article details once for the whole batch
+        articles: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(unique_pmids), self.FETCH_BATCH_SIZE):
+            articles.update(await self._efetch(unique_pmids[i:i + self.FETCH_BATCH_SIZE]))
 
-            # Parse results
-            results = []
-            for pmid in pmids:
-                article = fetch_data.get("result", {}).get(pmid, {})
-                if article and article.get("title"):
-                    results.append({
-                        "source": "pubmed",
-                        "pmid": pmid,
-                        "title": article.get("title", ""),
-                        "abstract": article.get("abstract", ""),
-                        "authors": self._format_authors(article.get("authors", [])),
-                        "journal": article.get("fulljournalname", ""),
-                        "pub_date": article.get("pubdate", ""),
-                        "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
-                        "content": self._format_content(article),
-                        "relevance_score": 0.9,
-                        "quality_score": 0.95,  # PubMed = peer-reviewed
-                        "research_type": "clinical_study"
-                    })
-
-            logger.info(f"✅ PubMed: Parsed {len(results)} articles")
-            return results
+        # Fan parsed articles back out to each query (copies, so callers can't affect each other)
+        for query, pmids in pmids_by_query.items():
+            results[query] = [dict(articles[pmid]) for pmid in pmids if pmid in articles]
+
+        logger.info(f"✅ PubMed: Parsed {len(articles)} articles")
+        return results
+
+    async def _esearch(self, query: str, max_results: int) -> List[str]:
+        try:
+            logger.info(f"🔬 PubMed search: '{query}' (max: {max_results})")
+            await ncbi_rate_limiter.acquire()
+            response = await self._get_client().get(
+                f"{self.base_url}/esearch.fcgi",
+                params=self._params({
+                    "db": "pubmed",
+                    "term": query,
+                    "retmax": max_results,
+                    "retmode": "json",
+                    "sort": "relevance"
+                })
+            )
+            response.raise_for_status()
+            pmids = response.json().get("esearchresult", {}).get("idlist", [])
+            if not pmids:
+                logger.info(f"📭 PubMed: No results for '{query}'")
+            return pmids
 
         except Exception as e:
             logger.error(f"❌ PubMed search failed: {str(e)}")
             return []
 
+    async def _efetch(self, pmids: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            await ncbi_rate_limiter.acquire()
+            response = await self._get_client().post(
+                f"{self.base_url}/efetch.fcgi",
+                data=self._params({
+                    "db": "pubmed",
+                    "id": ",".join(pmids),
+                    "retmode": "xml"
+                })
+            )
+            response.raise_for_status()
+            # Large batches are a few MB of XML - parse off the event loop
+            return await asyncio.to_thread(self._parse_articles, response.content)
+
+        except Exception as e:
+            logger.error(f"❌ PubMed fetch failed for {len(pmids)} articles: {str(e)}")
+            return {}
+
+    def _parse_articles(self, xml_content: bytes) -> Dict[str, Dict[str, Any]]:
+        """Parse an efetch PubmedArticleSet into result dicts keyed by PMID"""
+        articles: Dict[str, Dict[str, Any]] = {}
+        root = ElementTree.fromstring(xml_content)
+
+        for node in root.iter("PubmedArticle"):
+            pmid = _text(node.find("MedlineCitation/PMID"))
+            article = node.find("MedlineCitation/Article")
+            if not pmid or article is None:
+                continue
+
+            title = _text(article.find("ArticleTitle"))
+            if not title:
+                continue
+
+            abstract_parts = []
+            for part in article.findall("Abstract/AbstractText"):
+                part_text = _text(part)
+                if part_text:
+                    label = part.get("Label")
+                    abstract_parts.append(f"{label}: {part_text}" if label else part_text)
+
+            authors = []
+            for author in article.findall("AuthorList/Author"):
+                name = _text(author.find("CollectiveName")) or " ".join(
+                    filter(None, [_text(author.find("LastName")), _text(author.find("Initials"))])
+                )
+                if name:
+                    authors.append({"name": name})
+
+            pub_date_node = article.find("Journal/JournalIssue/PubDate")
+            pub_date = ""
+            if pub_date_node is not None:
+                pub_date = _text(pub_date_node.find("MedlineDate")) or " ".join(
+                    filter(None, [_text(pub_date_node.find(tag)) for tag in ("Year", "Month", "Day")])
+                )
+
+            summary = {
+                "title": title,
+                "abstract": "\n".join(abstract_parts),
+                "fulljournalname": _text(article.find("Journal/Title")),
+                "pubdate": pub_date,
+            }
+
+            articles[pmid] = {
+                "source": "pubmed",
+                "pmid": pmid,
+                "title": title,
+                "abstract": summary["abstract"],
+                "authors": self._format_authors(authors),
+                "journal": summary["fulljournalname"],
+                "pub_date": pub_date,
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                "content": self._format_content(summary),
+                "relevance_score": 0.9,
+                "quality_score": 0.95,  # PubMed = peer-reviewed
+                "research_type": "clinical_study"
+            }
+
+        return articles
+
     def _format_authors(self, authors: List[Dict]) -> str:
         """Format author list"""
         if not authors:
@@ -141,6 +258,7 @@ class SemanticScholarSearch:
                 "fields": "title,abstract,authors,year,citationCount,publicationVenue,url,openAccessPdf"
             }
 
+            await semantic_scholar_rate_limiter.acquire()
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 response = await client.get(search_url, params=params)
                 response.raise_for_status()
@@ -277,6 +395,57 @@ class ScholarlySearchService:
 
         return all_results
 
+    async def search_many(
+        self,
+        queries: List[str],
+        max_results: int = 5,
+        sources: List[str] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search scholarly sources for several queries at once
+
+        PubMed resolves the whole batch with one article fetch; other sources
+        run per query.
+
+        Args:
+            queries: Search queries
+            max_results: Maximum results per source and query
+            sources: List of sources to search (default: all)
+
+        Returns:
+            Results per query, each sorted by quality
+        """
+        if sources is None:
+            sources = ["pubmed", "semantic_scholar"]
+
+        tasks = []
+
+        if "pubmed" in sources:
+            tasks.append(self.pubmed.search_many(queries, max_results))
+
+        if "semantic_scholar" in sources:
+            async def semantic_scholar_many() -> Dict[str, List[Dict[str, Any]]]:
+                results = await asyncio.gather(*(self.semantic_scholar.search(q, max_results) for q in queries))
+                return dict(zip(queries, results))
+            tasks.append(semantic_scholar_many())
+
+        results_by_source = await asyncio.gather(*tasks, return_exceptions=True)
+
+        combined: Dict[str, List[Dict[str, Any]]] = {query: [] for query in queries}
+        for results in results_by_source:
+            if isinstance(results, dict):
+                for query, query_results in results.items():
+                    combined[query].extend(query_results)
+            else:
+                logger.warning(f"Search returned exception: {results}")
+
+        for query_results in combined.values():
+            query_results.sort(key=lambda x: x.get("quality_score", 0), reverse=True)
+
+        logger.info(f"📊 Scholarly batch search complete: {sum(len(r) for r in combined.values())} results for {len(queries)} queries")
+
+        return combined
+
     def is_health_query(self, query: str) -> bool:
         """Check if query is health/medical related"""
         health_keywords = [
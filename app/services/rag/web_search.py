@@ -4,14 +4,70 @@ Optimized for RAG, returns clean structured data
 Cost: $0.001 per search ($1 per 1,000 searches)
 """
 import httpx
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from app.core.config.settings import settings
+from app.services.rag.rate_limiter import tavily_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
+class TavilyResponseCache:
+    """
+    In-memory LRU of parsed Tavily responses with TTL
+
+    Keyed by the normalized query plus search parameters, so near-identical
+    competitor/review/pricing queries repeated across products and users
+    (case, punctuation, spacing) are served locally.
+    """
+
+    def __init__(self, max_items: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_items = max_items or int(getattr(settings, "TAVILY_CACHE_MAX_ITEMS", 1000))
+        self.ttl_seconds = ttl_seconds or int(getattr(settings, "TAVILY_CACHE_TTL_SECONDS", 21600))
+        self._entries: "OrderedDict[str, Tuple[List[Dict[str, Any]], float]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        normalized = re.sub(r"[^\w\s]", " ", query.lower())
+        return re.sub(r"\s+", " ", normalized).strip()
+
+    def make_key(self, query: str, **params: Any) -> str:
+        payload = json.dumps({"query": self.normalize_query(query), **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl_seconds:
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        # Copies, so callers can't mutate the cached response
+        return [dict(result) for result in entry[0]]
+
+    def set(self, key: str, results: List[Dict[str, Any]]):
+        self._entries[key] = ([dict(result) for result in results], time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "items": len(self._entries), "max_items": self.max_items}
+
+
+# Global response cache (one per worker process)
+tavily_response_cache = TavilyResponseCache()
+
+
 class TavilySearch:
     """
     Tavily AI Search - Optimized for RAG
@@ -23,6 +79,22 @@ class TavilySearch:
         self.api_key = api_key or settings.TAVILY_API_KEY
         self.base_url = "https://api.tavily.com/search"
         self.timeout = 30
+        self.cache = tavily_response_cache
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Long-lived pooled client (keep-alive connections reused across searches)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
 
     async def search(
         self,
@@ -50,6 +122,17 @@ class TavilySearch:
                 logger.warning("⚠️ Tavily API key not configured")
                 return []
 
+            cache_key = self.cache.make_key(
+                query,
+                max_results=max_results,
+                search_depth=search_depth,
+                include_raw_content=include_raw_content
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"💾 Tavily cache HIT: '{query}' ({len(cached)} results)")
+                return cached
+
             payload = {
                 "api_key": self.api_key,
                 "query": query,
@@ -60,10 +143,10 @@ class TavilySearch:
                 "include_images": False
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(self.base_url, json=payload)
-                response.raise_for_status()
-                data = response.json()
+            await tavily_rate_limiter.acquire()
+            response = await self._get_client().post(self.base_url, json=payload)
+            response.raise_for_status()
+            data = response.json()
 
             # Extract results
             results_raw = data.get("results", [])
@@ -112,6 +195,7 @@ class TavilySearch:
                 })
 
             logger.info(f"✅ Tavily: Parsed {len(results)} results")
+            self.cache.set(cache_key, results)
             return results
 
         except httpx.HTTPStatusError as e:
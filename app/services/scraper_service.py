@@ -3,19 +3,28 @@ Sales Page Scraper Service
 Scrapes sales pages, downloads images, classifies with Claude Vision, and uploads to R2
 """
 import httpx
+import base64
 import hashlib
 import asyncio
 import logging
-from bs4 import BeautifulSoup
-from typing import Dict, Any, List, Optional
-from urllib.parse import urljoin, urlparse
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
 from datetime import datetime
 import anthropic
 from app.core.config.settings import settings
 from app.services.storage_r2 import r2_storage
+from app.services.html_document import parse_page
+from app.services.outbound_http import outbound_http
+from app.services.image_fingerprint import probe_image, perceptual_hash, hamming_distance, vision_image
+from app.services.image_classification_cache import image_classification_cache
 
 logger = logging.getLogger(__name__)
 
+VISION_MODEL = "claude-3-5-sonnet-20241022"
+
+# Process-wide cap on concurrent Claude Vision requests (all compilations share it)
+_vision_slots = asyncio.Semaphore(int(getattr(settings, "VISION_MAX_CONCURRENCY", 4)))
+
 
 class SalesPageScraper:
     """Enhanced scraper with image extraction and Claude Vision classification"""
@@ -26,7 +35,7 @@ class SalesPageScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        self.anthropic_client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.anthropic_client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
         self.r2_storage = r2_storage
 
     async def scrape_sales_page(
@@ -48,6 +57,41 @@ class SalesPageScraper:
         Returns:
             Dictionary with scraped data, images, and metadata
         """
+        page = await self.fetch_sales_page(url)
+        if not page.get('success'):
+            return page
+
+        page.pop('document', None)
+        image_urls = page.pop('image_urls', [])
+        images = []
+        if scrape_images:
+            images = await self.process_page_images(image_urls, product_intelligence_id, max_images)
+
+        page['images'] = images
+        page['image_count'] = len(images)
+        return page
+
+    async def fetch_sales_page(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch a sales page and extract metadata, text and candidate image URLs
+        (no image downloads - see process_page_images)
+
+        Args:
+            url: Sales page URL
+            etag: ETag from the previous fetch (sent as If-None-Match)
+            last_modified: Last-Modified from the previous fetch (sent as If-Modified-Since)
+
+        Returns:
+            Dictionary with metadata, text content, image_urls, the parsed
+            document (ParsedPage, for Business DNA) and the page fingerprint
+            (etag, last_modified, content_hash, section_hashes),
+            or {'success': True, 'not_modified': True} on a 304
+        """
         try:
             # Normalize URL: ensure trailing slash to avoid 301 redirects
             if not url.endswith('/'):
@@ -56,37 +100,55 @@ class SalesPageScraper:
 
             logger.info(f"🔍 Scraping sales page: {url}")
 
-            # Step 1: Fetch HTML
-            html = await self._fetch_html(url)
-            if not html:
+            # Step 1: Fetch HTML (conditional when we have validators from the last fetch)
+            conditional_headers = {}
+            if etag:
+                conditional_headers['If-None-Match'] = etag
+            if last_modified:
+                conditional_headers['If-Modified-Since'] = last_modified
+
+            response = await self._fetch_html(url, conditional_headers)
+            if response is None:
                 return {'success': False, 'error': 'Failed to fetch URL'}
 
-            # Step 2: Extract metadata
-            metadata = self._extract_metadata(html, url)
+            if response.status_code == 304:
+                logger.info(f"✓ Sales page not modified since last compile: {url}")
+                return {
+                    'success': True,
+                    'not_modified': True,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'scraped_at': datetime.utcnow().isoformat()
+                }
+
+            html = response.text
+            if not html:
+                return {'success': False, 'error': 'Failed to fetch URL'}
 
-            # Step 3: Extract text content
-            text_content = self._extract_text(html)
+            # Step 2: Parse once (metadata, text, image URLs - shared with Business DNA)
+            document = await parse_page(html, url)
+            metadata = document.metadata
+            text_content = document.text
 
-            # Step 4: Extract images
-            images = []
-            if scrape_images:
-                logger.info(f"📸 Extracting images (max: {max_images})")
-                image_urls = self._extract_image_urls(html, url)
+            # Step 3: Candidate image URLs (skip icons, tracking pixels, etc.)
+            image_urls = [image_url for image_url in document.image_urls if self._is_valid_image_url(image_url)]
 
-                # Download, classify, and upload images concurrently
-                images = await self._process_images(
-                    image_urls[:max_images],
-                    product_intelligence_id
-                )
+            section_hashes = self.page_section_hashes(metadata, text_content, image_urls)
 
             return {
                 'success': True,
                 'metadata': metadata,
                 'text_content': text_content,
-                'images': images,
+                'image_urls': image_urls,
                 'scraped_at': datetime.utcnow().isoformat(),
                 'word_count': len(text_content.split()),
-                'image_count': len(images)
+                'document': document,
+                'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified'),
+                'section_hashes': section_hashes,
+                'content_hash': hashlib.sha256(
+                    "|".join(f"{k}:{v}" for k, v in sorted(section_hashes.items())).encode()
+                ).hexdigest()
             }
 
         except Exception as e:
@@ -97,8 +159,66 @@ class SalesPageScraper:
                 'url': url
             }
 
-    async def _fetch_html(self, url: str) -> Optional[str]:
-        """Fetch HTML with retries and exponential backoff"""
+    async def process_page_images(
+        self,
+        image_urls: List[str],
+        product_intelligence_id: int,
+        max_images: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Download, classify, and upload a page's images
+
+        Args:
+            image_urls: Candidate image URLs from fetch_sales_page
+            product_intelligence_id: ID to organize images in R2
+            max_images: Maximum number of images to download
+
+        Returns:
+            Processed image results
+        """
+        logger.info(f"📸 Extracting images (max: {max_images})")
+
+        # Pre-filter and dedupe candidates, then classify and upload concurrently
+        return await self._process_images(
+            image_urls,
+            product_intelligence_id,
+            max_images
+        )
+
+    @staticmethod
+    def page_section_hashes(
+        metadata: Dict[str, Any],
+        text_content: str,
+        image_urls: List[str]
+    ) -> Dict[str, str]:
+        """
+        Hashes of the page sections each compilation stage depends on
+
+        - text: normalized visible text (amplification, research, embedding)
+        - metadata: title, description, keywords (amplification)
+        - images: candidate image URLs in page order (image processing)
+        """
+        def digest(value: str) -> str:
+            return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+        normalized_text = ' '.join(text_content.lower().split())
+        meta = '\n'.join([
+            metadata.get('title', ''),
+            metadata.get('description', ''),
+            ','.join(metadata.get('keywords', []))
+        ])
+        return {
+            'text': digest(normalized_text),
+            'metadata': digest(meta),
+            'images': digest('\n'.join(image_urls))
+        }
+
+    async def _fetch_html(
+        self,
+        url: str,
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> Optional[httpx.Response]:
+        """Fetch HTML with retries and exponential backoff (a 304 response is returned as-is)"""
         urls_to_try = [url]
 
         # If URL doesn't end with /, also try with trailing slash
@@ -109,25 +229,28 @@ class SalesPageScraper:
         for url_variant in urls_to_try:
             for attempt in range(self.max_retries):
                 try:
-                    async with httpx.AsyncClient(
+                    # Shared keep-alive pool; redirects are followed (some sales pages
+                    # redirect HTTPS → HTTP or to non-standard ports)
+                    response = await outbound_http.get(
+                        url_variant,
+                        purpose="page",
+                        verify=False,  # Disable SSL verification for problematic sites
                         timeout=self.timeout,
-                        follow_redirects=True,
-                        # Allow HTTP redirects (some sales pages redirect HTTPS → HTTP)
-                        # This is needed for sites that redirect to non-standard ports
-                        verify=False  # Disable SSL verification for problematic sites
-                    ) as client:
-                        response = await client.get(url_variant, headers=self.headers)
-                        response.raise_for_status()
-
-                        # If we got redirected, log it
-                        if len(response.history) > 0:
-                            final_url = str(response.url)
-                            logger.info(f"✓ Followed redirects: {url_variant} → {final_url}")
-
-                        if url_variant != url:
-                            logger.info(f"✓ URL variant worked: {url} → {url_variant}")
-
-                        return response.text
+                        headers={**self.headers, **(extra_headers or {})}
+                    )
+                    if response.status_code == 304:
+                        return response
+                    response.raise_for_status()
+
+                    # If we got redirected, log it
+                    if len(response.history) > 0:
+                        final_url = str(response.url)
+                        logger.info(f"✓ Followed redirects: {url_variant} → {final_url}")
+
+                    if url_variant != url:
+                        logger.info(f"✓ URL variant worked: {url} → {url_variant}")
+
+                    return response
                 except Exception as e:
                     if attempt == self.max_retries - 1:
                         logger.warning(f"Failed to fetch {url_variant} after {self.max_retries} attempts: {e}")
@@ -138,87 +261,6 @@ class SalesPageScraper:
         logger.error(f"Failed to fetch {url} with all variants")
         return None
 
-    def _extract_metadata(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract page metadata (title, description, Open Graph data)"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        metadata = {
-            'url': url,
-            'title': '',
-            'description': '',
-            'keywords': [],
-            'og_data': {}
-        }
-
-        # Title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.get_text().strip()
-
-        # Meta description
-        desc_tag = soup.find('meta', attrs={'name': 'description'})
-        if desc_tag and desc_tag.get('content'):
-            metadata['description'] = desc_tag['content'].strip()
-
-        # Keywords
-        keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
-        if keywords_tag and keywords_tag.get('content'):
-            metadata['keywords'] = [k.strip() for k in keywords_tag['content'].split(',')]
-
-        # Open Graph data
-        og_tags = soup.find_all('meta', property=lambda x: x and x.startswith('og:'))
-        for tag in og_tags:
-            property_name = tag.get('property', '').replace('og:', '')
-            content = tag.get('content', '')
-            if property_name and content:
-                metadata['og_data'][property_name] = content
-
-        return metadata
-
-    def _extract_text(self, html: str) -> str:
-        """Extract clean text content from HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Remove noise
-        for element in soup(['script', 'style', 'nav', 'footer', 'header']):
-            element.decompose()
-
-        # Get text
-        text = soup.get_text()
-
-        # Clean whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-
-        return text
-
-    def _extract_image_urls(self, html: str, base_url: str) -> List[str]:
-        """Extract all image URLs from HTML"""
-        soup = BeautifulSoup(html, 'html.parser')
-        image_urls = []
-
-        # Find all img tags
-        for img in soup.find_all('img'):
-            src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-            if src:
-                # Convert relative URLs to absolute
-                absolute_url = urljoin(base_url, src)
-
-                # Filter out tiny images, tracking pixels, etc.
-                if self._is_valid_image_url(absolute_url):
-                    image_urls.append(absolute_url)
-
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_urls = []
-        for url in image_urls:
-            if url not in seen:
-                seen.add(url)
-                unique_urls.append(url)
-
-        return unique_urls
-
     def _is_valid_image_url(self, url: str) -> bool:
         """Check if URL is likely a valid product/marketing image"""
         url_lower = url.lower()
@@ -255,47 +297,107 @@ class SalesPageScraper:
     async def _process_images(
         self,
         image_urls: List[str],
-        product_intelligence_id: int
+        product_intelligence_id: int,
+        max_images: int = 10
     ) -> List[Dict[str, Any]]:
-        """Download, classify, and upload images concurrently"""
+        """
+        Download, pre-filter, dedupe, classify, and upload images
+
+        Only unique, meaningful images reach Claude Vision and R2:
+        1. Download candidates (a few more than max_images, since some drop out)
+        2. Discard tiny, huge and decorative images from header dimensions
+        3. Collapse near-duplicates by perceptual hash (keep the largest copy)
+        4. Classify and upload the first max_images unique images
+        """
+        candidate_limit = max_images * int(getattr(settings, "IMAGE_CANDIDATE_MULTIPLIER", 3))
+        candidate_urls = image_urls[:candidate_limit]
+
+        downloads = await asyncio.gather(
+            *[self._download_image(url) for url in candidate_urls],
+            return_exceptions=True
+        )
+        candidates = [
+            {'url': url, 'data': result[0], 'metadata': result[1]}
+            for url, result in zip(candidate_urls, downloads)
+            if isinstance(result, tuple)
+        ]
+
+        # Hashing decodes pixels - keep it off the event loop
+        hashes = await asyncio.to_thread(lambda: [perceptual_hash(c['data']) for c in candidates])
+        for candidate, phash in zip(candidates, hashes):
+            candidate['phash'] = phash
+
+        unique = self._collapse_near_duplicates(candidates)
+        selected = unique[:max_images]
+        logger.info(
+            f"🧮 Image pre-filter: {len(candidate_urls)} candidates → {len(candidates)} usable → "
+            f"{len(unique)} unique ({len(candidates) - len(unique)} near-duplicates), "
+            f"classifying {len(selected)}"
+        )
+
         tasks = [
-            self._process_single_image(url, product_intelligence_id, idx)
-            for idx, url in enumerate(image_urls)
+            self._classify_and_upload_image(candidate, product_intelligence_id, idx)
+            for idx, candidate in enumerate(selected)
         ]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Filter out failed downloads and exceptions
+        # Filter out failed classifications/uploads and exceptions
         successful_images = []
         for result in results:
             if isinstance(result, dict) and result.get('success'):
                 successful_images.append(result)
 
-        logger.info(f"✅ Successfully processed {len(successful_images)}/{len(image_urls)} images")
+        logger.info(f"✅ Successfully processed {len(successful_images)}/{len(selected)} images")
         return successful_images
 
-    async def _process_single_image(
+    def _collapse_near_duplicates(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep one image per perceptual-hash cluster (page order of first
+        appearance, largest resolution wins)
+        """
+        threshold = int(getattr(settings, "IMAGE_DEDUPE_MAX_DISTANCE", 6))
+        unique: List[Dict[str, Any]] = []
+
+        for candidate in candidates:
+            match_index = None
+            if candidate['phash'] is not None:
+                for i, kept in enumerate(unique):
+                    if kept['phash'] is not None and hamming_distance(candidate['phash'], kept['phash']) <= threshold:
+                        match_index = i
+                        break
+
+            if match_index is None:
+                unique.append(candidate)
+                continue
+
+            kept = unique[match_index]
+            dropped = candidate
+            if self._pixel_area(candidate) > self._pixel_area(kept):
+                unique[match_index], dropped = candidate, kept
+            logger.info(f"🔁 Near-duplicate image skipped: {dropped['url']}")
+
+        return unique
+
+    @staticmethod
+    def _pixel_area(candidate: Dict[str, Any]) -> int:
+        return candidate['metadata']['width'] * candidate['metadata']['height']
+
+    async def _classify_and_upload_image(
         self,
-        image_url: str,
+        candidate: Dict[str, Any],
         product_intelligence_id: int,
         index: int
     ) -> Dict[str, Any]:
-        """Download, classify with Claude Vision, and upload to R2"""
+        """Classify a downloaded image with Claude Vision and upload it to R2"""
+        image_url = candidate['url']
+        image_data = candidate['data']
+        img_metadata = candidate['metadata']
         try:
-            # Download image
-            download_result = await self._download_image(image_url)
-            if not download_result:
-                return {'success': False, 'error': 'Download failed'}
-
-            # Extract image data and metadata
-            if isinstance(download_result, tuple):
-                image_data, img_metadata = download_result
-            else:
-                image_data = download_result
-                img_metadata = {}
-
             # Classify with Claude Vision
-            classification = await self._classify_image_with_claude(image_url)
+            classification = await self._classify_image_with_claude(
+                image_url, image_data, img_metadata.get('format')
+            )
 
             # Boost score for transparent images (likely product images)
             if img_metadata.get('has_transparency'):
@@ -336,99 +438,112 @@ class SalesPageScraper:
             logger.warning(f"Failed to process image {image_url}: {e}")
             return {'success': False, 'error': str(e)}
 
-    async def _download_image(self, url: str) -> Optional[bytes]:
-        """Download image from URL and validate dimensions"""
-        try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-
-                # Check file size (skip if > 10MB or < 5KB)
-                content_length = len(response.content)
-                if content_length > 10 * 1024 * 1024:
-                    logger.warning(f"Image too large: {content_length} bytes")
-                    return None
-                if content_length < 5 * 1024:
-                    logger.info(f"Image too small (likely icon): {content_length} bytes")
-                    return None
-
-                # Verify image dimensions using PIL (if available)
-                try:
-                    from PIL import Image
-                    import io
-
-                    img = Image.open(io.BytesIO(response.content))
-                    width, height = img.size
-
-                    # Skip small images (likely icons/UI elements)
-                    # Product images are typically at least 200x200
-                    if width < 200 or height < 200:
-                        logger.info(f"Image too small: {width}x{height} (likely icon/UI)")
-                        return None
-
-                    # Skip very wide/tall images (likely banners/dividers)
-                    aspect_ratio = max(width, height) / min(width, height)
-                    if aspect_ratio > 4:
-                        logger.info(f"Unusual aspect ratio: {width}x{height} (likely banner)")
-                        return None
-
-                    # Check for transparency (alpha channel)
-                    # Transparent PNGs are often high-quality product images
-                    has_transparency = img.mode in ('RGBA', 'LA') or (
-                        img.mode == 'P' and 'transparency' in img.info
-                    )
-                    if has_transparency:
-                        logger.info(f"✨ PNG with transparency detected: {width}x{height} (likely product image)")
-
-                    # Store metadata for later use
-                    metadata = {
-                        'width': width,
-                        'height': height,
-                        'has_transparency': has_transparency,
-                        'format': img.format
-                    }
-
-                    # Return both content and metadata
-                    return (response.content, metadata)
-
-                except ImportError:
-                    # PIL not available, proceed without dimension check
-                    logger.warning("PIL not available, skipping dimension validation")
-                    return response.content
+    async def _download_image(self, url: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """
+        Download an image and pre-filter it from its header
 
-                return (response.content, metadata)
+        Returns:
+            (content, metadata) or None for failed downloads and images that
+            are too small/large or decorative (icons, banners, dividers)
+        """
+        try:
+            response = await outbound_http.get(url, purpose="asset", timeout=15, headers=self.headers)
+            response.raise_for_status()
+
+            # Check file size (skip if > 10MB or < 5KB)
+            content_length = len(response.content)
+            if content_length > 10 * 1024 * 1024:
+                logger.warning(f"Image too large: {content_length} bytes")
+                return None
+            if content_length < 5 * 1024:
+                logger.info(f"Image too small (likely icon): {content_length} bytes")
+                return None
+
+            # Dimensions from the image header (no pixel decode)
+            probe = probe_image(response.content)
+            if probe is None:
+                logger.info(f"Not a readable image: {url}")
+                return None
+
+            # Skip small images (likely icons/UI elements)
+            # Product images are typically at least 200x200
+            if probe.width < 200 or probe.height < 200:
+                logger.info(f"Image too small: {probe.width}x{probe.height} (likely icon/UI)")
+                return None
+
+            # Skip very wide/tall images (likely banners/dividers)
+            if probe.aspect_ratio > 4:
+                logger.info(f"Unusual aspect ratio: {probe.width}x{probe.height} (likely banner)")
+                return None
+
+            # Transparent PNGs are often high-quality product images
+            if probe.has_transparency:
+                logger.info(f"✨ PNG with transparency detected: {probe.width}x{probe.height} (likely product image)")
+
+            metadata = {
+                'width': probe.width,
+                'height': probe.height,
+                'has_transparency': probe.has_transparency,
+                'format': probe.format
+            }
+            return (response.content, metadata)
 
         except Exception as e:
             logger.warning(f"Failed to download image: {e}")
             return None
 
-    async def _classify_image_with_claude(self, image_url: str) -> Dict[str, Any]:
+    async def _classify_image_with_claude(
+        self,
+        image_url: str,
+        image_data: bytes,
+        image_format: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Use Claude Vision API to understand image context and marketing value
 
+        The downloaded bytes are sent inline (base64), so Claude classifies
+        exactly the image that was downloaded. Classifications are cached by
+        the SHA-256 of those bytes, so recompiles and images shared across
+        products skip the vision call.
+
         Args:
-            image_url: URL of the image to analyze
+            image_url: URL of the image (logging only)
+            image_data: Downloaded image bytes (sent to Claude and cache key)
+            image_format: PIL format from the download probe (media type)
 
         Returns:
             Classification data including type, quality score, and context
         """
+        image_hash = image_classification_cache.hash_image(image_data)
+        cached = await image_classification_cache.get(image_hash, VISION_MODEL)
+        if cached is not None:
+            logger.info(f"💾 Vision cache hit: {cached.get('type')} (quality: {cached.get('quality_score')})")
+            return cached
+
         try:
-            response = self.anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "url",
-                                "url": image_url
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": """Analyze this image for marketing/product value. Return ONLY valid JSON (no markdown):
+            payload = await asyncio.to_thread(vision_image, image_data, image_format)
+            if payload is None:
+                raise ValueError(f"Unsupported image data from {image_url}")
+            media_type, vision_bytes = payload
+
+            async with _vision_slots:
+                response = await self.anthropic_client.messages.create(
+                    model=VISION_MODEL,
+                    max_tokens=500,
+                    messages=[{
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image",
+                                "source": {
+                                    "type": "base64",
+                                    "media_type": media_type,
+                                    "data": base64.b64encode(vision_bytes).decode("ascii")
+                                }
+                            },
+                            {
+                                "type": "text",
+                                "text": """Analyze this image for marketing/product value. Return ONLY valid JSON (no markdown):
 
 {
   "type": "hero|product|lifestyle|testimonial|comparison|diagram|before_after|icon|ui_element|other",
@@ -446,10 +561,10 @@ IMPORTANT:
 - Icons, emojis, buttons, UI elements, badges should have quality_score < 30 and is_icon_or_ui: true
 - Only actual product photos, lifestyle images, or hero images should score > 50
 - Focus on marketing value, not technical quality"""
-                        }
-                    ]
-                }]
-            )
+                            }
+                        ]
+                    }]
+                )
 
             # Parse Claude's response
             response_text = response.content[0].text.strip()
@@ -464,6 +579,7 @@ IMPORTANT:
             classification = json.loads(response_text)
 
             logger.info(f"🎨 Classified as {classification['type']} (quality: {classification['quality_score']})")
+            await image_classification_cache.set(image_hash, VISION_MODEL, classification)
             return classification
 
         except Exception as e:
@@ -0,0 +1,191 @@
+"""
+Token-Aware Text Chunker
+Streams RAG chunks packed to a token budget along sentence/paragraph boundaries
+
+Text is segmented lazily (paragraphs, then sentences) and segments are packed
+until the next one would exceed max_tokens, measured with the embedding
+model's tokenizer. Consecutive chunks share up to overlap_tokens of trailing
+sentences. Chunks are yielded as soon as they are complete, so callers can
+start embedding before a long scraped page has been fully segmented.
+
+tiktoken downloads its BPE file on first use, so the encoding is loaded once
+at startup in a worker thread (preload_encoding) and cached on disk under
+TIKTOKEN_CACHE_DIR. If it can't be loaded the chunker falls back to the
+~4 characters per token estimate instead of failing.
+"""
+from __future__ import annotations
+
+import os
+import re
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import tiktoken
+
+from app.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# cl100k_base is the text-embedding-3 tokenizer; close enough for Cohere budgets
+DEFAULT_ENCODING = "cl100k_base"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+
+
+class EstimatedEncoding:
+    """Stand-in tokenizer when tiktoken is unavailable (~4 characters per token)"""
+    name = "estimate"
+
+    def encode(self, text: str, disallowed_special=()) -> List[str]:
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+_encodings: Dict[str, Any] = {}
+
+
+def load_encoding(name: str = DEFAULT_ENCODING):
+    """
+    Load a tiktoken encoding once per process
+
+    Blocking (may download the BPE file) - call via preload_encoding() from
+    async code. Returns an EstimatedEncoding when the encoding can't be loaded.
+    """
+    encoding = _encodings.get(name)
+    if encoding is not None:
+        return encoding
+
+    cache_dir = getattr(settings, "TIKTOKEN_CACHE_DIR", None)
+    if cache_dir:
+        os.environ.setdefault("TIKTOKEN_CACHE_DIR", cache_dir)
+    try:
+        encoding = tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken encoding {name} unavailable, estimating token counts: {e}")
+        encoding = EstimatedEncoding()
+    _encodings[name] = encoding
+    return encoding
+
+
+async def preload_encoding(name: str = DEFAULT_ENCODING):
+    """Load the encoding off the event loop (application startup)"""
+    encoding = await asyncio.to_thread(load_encoding, name)
+    logger.info(f"✓ Chunker tokenizer ready ({encoding.name})")
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    """One packed chunk of a document"""
+    ordinal: int
+    text: str
+    token_count: int
+
+
+def _iter_spans(pattern: re.Pattern, text: str) -> Iterator[str]:
+    """Lazily split text on a separator pattern (stripped, non-empty pieces)"""
+    start = 0
+    for match in pattern.finditer(text):
+        piece = text[start:match.start()].strip()
+        if piece:
+            yield piece
+        start = match.end()
+    piece = text[start:].strip()
+    if piece:
+        yield piece
+
+
+class TextChunker:
+    """
+    Streaming sentence-aware chunker
+
+    Usage:
+        chunker = TextChunker(max_tokens=300, overlap_tokens=50)
+        for chunk in chunker.iter_chunks(page_text):
+            ...
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        encoding_name: str = DEFAULT_ENCODING,
+        encoding=None,
+    ):
+        self.max_tokens = max_tokens or int(getattr(settings, "RAG_CHUNK_MAX_TOKENS", 300))
+        overlap = overlap_tokens if overlap_tokens is not None else int(getattr(settings, "RAG_CHUNK_OVERLAP_TOKENS", 50))
+        # Overlap must leave room for new content in every chunk
+        self.overlap_tokens = max(0, min(overlap, self.max_tokens // 2))
+        # An explicit encoding (e.g. EstimatedEncoding) skips tiktoken entirely
+        self.encoding = encoding if encoding is not None else load_encoding(encoding_name)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    # ------------- segmentation -------------
+
+    def _iter_segments(self, text: str) -> Iterator[Tuple[str, int, bool]]:
+        """Yield (sentence, token_count, starts_paragraph), splitting oversized sentences by tokens"""
+        for paragraph in _iter_spans(_PARAGRAPH_BREAK, text):
+            first = True
+            for sentence in _iter_spans(_SENTENCE_END, paragraph):
+                tokens = self.encoding.encode(sentence, disallowed_special=())
+                if len(tokens) <= self.max_tokens:
+                    yield sentence, len(tokens), first
+                else:
+                    # Hard split: token windows that already carry their own overlap
+                    step = self.max_tokens - self.overlap_tokens
+                    for start in range(0, len(tokens), step):
+                        window = tokens[start:start + self.max_tokens]
+                        yield self.encoding.decode(window), len(window), first and start == 0
+                        if start + self.max_tokens >= len(tokens):
+                            break
+                first = False
+
+    def _overlap_tail(self, segments: List[Tuple[str, int, bool]], room: int) -> List[Tuple[str, int, bool]]:
+        """Trailing whole sentences of a finished chunk that fit in the overlap budget (and the room left)"""
+        tail: List[Tuple[str, int, bool]] = []
+        budget = min(self.overlap_tokens, room)
+        for segment in reversed(segments):
+            if segment[1] > budget:
+                break
+            tail.insert(0, segment)
+            budget -= segment[1]
+        return tail
+
+    @staticmethod
+    def _join(segments: List[Tuple[str, int, bool]]) -> str:
+        parts = []
+        for i, (sentence, _, starts_paragraph) in enumerate(segments):
+            if i > 0:
+                parts.append("\n\n" if starts_paragraph else " ")
+            parts.append(sentence)
+        return "".join(parts)
+
+    # ------------- public API -------------
+
+    def iter_chunks(self, text: str) -> Iterator[TextChunk]:
+        """Lazily yield chunks of at most ~max_tokens tokens"""
+        current: List[Tuple[str, int, bool]] = []
+        current_tokens = 0
+        ordinal = 0
+
+        for segment in self._iter_segments(text):
+            if current and current_tokens + segment[1] > self.max_tokens:
+                yield TextChunk(ordinal=ordinal, text=self._join(current), token_count=current_tokens)
+                ordinal += 1
+                current = self._overlap_tail(current, room=self.max_tokens - segment[1])
+                current_tokens = sum(s[1] for s in current)
+
+            current.append(segment)
+            current_tokens += segment[1]
+
+        if current:
+            yield TextChunk(ordinal=ordinal, text=self._join(current), token_count=current_tokens)
+
+    def chunk(self, text: str) -> List[TextChunk]:
+        return list(self.iter_chunks(text))
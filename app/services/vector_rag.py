@@ -2,141 +2,511 @@
 RAG Service - Retrieval-Augmented Generation
 Handles vector storage, semantic search, and context retrieval for AI generation
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
+import hashlib
+import re
 from datetime import datetime
 import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from app.db.models import KnowledgeBase, Campaign
+from sqlalchemy import select, insert, and_, or_, text, func, null, union_all, cast, Float
+from pgvector.sqlalchemy import HALFVEC, BIT
+from app.db.models import KnowledgeBase, KnowledgeChunk, Campaign, ProductIntelligence
 from app.services.embeddings_router import EmbeddingRouterService
+from app.services.text_chunker import TextChunker, TextChunk
 from app.core.config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+VECTOR_SEARCH_MODES = ("halfvec", "binary")
+EMBEDDING_DIMENSIONS = 1536
+
 
 class RAGService:
     """Retrieval-Augmented Generation service for context-aware content generation"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        embedding_service: Optional[EmbeddingRouterService] = None,
+        chunker: Optional[TextChunker] = None
+    ):
         self.db = db
-        self.embedding_service = EmbeddingRouterService()
-        self.chunk_size = 1000  # characters per chunk
-        self.chunk_overlap = 200
+        self.embedding_service = embedding_service or EmbeddingRouterService()
+        self.chunker = chunker or TextChunker()
+        self.embed_batch_size = settings.EMBEDDING_BATCH_MAX_ITEMS  # chunks per embedding request while streaming
+        self.hnsw_ef_search = 100  # HNSW candidate list size for filtered ANN queries
+        self.chunk_candidate_multiplier = 3  # chunks fetched per requested passage before per-document capping
+        self.max_chunks_per_document = 2
+        self.retrieval_mode = settings.RAG_RETRIEVAL_MODE
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            logger.warning(f"⚠️ Unknown RAG_RETRIEVAL_MODE '{self.retrieval_mode}', using hybrid")
+            self.retrieval_mode = "hybrid"
+        self.rrf_k = 60  # Reciprocal-rank fusion damping constant
+        self.vector_search = settings.RAG_VECTOR_SEARCH if settings.RAG_VECTOR_SEARCH in VECTOR_SEARCH_MODES else "halfvec"
+        self.binary_rerank_factor = max(1, settings.RAG_BINARY_RERANK_FACTOR)
+        self.raise_retrieval_errors = False  # Re-raise instead of returning [] (benchmarks)
         
     async def ingest_content(
         self,
-        user_id: int,
         content: str,
         source_type: str,
         source_url: Optional[str] = None,
-        meta_data: Optional[Dict[str, Any]] = None
+        meta_data: Optional[Dict[str, Any]] = None,
+        product_intelligence_id: Optional[int] = None,
+        campaign_id: Optional[int] = None,
+        user_id: Optional[int] = None
     ) -> KnowledgeBase:
         """
-        Ingest content into the knowledge base with chunking and embedding
-        
+        Ingest a single document into the knowledge base with chunking and embedding
+
         Args:
-            user_id: User ID
             content: Raw content to ingest
             source_type: Type of source (product_page, landing_page, review, etc.)
             source_url: Optional source URL
             meta_data: Additional meta_data
-            
+            product_intelligence_id: Owning product (resolved from campaign_id if omitted)
+            campaign_id: Optional campaign for campaign-specific notes
+            user_id: Kept for backwards compatibility (ownership goes through the product)
+
         Returns:
-            KnowledgeBase entry
+            KnowledgeBase entry (the existing entry if identical content was already ingested)
         """
         try:
-            # Chunk the content
-            chunks = self._chunk_text(content)
-            
-            # Generate embeddings for all chunks
-            embeddings = await self.embedding_service.generate_embeddings(chunks)
-            
-            # Average embeddings for the full document
-            avg_embedding = np.mean(embeddings, axis=0).tolist()
-            
-            # Store in knowledge base
-            kb_entry = KnowledgeBase(
-                user_id=user_id,
-                content=content,
-                embedding=avg_embedding,
-                source_type=source_type,
-                source_url=source_url,
-                meta_data=meta_data or {},
-                chunk_count=len(chunks)
+            if product_intelligence_id is None and campaign_id is not None:
+                result = await self.db.execute(
+                    select(Campaign.product_intelligence_id).where(Campaign.id == campaign_id)
+                )
+                product_intelligence_id = result.scalar_one_or_none()
+
+            if product_intelligence_id is None:
+                raise ValueError("Knowledge base content requires a product_intelligence_id or a campaign linked to a product")
+
+            await self.ingest_documents(
+                product_intelligence_id=product_intelligence_id,
+                campaign_id=campaign_id,
+                documents=[{
+                    'content': content,
+                    'source_url': source_url,
+                    'meta_data': {'source_type': source_type, **(meta_data or {})}
+                }]
             )
-            
-            self.db.add(kb_entry)
             await self.db.commit()
-            await self.db.refresh(kb_entry)
-            
-            logger.info(f"Ingested content: {len(chunks)} chunks, source: {source_type}")
-            return kb_entry
-            
+
+            result = await self.db.execute(
+                select(KnowledgeBase).where(
+                    KnowledgeBase.product_intelligence_id == product_intelligence_id,
+                    KnowledgeBase.content_hash == self._content_hash(content.strip())
+                ).order_by(KnowledgeBase.id.desc()).limit(1)
+            )
+            return result.scalar_one_or_none()
+
         except Exception as e:
             logger.error(f"Error ingesting content: {str(e)}")
             await self.db.rollback()
             raise
+
+    async def ingest_documents(
+        self,
+        product_intelligence_id: int,
+        documents: List[Dict[str, Any]],
+        campaign_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Ingest documents as KnowledgeBase rows plus per-chunk KnowledgeChunk rows
+
+        Documents whose content is already stored for the product (or repeated
+        within the batch) are skipped. Chunks are streamed from the token-aware
+        chunker into provider-sized embedding batches, and documents and chunks
+        are each written with one bulk INSERT.
+        The caller owns the transaction (rows are flushed, not committed).
+
+        Args:
+            product_intelligence_id: Owning product
+            documents: Dicts with 'content' and optional 'source_url' and 'meta_data'
+            campaign_id: Optional campaign for campaign-specific notes (NULL = shared)
+
+        Returns:
+            IDs of the newly inserted KnowledgeBase rows
+        """
+        # Stage 1: Dedupe by content hash (within the batch, then against stored rows)
+        prepared = []
+        seen_hashes = set()
+        for doc in documents:
+            content = (doc.get('content') or '').strip()
+            if not content:
+                continue
+            content_hash = self._content_hash(content)
+            if content_hash in seen_hashes:
+                continue
+            seen_hashes.add(content_hash)
+            prepared.append((doc, content, content_hash))
+
+        if not prepared:
+            return []
+
+        result = await self.db.execute(
+            select(KnowledgeBase.content_hash).where(
+                KnowledgeBase.product_intelligence_id == product_intelligence_id,
+                KnowledgeBase.content_hash.in_(list(seen_hashes))
+            )
+        )
+        existing_hashes = set(result.scalars().all())
+        if existing_hashes:
+            logger.info(f"⏭️  Skipping {len(existing_hashes)} documents already in KnowledgeBase")
+            prepared = [p for p in prepared if p[2] not in existing_hashes]
+            if not prepared:
+                return []
+
+        # Stage 2: Stream chunks into embedding batches (requests start while segmentation continues)
+        chunk_refs: List[Tuple[int, TextChunk]] = []
+        embed_tasks = []
+        pending: List[str] = []
+        for doc_index, (_, content, _) in enumerate(prepared):
+            for chunk in self.chunker.iter_chunks(content):
+                chunk_refs.append((doc_index, chunk))
+                pending.append(chunk.text)
+                if len(pending) >= self.embed_batch_size:
+                    embed_tasks.append(asyncio.create_task(self._embed_chunks(pending)))
+                    pending = []
+                    await asyncio.sleep(0)
+        if pending:
+            embed_tasks.append(asyncio.create_task(self._embed_chunks(pending)))
+
+        batch_results = await asyncio.gather(*embed_tasks)
+        chunk_embeddings = [vector for vectors in batch_results for vector in vectors]
+
+        document_chunks: List[List[Tuple[TextChunk, List[float]]]] = [[] for _ in prepared]
+        for (doc_index, chunk), vector in zip(chunk_refs, chunk_embeddings):
+            if vector is not None:
+                document_chunks[doc_index].append((chunk, vector))
+
+        # Stage 3: Bulk-insert documents (document vector = mean of its chunk vectors)
+        document_rows = []
+        document_passages = []
+        for (doc, content, content_hash), passages in zip(prepared, document_chunks):
+            if not passages:
+                logger.error(f"❌ Failed to ingest document ({doc.get('source_url') or 'no url'}): embedding failed")
+                continue
+
+            document_rows.append({
+                'product_intelligence_id': product_intelligence_id,
+                'campaign_id': campaign_id,
+                'content': content,
+                'embedding': np.mean([vector for _, vector in passages], axis=0).tolist(),
+                'meta_data': doc.get('meta_data') or {},
+                'source_url': doc.get('source_url'),
+                'content_hash': content_hash,
+                'chunk_count': len(passages)
+            })
+            document_passages.append(passages)
+
+        if not document_rows:
+            return []
+
+        result = await self.db.execute(
+            insert(KnowledgeBase).returning(KnowledgeBase.id, sort_by_parameter_order=True),
+            document_rows
+        )
+        document_ids = list(result.scalars().all())
+
+        # Stage 4: Bulk-insert chunks
+        chunk_rows = [
+            {
+                'knowledge_base_id': document_id,
+                'ordinal': ordinal,
+                'content': chunk.text,
+                'embedding': vector,
+                'token_count': chunk.token_count
+            }
+            for document_id, passages in zip(document_ids, document_passages)
+            for ordinal, (chunk, vector) in enumerate(passages)
+        ]
+        await self.db.execute(insert(KnowledgeChunk), chunk_rows)
+        await self.db.flush()
+
+        logger.info(f"Ingested {len(document_ids)} documents as {len(chunk_rows)} chunks")
+        return document_ids
+
+    async def _embed_chunks(self, chunks: List[str]) -> List[Optional[List[float]]]:
+        """Embed chunks in one batch, falling back to per-chunk calls (None for failures)"""
+        if not chunks:
+            return []
+        try:
+            return await self.embedding_service.generate_embeddings_batch(chunks)
+        except Exception as e:
+            logger.warning(f"Batch embedding failed ({e}), embedding chunks individually")
+            results = await asyncio.gather(
+                *(self.embedding_service.generate_embedding(chunk) for chunk in chunks),
+                return_exceptions=True
+            )
+            return [None if isinstance(r, BaseException) else r for r in results]
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
     
     async def retrieve_context(
         self,
         query: str,
-        user_id: int,
+        user_id: Optional[int] = None,
         source_types: Optional[List[str]] = None,
         top_k: int = 5,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        campaign_id: Optional[int] = None,
+        product_intelligence_id: Optional[int] = None,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Retrieve relevant context for a query using semantic search
-        
+        Retrieve relevant passages for a query
+
+        Ranking runs in Postgres over knowledge_chunks in a single statement:
+          - vector: pgvector cosine distance (HNSW index), cut off at similarity_threshold;
+            with RAG_VECTOR_SEARCH=binary a hamming shortlist is re-ranked by cosine
+          - lexical: full-text match on content_tsv (GIN index), ranked by ts_rank_cd
+          - hybrid: both candidate lists merged with reciprocal-rank fusion, so exact
+            ingredient/product/dosage matches surface even below the vector cutoff
+        A few extra candidates are fetched so that at most max_chunks_per_document
+        passages come from any one document.
+
         Args:
             query: Search query
-            user_id: User ID to filter results
-            source_types: Optional list of source types to filter
-            top_k: Number of results to return
-            similarity_threshold: Minimum similarity score
-            
+            user_id: Restrict to knowledge owned by the user's campaigns/products
+            source_types: Optional list of source types to filter (metadata.source_type)
+            top_k: Number of passages to return
+            similarity_threshold: Minimum vector similarity score
+            campaign_id: Restrict to a campaign (its product research + campaign notes)
+            product_intelligence_id: Restrict to one product's research
+            mode: "vector", "lexical" or "hybrid" (defaults to RAG_RETRIEVAL_MODE)
+
         Returns:
-            List of relevant context entries with similarity scores
+            List of relevant passages ('id' is the document id, 'score' the fused rank score,
+            'similarity' the cosine similarity or None in lexical mode)
         """
+        mode = mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}' (expected one of {', '.join(RETRIEVAL_MODES)})")
+
         try:
-            # Generate query embedding
-            query_embedding = await self.embedding_service.generate_embedding(query)
-            
-            # Build query
-            stmt = select(KnowledgeBase).where(KnowledgeBase.user_id == user_id)
-            
+            filters = self._scope_filters(user_id, campaign_id, product_intelligence_id)
             if source_types:
-                stmt = stmt.where(KnowledgeBase.source_type.in_(source_types))
-            
+                filters.append(KnowledgeBase.meta_data["source_type"].astext.in_(source_types))
+            candidate_limit = top_k * self.chunk_candidate_multiplier
+
+            ranked_lists = []
+            distance = None
+
+            if mode in ("vector", "hybrid"):
+                query_embedding = await self.embedding_service.generate_embedding(
+                    query,
+                    input_type="search_query"
+                )
+                distance = KnowledgeChunk.embedding.cosine_distance(query_embedding)
+                if self.vector_search == "binary":
+                    ranked_lists.append(self._binary_vector_candidates(
+                        query_embedding, filters, similarity_threshold, candidate_limit
+                    ))
+                else:
+                    ranked_lists.append(
+                        select(
+                            KnowledgeChunk.id.label("chunk_id"),
+                            func.row_number().over(order_by=distance).label("rank"),
+                        )
+                        .join(KnowledgeBase, KnowledgeChunk.knowledge_base_id == KnowledgeBase.id)
+                        .where(
+                            KnowledgeChunk.embedding.isnot(None),
+                            distance <= 1 - similarity_threshold,
+                            *filters
+                        )
+                        .order_by(distance)
+                        .limit(candidate_limit)
+                    )
+
+            if mode in ("lexical", "hybrid"):
+                ts_query_text = self._build_ts_query(query)
+                if ts_query_text:
+                    ts_query = func.to_tsquery('english', ts_query_text)
+                    ts_rank = func.ts_rank_cd(KnowledgeChunk.content_tsv, ts_query)
+                    ranked_lists.append(
+                        select(
+                            KnowledgeChunk.id.label("chunk_id"),
+                            func.row_number().over(order_by=ts_rank.desc()).label("rank"),
+                        )
+                        .join(KnowledgeBase, KnowledgeChunk.knowledge_base_id == KnowledgeBase.id)
+                        .where(KnowledgeChunk.content_tsv.op('@@')(ts_query), *filters)
+                        .order_by(ts_rank.desc())
+                        .limit(candidate_limit)
+                    )
+
+            if not ranked_lists:
+                return []
+
+            # Reciprocal-rank fusion: score = sum(1 / (k + rank)) across lists
+            candidates = (
+                union_all(*(s.subquery().select() for s in ranked_lists)).subquery()
+                if len(ranked_lists) > 1 else ranked_lists[0].subquery()
+            )
+            fused_score = func.sum(1.0 / (self.rrf_k + candidates.c.rank))
+            fused = (
+                select(candidates.c.chunk_id, fused_score.label("score"))
+                .group_by(candidates.c.chunk_id)
+                .order_by(fused_score.desc())
+                .limit(candidate_limit)
+                .subquery()
+            )
+
+            similarity = (1 - distance) if distance is not None else null()
+            stmt = (
+                select(
+                    KnowledgeChunk.id.label("chunk_id"),
+                    KnowledgeChunk.knowledge_base_id,
+                    KnowledgeChunk.ordinal,
+                    KnowledgeChunk.content,
+                    KnowledgeBase.source_url,
+                    KnowledgeBase.meta_data,
+                    KnowledgeBase.created_at,
+                    similarity.label("similarity"),
+                    fused.c.score,
+                )
+                .join(fused, fused.c.chunk_id == KnowledgeChunk.id)
+                .join(KnowledgeBase, KnowledgeChunk.knowledge_base_id == KnowledgeBase.id)
+                .order_by(fused.c.score.desc())
+            )
+
+            if distance is not None:
+                # Widen the HNSW candidate list so filtered queries still fill top_k
+                ef_search = self.hnsw_ef_search
+                if self.vector_search == "binary":
+                    ef_search = max(ef_search, candidate_limit * self.binary_rerank_factor)
+                await self.db.execute(text(f"SET LOCAL hnsw.ef_search = {min(int(ef_search), 1000)}"))
+
             result = await self.db.execute(stmt)
-            kb_entries = result.scalars().all()
-            
-            # Calculate cosine similarity for each entry
-            scored_entries = []
-            for entry in kb_entries:
-                if entry.embedding:
-                    similarity = self._cosine_similarity(query_embedding, entry.embedding)
-                    if similarity >= similarity_threshold:
-                        scored_entries.append({
-                            'id': entry.id,
-                            'content': entry.content,
-                            'source_type': entry.source_type,
-                            'source_url': entry.source_url,
-                            'meta_data': entry.meta_data,
-                            'similarity': similarity,
-                            'created_at': entry.created_at
-                        })
-            
-            # Sort by similarity and return top_k
-            scored_entries.sort(key=lambda x: x['similarity'], reverse=True)
-            return scored_entries[:top_k]
-            
+
+            passages = []
+            per_document: Dict[int, int] = {}
+            for row in result.all():
+                if per_document.get(row.knowledge_base_id, 0) >= self.max_chunks_per_document:
+                    continue
+                per_document[row.knowledge_base_id] = per_document.get(row.knowledge_base_id, 0) + 1
+                passages.append({
+                    'id': row.knowledge_base_id,
+                    'chunk_id': row.chunk_id,
+                    'ordinal': row.ordinal,
+                    'content': row.content,
+                    'source_type': (row.meta_data or {}).get('source_type'),
+                    'source_url': row.source_url,
+                    'meta_data': row.meta_data,
+                    'similarity': float(row.similarity) if row.similarity is not None else None,
+                    'score': float(row.score),
+                    'retrieval_mode': mode,
+                    'created_at': row.created_at
+                })
+                if len(passages) >= top_k:
+                    break
+
+            return passages
+
         except Exception as e:
+            if self.raise_retrieval_errors:
+                raise
             logger.error(f"Error retrieving context: {str(e)}")
             return []
-    
+
+    def _binary_vector_candidates(
+        self,
+        query_embedding: List[float],
+        filters: list,
+        similarity_threshold: float,
+        candidate_limit: int
+    ):
+        """
+        Vector candidates via binary quantization with a cosine re-rank
+
+        A hamming-distance shortlist (HNSW over binary_quantize(embedding)::bit)
+        of candidate_limit * binary_rerank_factor chunks is re-ranked by exact
+        cosine distance on the stored embedding (vector or halfvec), so only
+        the shortlist is read at full precision. Needs pgvector >= 0.7.
+        """
+        bits = BIT(EMBEDDING_DIMENSIONS)
+        query_vector = cast(query_embedding, HALFVEC(EMBEDDING_DIMENSIONS))
+        hamming = cast(func.binary_quantize(KnowledgeChunk.embedding), bits).op('<~>', return_type=Float)(
+            cast(func.binary_quantize(query_vector), bits)
+        )
+        shortlist = (
+            select(KnowledgeChunk.id, KnowledgeChunk.embedding)
+            .join(KnowledgeBase, KnowledgeChunk.knowledge_base_id == KnowledgeBase.id)
+            .where(KnowledgeChunk.embedding.isnot(None), *filters)
+            .order_by(hamming)
+            .limit(candidate_limit * self.binary_rerank_factor)
+            .subquery()
+        )
+
+        distance = shortlist.c.embedding.cosine_distance(query_embedding)
+        return (
+            select(
+                shortlist.c.id.label("chunk_id"),
+                func.row_number().over(order_by=distance).label("rank"),
+            )
+            .where(distance <= 1 - similarity_threshold)
+            .order_by(distance)
+            .limit(candidate_limit)
+        )
+
+    @staticmethod
+    def _build_ts_query(query: str) -> Optional[str]:
+        """
+        OR together the query's terms for to_tsquery
+
+        plainto_tsquery/websearch_to_tsquery AND every term, which almost never
+        matches a natural-language question; ts_rank_cd still rewards chunks
+        that match more (and closer) terms.
+        """
+        terms = list(dict.fromkeys(re.findall(r"[a-z0-9]+", query.lower())))
+        return " | ".join(terms) if terms else None
+
+    def _scope_filters(
+        self,
+        user_id: Optional[int],
+        campaign_id: Optional[int],
+        product_intelligence_id: Optional[int]
+    ) -> list:
+        """
+        Build WHERE clauses restricting KnowledgeBase rows to an owner
+
+        Research is owned by the product (product_intelligence_id) and shared across
+        campaigns; campaign_id is only set for campaign-specific notes.
+        """
+        filters = []
+
+        if product_intelligence_id is not None:
+            filters.append(KnowledgeBase.product_intelligence_id == product_intelligence_id)
+
+        if campaign_id is not None:
+            campaign_product = (
+                select(Campaign.product_intelligence_id)
+                .where(Campaign.id == campaign_id)
+                .scalar_subquery()
+            )
+            filters.append(or_(
+                KnowledgeBase.product_intelligence_id == campaign_product,
+                KnowledgeBase.campaign_id == campaign_id
+            ))
+
+        if user_id is not None:
+            user_products = select(Campaign.product_intelligence_id).where(
+                Campaign.user_id == user_id,
+                Campaign.product_intelligence_id.isnot(None)
+            )
+            user_campaigns = select(Campaign.id).where(Campaign.user_id == user_id)
+            filters.append(or_(
+                KnowledgeBase.product_intelligence_id.in_(user_products),
+                KnowledgeBase.campaign_id.in_(user_campaigns)
+            ))
+
+        return filters
+
     async def retrieve_campaign_context(
         self,
         campaign_id: int,
@@ -168,7 +538,8 @@ class RAGService:
                 query=query,
                 user_id=campaign.user_id,
                 source_types=['product_page', 'landing_page', 'sales_copy'],
-                top_k=top_k
+                top_k=top_k,
+                campaign_id=campaign_id
             )
             
             return context
@@ -244,69 +615,37 @@ Instructions: Use the context above to inform your response. Maintain accuracy a
             logger.error(f"Error building RAG prompt: {str(e)}")
             return query
     
-    def _chunk_text(self, text: str) -> List[str]:
-        """
-        Split text into overlapping chunks
-        
-        Args:
-            text: Text to chunk
-            
-        Returns:
-            List of text chunks
-        """
-        chunks = []
-        start = 0
-        text_length = len(text)
-        
-        while start < text_length:
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start += self.chunk_size - self.chunk_overlap
-        
-        return chunks
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """
-        Calculate cosine similarity between two vectors
-        
-        Args:
-            vec1: First vector
-            vec2: Second vector
-            
-        Returns:
-            Similarity score (0-1)
-        """
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return float(dot_product / (norm1 * norm2))
-    
-    async def delete_knowledge_base_entry(self, entry_id: int, user_id: int) -> bool:
+    async def delete_knowledge_base_entry(self, entry_id: int, user_id: int, is_admin: bool = False) -> bool:
         """
         Delete a knowledge base entry
         
+        Narrower than read access (_scope_filters): campaign notes can be
+        deleted by the campaign's owner, but product research is shared by
+        every campaign on the product, so only the product's creator or an
+        admin can delete it.
+        
         Args:
             entry_id: Entry ID
             user_id: User ID for authorization
+            is_admin: Admins can delete any entry
             
         Returns:
             True if deleted, False otherwise
         """
         try:
-            stmt = select(KnowledgeBase).where(
-                and_(
-                    KnowledgeBase.id == entry_id,
-                    KnowledgeBase.user_id == user_id
+            stmt = select(KnowledgeBase).where(KnowledgeBase.id == entry_id)
+            if not is_admin:
+                user_campaigns = select(Campaign.id).where(Campaign.user_id == user_id)
+                owned_products = select(ProductIntelligence.id).where(
+                    ProductIntelligence.created_by_user_id == user_id
                 )
-            )
+                stmt = stmt.where(or_(
+                    KnowledgeBase.campaign_id.in_(user_campaigns),
+                    and_(
+                        KnowledgeBase.campaign_id.is_(None),
+                        KnowledgeBase.product_intelligence_id.in_(owned_products)
+                    )
+                ))
             result = await self.db.execute(stmt)
             entry = result.scalar_one_or_none()
             
@@ -333,24 +672,25 @@ Instructions: Use the context above to inform your response. Maintain accuracy a
             Statistics dictionary
         """
         try:
-            stmt = select(KnowledgeBase).where(KnowledgeBase.user_id == user_id)
-            result = await self.db.execute(stmt)
-            entries = result.scalars().all()
-            
-            # Calculate stats
-            total_entries = len(entries)
-            total_chunks = sum(entry.chunk_count or 0 for entry in entries)
-            source_types = {}
-            
-            for entry in entries:
-                source_type = entry.source_type
-                source_types[source_type] = source_types.get(source_type, 0) + 1
-            
+            # One grouped aggregate - never loads content or embeddings
+            source_type = KnowledgeBase.meta_data["source_type"].astext
+            stmt = (
+                select(
+                    source_type.label("source_type"),
+                    func.count(KnowledgeBase.id).label("entries"),
+                    func.coalesce(func.sum(KnowledgeBase.chunk_count), 0).label("chunks"),
+                    func.max(KnowledgeBase.created_at).label("last_updated"),
+                )
+                .where(*self._scope_filters(user_id, None, None))
+                .group_by(source_type)
+            )
+            rows = (await self.db.execute(stmt)).all()
+
             return {
-                'total_entries': total_entries,
-                'total_chunks': total_chunks,
-                'source_types': source_types,
-                'last_updated': max([e.created_at for e in entries]) if entries else None
+                'total_entries': sum(row.entries for row in rows),
+                'total_chunks': int(sum(row.chunks for row in rows)),
+                'source_types': {row.source_type: row.entries for row in rows},
+                'last_updated': max((row.last_updated for row in rows), default=None)
             }
             
         except Exception as e:
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Compare ANN recall and latency for knowledge chunk embeddings.
+
+Samples stored chunk vectors as queries and compares each search strategy
+against an exact (sequential scan) cosine top-k:
+  - hnsw:   HNSW index on the stored column (vector or halfvec)
+  - binary: HNSW over binary_quantize(embedding)::bit shortlist, cosine re-rank
+
+Also prints table and index sizes so storage formats can be compared before
+and after migrating to halfvec (migration 045).
+
+Run this with: python scripts/compare_vector_recall.py --samples 200 --k 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+DIMENSIONS = 1536
+
+EXACT_SQL = f"""
+    SELECT id FROM knowledge_chunks
+    WHERE embedding IS NOT NULL AND id <> :query_id
+    ORDER BY embedding::vector({DIMENSIONS}) <=> CAST(:query AS vector({DIMENSIONS}))
+    LIMIT :k
+"""
+
+HNSW_SQL = """
+    SELECT id FROM knowledge_chunks
+    WHERE embedding IS NOT NULL AND id <> :query_id
+    ORDER BY embedding <=> CAST(:query AS {column_type})
+    LIMIT :k
+"""
+
+BINARY_SQL = f"""
+    SELECT id FROM (
+        SELECT id, embedding FROM knowledge_chunks
+        WHERE embedding IS NOT NULL AND id <> :query_id
+        ORDER BY binary_quantize(embedding)::bit({DIMENSIONS})
+            <~> binary_quantize(CAST(:query AS halfvec({DIMENSIONS})))::bit({DIMENSIONS})
+        LIMIT :shortlist
+    ) shortlist
+    ORDER BY embedding <=> CAST(:query AS {{column_type}})
+    LIMIT :k
+"""
+
+SIZES_SQL = """
+    SELECT relname, pg_size_pretty(pg_relation_size(oid)) AS size
+    FROM pg_class
+    WHERE relname = 'knowledge_chunks'
+       OR oid IN (SELECT indexrelid FROM pg_index WHERE indrelid = 'knowledge_chunks'::regclass)
+    ORDER BY pg_relation_size(oid) DESC
+"""
+
+
+def get_database_url() -> str:
+    database_url = os.getenv("DATABASE_URL") or os.getenv("DATABASE_URL_ASYNC")
+    if not database_url:
+        raise SystemExit("ERROR: DATABASE_URL not found in environment")
+    if database_url.startswith("postgresql://"):
+        database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
+    return database_url
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+async def run_query(conn, sql: str, params: dict, settings_sql: list):
+    """Run one search in its own transaction (SET LOCAL) and time it"""
+    async with conn.begin():
+        for statement in settings_sql:
+            await conn.execute(text(statement))
+        start = time.perf_counter()
+        result = await conn.execute(text(sql), params)
+        ids = [row[0] for row in result.all()]
+        return ids, (time.perf_counter() - start) * 1000
+
+
+async def compare_recall(samples: int, k: int, ef_search: int, rerank_factor: int):
+    engine = create_async_engine(get_database_url())
+
+    async with engine.connect() as conn:
+        column_type = (await conn.execute(text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = 'knowledge_chunks'::regclass AND attname = 'embedding'"
+        ))).scalar()
+        has_binary_index = bool((await conn.execute(text(
+            "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_knowledge_chunks_embedding_bq_hnsw'"
+        ))).scalar())
+        await conn.commit()
+
+        print(f"📐 knowledge_chunks.embedding: {column_type}")
+        print("=" * 60)
+        for relname, size in (await conn.execute(text(SIZES_SQL))).all():
+            print(f"   {relname:<45} {size}")
+        await conn.commit()
+
+        queries = (await conn.execute(text(
+            "SELECT id, embedding::text FROM knowledge_chunks "
+            "WHERE embedding IS NOT NULL ORDER BY random() LIMIT :n"
+        ), {"n": samples})).all()
+        await conn.commit()
+
+        if not queries:
+            print("⚠️  No embedded chunks found")
+            return
+
+        strategies = {
+            "hnsw": (HNSW_SQL.format(column_type=column_type), [f"SET LOCAL hnsw.ef_search = {ef_search}"]),
+        }
+        if has_binary_index:
+            shortlist_ef = min(1000, max(ef_search, k * rerank_factor))
+            strategies["binary"] = (
+                BINARY_SQL.format(column_type=column_type),
+                [f"SET LOCAL hnsw.ef_search = {shortlist_ef}"],
+            )
+        else:
+            print("ℹ️  Binary-quantized index missing - skipping binary strategy")
+
+        exact_settings = ["SET LOCAL enable_indexscan = off", "SET LOCAL enable_bitmapscan = off"]
+        recalls = {name: [] for name in strategies}
+        latencies = {name: [] for name in ["exact", *strategies]}
+
+        print(f"\n🔎 Running {len(queries)} queries (k={k}, ef_search={ef_search})...")
+        for query_id, embedding in queries:
+            params = {"query": embedding, "query_id": query_id, "k": k, "shortlist": k * rerank_factor}
+
+            exact_ids, elapsed = await run_query(conn, EXACT_SQL, params, exact_settings)
+            latencies["exact"].append(elapsed)
+            if not exact_ids:
+                continue
+
+            for name, (sql, settings_sql) in strategies.items():
+                ids, elapsed = await run_query(conn, sql, params, settings_sql)
+                latencies[name].append(elapsed)
+                recalls[name].append(len(set(ids) & set(exact_ids)) / len(exact_ids))
+
+    await engine.dispose()
+
+    print("\n📊 Results")
+    print("=" * 60)
+    print(f"   {'strategy':<10} {'recall@' + str(k):>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, values in latencies.items():
+        recall = f"{statistics.mean(recalls[name]):.3f}" if recalls.get(name) else "1.000"
+        print(f"   {name:<10} {recall:>10} {percentile(values, 50):>10.2f} {percentile(values, 99):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare knowledge chunk ANN recall against exact search")
+    parser.add_argument("--samples", type=int, default=100, help="Number of stored chunks to use as queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--ef-search", type=int, default=100, help="hnsw.ef_search for the ANN strategies")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="Binary shortlist size = k * factor")
+    args = parser.parse_args()
+
+    asyncio.run(compare_recall(args.samples, args.k, args.ef_search, args.rerank_factor))
+
+
+if __name__ == "__main__":
+    main()